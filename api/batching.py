@@ -0,0 +1,43 @@
+"""
+Helpers for multi-artist batch endpoints.
+
+Batch endpoints take a comma-separated `ids` list and an optional `fields`
+list, answer with IN queries, and return a map keyed by spotify_id.
+"""
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+MAX_BATCH_IDS = 100
+
+
+def parse_ids(raw: str) -> list[str]:
+    """Distinct IDs from a comma-separated list, in request order; 400 if too many."""
+    ids = list(dict.fromkeys(i.strip() for i in raw.split(",") if i.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No ids given")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request"
+        )
+    return ids
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[set[str]]:
+    """Requested field names (None for all); 400 on unknown names."""
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return fields
+
+
+def select_fields(record: dict, fields: Optional[set[str]]) -> dict:
+    """The record restricted to fields (all of it when fields is None)."""
+    if fields is None:
+        return record
+    return {key: value for key, value in record.items() if key in fields}
@@ -0,0 +1,130 @@
+"""
+Bitset facet index over the dashboard universe.
+
+Each facet value (grade "A", genre "metalcore", ...) owns a Python int used
+as a bitset: bit i is set when row i of the universe has that value. A
+filter ORs the bitsets of the selected values within a facet and ANDs
+across facets; counts are popcounts. Facet counts follow the usual faceted
+search rule: each facet is counted under every filter except its own, so
+multi-select (grade=A,B) still shows what selecting another value would add.
+"""
+import json
+
+from scoring.engine import label_tier
+
+FACETS = ("grade", "segment", "label_tier", "agency", "management", "genre")
+
+
+def label_tier_value(label: str | None) -> str:
+    """Facet value for an artist's label: its tier, "unranked" or "unsigned"."""
+    if not label:
+        return "unsigned"
+    tier = label_tier(label)
+    return str(tier) if tier else "unranked"
+
+
+def facet_values(artist, score) -> dict[str, list[str]]:
+    """Facet values of one artist (and its latest score, if any)."""
+    try:
+        genres = json.loads(artist.genres) if artist.genres else []
+    except (TypeError, ValueError):
+        genres = []
+    if isinstance(genres, str):
+        genres = [genres]  # some sources store a single genre as a bare string
+    return {
+        "grade": [score.grade] if score and score.grade else [],
+        "segment": [score.segment_tag] if score and score.segment_tag else [],
+        "label_tier": [label_tier_value(artist.current_label)],
+        "agency": [artist.booking_agency] if artist.booking_agency else [],
+        "management": (
+            [artist.current_management_co] if artist.current_management_co else []
+        ),
+        "genre": [g for g in genres if isinstance(g, str) and g],
+    }
+
+
+def parse_filters(**params: str | None) -> dict[str, list[str]]:
+    """Comma-separated query parameters to {facet: [values]}; grades uppercased."""
+    filters = {}
+    for facet, raw in params.items():
+        if not raw:
+            continue
+        values = [v.strip() for v in raw.split(",") if v.strip()]
+        if facet == "grade":
+            values = [v.upper() for v in values]
+        if values:
+            filters[facet] = values
+    return filters
+
+
+def mask_from_positions(positions, size: int) -> int:
+    """Bitset with the given row positions set."""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class FacetIndex:
+    """Per-value bitsets for every facet over rows 0..size-1."""
+
+    def __init__(self, rows: list[dict[str, list[str]]]):
+        self.size = len(rows)
+        self.everything = (1 << self.size) - 1
+        positions: dict[str, dict[str, list[int]]] = {f: {} for f in FACETS}
+        for i, row in enumerate(rows):
+            for facet in FACETS:
+                for value in row.get(facet, ()):
+                    positions[facet].setdefault(value, []).append(i)
+        self.bits = {
+            facet: {
+                value: mask_from_positions(rows_with_value, self.size)
+                for value, rows_with_value in values.items()
+            }
+            for facet, values in positions.items()
+        }
+
+    def mask(self, facet: str, values: list[str]) -> int:
+        """Rows having any of the values (OR within a facet)."""
+        bits = self.bits.get(facet, {})
+        mask = 0
+        for value in values:
+            mask |= bits.get(value, 0)
+        return mask
+
+    def select(
+        self,
+        filters: dict[str, list[str]],
+        base: int | None = None,
+        skip: str | None = None,
+    ) -> int:
+        """Rows passing every facet filter except `skip` (AND across facets)."""
+        mask = self.everything if base is None else base
+        for facet, values in filters.items():
+            if facet != skip:
+                mask &= self.mask(facet, values)
+        return mask
+
+    def counts(
+        self, filters: dict[str, list[str]], base: int | None = None
+    ) -> dict[str, dict[str, int]]:
+        """Count of rows per facet value, each facet ignoring its own filter."""
+        result = {}
+        for facet in FACETS:
+            scope = self.select(filters, base, skip=facet)
+            counted = {
+                value: (scope & bits).bit_count()
+                for value, bits in self.bits[facet].items()
+            }
+            result[facet] = dict(
+                sorted(
+                    ((v, n) for v, n in counted.items() if n),
+                    key=lambda item: (-item[1], item[0]),
+                )
+            )
+        return result
+
+
+def member_bytes(mask: int, size: int) -> bytes:
+    """Bitset as bytes, for O(1) membership tests while walking a sort order."""
+    return mask.to_bytes((size + 7) // 8 or 1, "little")
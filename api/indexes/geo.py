@@ -0,0 +1,139 @@
+"""
+Geohash grid for spatial event queries.
+
+Events store the geohash of their venue. A radius or bounding-box query is
+answered by covering the search area with a handful of geohash cells,
+range-scanning the (geohash, event_date) index once per cell, then applying
+an exact distance test to the candidates. Works the same on SQLite and
+PostgreSQL with a plain B-tree index.
+"""
+import math
+
+GEOHASH_PRECISION = 9  # ~5m cells, finer than any venue needs
+MAX_COVER_CELLS = 24   # range scans per query before coarsening the grid
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a base32 geohash string."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def split_bbox(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float
+) -> list[tuple[float, float, float, float]]:
+    """Normalize a bounding box, splitting it if it crosses the antimeridian."""
+    min_lat, max_lat = max(-90.0, min_lat), min(90.0, max_lat)
+    if max_lon - min_lon >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    if min_lon > max_lon:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def radius_bbox(
+    lat: float, lon: float, radius_km: float
+) -> list[tuple[float, float, float, float]]:
+    """Bounding box(es) that contain every point within radius_km of (lat, lon)."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle reaches a pole: every longitude is in range
+        return split_bbox(min_lat, -180.0, max_lat, 180.0)
+    dlon = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))))
+    )
+    return split_bbox(min_lat, lon - dlon, max_lat, lon + dlon)
+
+
+def _cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) in degrees of a geohash cell at this precision."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def covering_cells(
+    boxes: list[tuple[float, float, float, float]],
+    max_cells: int = MAX_COVER_CELLS,
+) -> list[str]:
+    """
+    Geohash prefixes whose cells together cover every box.
+
+    Picks the finest precision that needs at most max_cells cells, so each
+    query costs a bounded number of index range scans. An empty prefix
+    means the whole world.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = _cell_size(precision)
+        spans = []
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            rows = (
+                int((min_lat + 90) // height),
+                min(int((max_lat + 90) // height), int(180 / height) - 1),
+            )
+            cols = (
+                int((min_lon + 180) // width),
+                min(int((max_lon + 180) // width), int(360 / width) - 1),
+            )
+            spans.append((rows, cols))
+        count = sum(
+            (r1 - r0 + 1) * (c1 - c0 + 1) for (r0, r1), (c0, c1) in spans
+        )
+        if count > max_cells:
+            continue
+        return sorted({
+            encode_geohash(
+                -90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision
+            )
+            for (r0, r1), (c0, c1) in spans
+            for row in range(r0, r1 + 1)
+            for col in range(c0, c1 + 1)
+        })
+    return [""]
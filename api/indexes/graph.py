@@ -0,0 +1,478 @@
+"""
+In-memory index of the relationships graph.
+
+Nodes ("artist:Spiritbox", "producer:Dan Braunstein", ...) get dense integer
+IDs in first-appearance order and the edges are kept as CSR adjacency:
+node i's neighbours are adjacency[offsets[i]:offsets[i + 1]], with the link
+that joins them at the same positions in incident. Links are stored once as
+parallel source/target/type/weight arrays, so a subgraph is found by walking the
+adjacency of its nodes instead of scanning every relationship.
+
+Each node and link is serialized to JSON once, on first use; a graph
+response is those fragments joined, and the full graph is a single cached
+byte string. The index is rebuilt once per relationships/artists/scores
+data version.
+
+The compact format sends the same graph as columns: a node table with one
+array per field, and links as parallel arrays of node positions and
+relationship-type codes, so no node key is repeated per link. It is
+encoded as JSON, or as MessagePack when msgpack is installed.
+
+Level-of-detail views collapse each stored community (or community
+group) into one supernode and merge the links between them, so the
+payload is bounded by the number of clusters; named supernodes can be
+expanded one level at a time.
+
+Centered queries resolve the center through exact lookups (node key,
+spotify_id, normalized label) before falling back to ranked trigram search,
+then breadth-first search the adjacency, touching only the neighbourhood.
+"""
+import json
+from array import array
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from indexes.search import SearchIndex, aliases, normalize
+from materialized.versions import VersionedCache
+from models import Artist, LatestScore, NodeLayout, NodeMetric, Relationship, Score
+from schemas import NetworkLink, NetworkNode
+
+try:
+    import msgpack
+except ImportError:  # optional: format=msgpack is unavailable without it
+    msgpack = None
+
+# Level of detail -> stored cluster fields, coarsest first
+LOD_FIELDS = {1: ("community",), 2: ("community_group", "community")}
+SUPERNODE_TYPES = {"community_group": "group", "community": "community"}
+_MAX_CACHED_VIEWS = 64
+# Response encodings -> media type: NetworkGraph JSON, and the columnar
+# compact form as JSON or, when msgpack is installed, MessagePack
+FORMATS = {"json": "application/json", "compact": "application/json"}
+if msgpack is not None:
+    FORMATS["msgpack"] = "application/msgpack"
+
+
+class GraphIndex:
+    """Relationships graph with integer node IDs and CSR adjacency."""
+
+    def __init__(
+        self,
+        relationships: Iterable[tuple[str, str, str, str, str, float | None]],
+        artists: dict[str, tuple[str, float | None]] | None = None,
+        ranked_artists: list[str] | None = None,
+        extras: dict[str, dict] | None = None,
+    ):
+        """
+        relationships: (source_type, source_id, target_type, target_id,
+        relationship_type, weight) in display order; a missing weight is 1.
+        artists maps artist names to (spotify_id, latest composite);
+        ranked_artists lists scored artist names, best composite first,
+        including artists outside the graph.
+        extras maps node keys to further stored NetworkNode fields
+        (centrality, layout position).
+        """
+        artists = artists or {}
+        self.extras = extras or {}
+        self.keys: list[str] = []
+        self.types: list[str] = []
+        self.labels: list[str] = []
+        self.node_ids: dict[str, int] = {}
+        self.relationship_types: list[str] = []
+        self.type_codes: dict[str, int] = {}
+        type_codes = self.type_codes
+        self.link_source = array("i")
+        self.link_target = array("i")
+        self.link_type = array("B")
+        self.link_weight = array("d")
+
+        for source_type, source_id, target_type, target_id, kind, weight in relationships:
+            self.link_source.append(self._node(source_type, source_id))
+            self.link_target.append(self._node(target_type, target_id))
+            if kind not in type_codes:
+                type_codes[kind] = len(self.relationship_types)
+                self.relationship_types.append(kind)
+            self.link_type.append(type_codes[kind])
+            self.link_weight.append(weight if weight is not None else 1.0)
+
+        self.spotify_ids: list[str | None] = [None] * len(self.keys)
+        self.scores: list[float | None] = [None] * len(self.keys)
+        for i, (node_type, label) in enumerate(zip(self.types, self.labels)):
+            if node_type == "artist" and label in artists:
+                self.spotify_ids[i], self.scores[i] = artists[label]
+
+        # Top-N order over every scored artist; -1 for those not in the graph
+        self.ranked_artists = array("i", (
+            self.node_ids.get(f"artist:{name}", -1) for name in ranked_artists or ()
+        ))
+
+        self._build_adjacency()
+        self._build_lookups()
+        self._node_json: list[bytes] | None = None
+        self._link_json: list[bytes] | None = None
+        self._node_rows: list[dict] | None = None
+        self._full: dict[str, bytes] = {}
+        self._views: dict[tuple[int, frozenset[str], str], bytes] = {}
+
+    def _node(self, node_type: str, label: str) -> int:
+        key = f"{node_type}:{label}"
+        node = self.node_ids.get(key)
+        if node is None:
+            node = self.node_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.types.append(node_type)
+            self.labels.append(label)
+        return node
+
+    def _build_adjacency(self) -> None:
+        # Counting sort of both link directions by node
+        degree = [0] * (len(self.keys) + 1)
+        for source, target in zip(self.link_source, self.link_target):
+            degree[source + 1] += 1
+            degree[target + 1] += 1
+        for i in range(len(self.keys)):
+            degree[i + 1] += degree[i]
+        self.offsets = array("i", degree)
+        fill = list(degree[:-1])
+        self.adjacency = array("i", bytes(4 * degree[-1]))
+        self.incident = array("i", bytes(4 * degree[-1]))
+        for link, (source, target) in enumerate(zip(self.link_source, self.link_target)):
+            for node, other in ((source, target), (target, source)):
+                self.adjacency[fill[node]] = other
+                self.incident[fill[node]] = link
+                fill[node] += 1
+
+    def _build_lookups(self) -> None:
+        self._node_types = set(self.types)
+        self._by_key = {key.lower(): i for i, key in enumerate(self.keys)}
+        self._by_spotify_id = {s: i for i, s in enumerate(self.spotify_ids) if s}
+        # A name shared across types ("artist:X", "label:X") resolves to the
+        # artist, then to the better connected node
+        self._by_label: dict[tuple[str | None, str], int] = {}
+        for i in sorted(
+            range(len(self.keys)),
+            key=lambda i: (self.types[i] != "artist", -self.degree(i), i),
+        ):
+            text = normalize(self.labels[i])
+            self._by_label.setdefault((None, text), i)
+            self._by_label.setdefault((self.types[i], text), i)
+        self._search: SearchIndex | None = None  # built on the first fuzzy lookup
+
+    def node_model(self, node: int) -> NetworkNode:
+        return NetworkNode(
+            id=self.keys[node],
+            label=self.labels[node],
+            type=self.types[node],
+            score=self.scores[node],
+            spotify_id=self.spotify_ids[node],
+            **self.extras.get(self.keys[node], {}),
+        )
+
+    def link_model(self, link: int) -> NetworkLink:
+        return NetworkLink(
+            source=self.keys[self.link_source[link]],
+            target=self.keys[self.link_target[link]],
+            relationship=self.relationship_types[self.link_type[link]],
+            weight=self.link_weight[link],
+        )
+
+    def _render_node(self, node: int) -> bytes:
+        return self.node_model(node).model_dump_json().encode()
+
+    def _render_link(self, link: int) -> bytes:
+        return self.link_model(link).model_dump_json().encode()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def link_count(self) -> int:
+        return len(self.link_source)
+
+    def neighbors(self, node: int) -> array:
+        return self.adjacency[self.offsets[node]:self.offsets[node + 1]]
+
+    def degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def resolve(self, center: str) -> int | None:
+        """
+        Node for a center parameter: a node key ("artist:Spiritbox"), a
+        spotify_id, or a name, optionally prefixed with its type
+        ("producer:dan braunstein"). Exact matches win; otherwise the best
+        trigram match, ties going to the higher-scored, better connected node.
+        """
+        center = center.strip()
+        node = self._by_key.get(center.lower())
+        if node is None:
+            node = self._by_spotify_id.get(center)
+        if node is not None:
+            return node
+
+        node_type, _, name = center.partition(":")
+        if not name or node_type.lower() not in self._node_types:
+            node_type, name = None, center
+        else:
+            node_type = node_type.lower()
+        node = self._by_label.get((node_type, normalize(name)))
+        if node is not None:
+            return node
+
+        if self._search is None:
+            self._search = SearchIndex([
+                (str(i), self.types[i], spelling)
+                for i in range(len(self.keys))
+                for spelling in aliases(self.labels[i])
+            ])
+        matches = self._search.search(name, node_type, limit=20)
+        if not matches:
+            return None
+        return int(min(
+            matches,
+            key=lambda m: (m[1], -m[2], -(self.scores[int(m[0])] or 0.0), -self.degree(int(m[0]))),
+        )[0])
+
+    def neighborhood(self, node: int, depth: int) -> set[int]:
+        """Nodes within depth hops of node (breadth-first over adjacency)."""
+        offsets, adjacency = self.offsets, self.adjacency
+        visited = {node}
+        frontier = [node]
+        for _ in range(depth):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in adjacency[offsets[current]:offsets[current + 1]]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return visited
+
+    def links_within(self, nodes: set[int]) -> list[int]:
+        """Links with both ends in nodes, in display order."""
+        links = set()
+        for node in nodes:
+            for position in range(self.offsets[node], self.offsets[node + 1]):
+                if self.adjacency[position] in nodes:
+                    links.add(self.incident[position])
+        return sorted(links)
+
+    def top_artists(self, n: int) -> list[int]:
+        """The graph nodes among the n best-scored artists overall."""
+        return [node for node in self.ranked_artists[:n] if node >= 0]
+
+    def render(self, nodes: set[int] | None = None, fmt: str = "json") -> bytes:
+        """Subgraph induced by nodes (all if None), encoded as fmt (see FORMATS)."""
+        if nodes is None:
+            full = self._full.get(fmt)
+            if full is None:
+                full = self._full[fmt] = self._encode(
+                    range(len(self.keys)), range(len(self.link_source)), fmt
+                )
+            return full
+        return self._encode(sorted(nodes), self.links_within(nodes), fmt)
+
+    def clustered(self, lod: int, expand: frozenset[str] = frozenset(), fmt: str = "json") -> bytes:
+        """
+        Graph with clusters collapsed into supernodes, encoded as fmt.
+
+        lod 1 collapses communities, lod 2 community groups. Supernode ids
+        ("group:0", "community:3") listed in expand are opened one level: a
+        group into its communities, a community into its nodes.
+        """
+        key = (lod, expand, fmt)
+        view = self._views.get(key)
+        if view is None:
+            if len(self._views) >= _MAX_CACHED_VIEWS:
+                self._views.clear()
+            view = self._views[key] = self._encode(*self._clustered(LOD_FIELDS[lod], expand), fmt)
+        return view
+
+    def _clustered(
+        self, fields: tuple[str, ...], expand: frozenset[str]
+    ) -> tuple[list[int | NetworkNode], list[int | NetworkLink]]:
+        # Each node is drawn as itself or as the supernode it is folded into
+        shown: list[str | None] = []
+        members: dict[str, list[int]] = {}
+        for node, key in enumerate(self.keys):
+            extra = self.extras.get(key, {})
+            supernode = None
+            for field in fields:
+                cluster = extra.get(field)
+                if cluster is None:
+                    break
+                supernode = f"{SUPERNODE_TYPES[field]}:{cluster}"
+                if supernode not in expand:
+                    break
+                supernode = None
+            shown.append(supernode)
+            if supernode is not None:
+                members.setdefault(supernode, []).append(node)
+
+        nodes: list[int | NetworkNode] = [i for i, supernode in enumerate(shown) if supernode is None]
+        nodes += [
+            self._supernode(supernode, members[supernode])
+            for supernode in sorted(members, key=lambda s: (s.split(":")[0] != "group", int(s.split(":")[1])))
+        ]
+        links: list[int | NetworkLink] = []
+        merged: dict[tuple[str, str], float] = {}
+        for link, (source, target) in enumerate(zip(self.link_source, self.link_target)):
+            a, b = shown[source], shown[target]
+            if a is None and b is None:
+                links.append(link)
+                continue
+            a, b = a or self.keys[source], b or self.keys[target]
+            if a != b:
+                pair = (a, b) if a < b else (b, a)
+                merged[pair] = merged.get(pair, 0.0) + self.link_weight[link]
+        links += [
+            NetworkLink(source=a, target=b, relationship="clustered", weight=weight)
+            for (a, b), weight in merged.items()
+        ]
+        return nodes, links
+
+    def _supernode(self, supernode: str, members: list[int]) -> NetworkNode:
+        extras = [self.extras.get(self.keys[i], {}) for i in members]
+        # Named after its most central member
+        top = max(range(len(members)), key=lambda i: (extras[i].get("pagerank") or 0.0, -members[i]))
+        placed = [(e["x"], e["y"]) for e in extras if e.get("x") is not None]
+        scores = [self.scores[i] for i in members if self.scores[i] is not None]
+        return NetworkNode(
+            id=supernode,
+            label=f"{self.labels[members[top]]} +{len(members) - 1}",
+            type=supernode.split(":")[0],
+            score=max(scores) if scores else None,
+            pagerank=sum(e.get("pagerank") or 0.0 for e in extras),
+            x=sum(x for x, _ in placed) / len(placed) if placed else None,
+            y=sum(y for _, y in placed) / len(placed) if placed else None,
+            size=len(members),
+            community=int(supernode.split(":")[1]),
+        )
+
+    def _encode(
+        self, nodes: Iterable[int | NetworkNode], links: Iterable[int | NetworkLink], fmt: str
+    ) -> bytes:
+        """Graph nodes and links (ints) plus supernodes and merged links (models)."""
+        if fmt == "json":
+            if self._node_json is None:
+                self._node_json = [self._render_node(i) for i in range(len(self.keys))]
+                self._link_json = [self._render_link(e) for e in range(len(self.link_source))]
+            node_json, link_json = self._node_json, self._link_json
+            return (
+                b'{"nodes":['
+                + b",".join(
+                    node_json[n] if isinstance(n, int) else n.model_dump_json().encode()
+                    for n in nodes
+                )
+                + b'],"links":['
+                + b",".join(
+                    link_json[e] if isinstance(e, int) else e.model_dump_json().encode()
+                    for e in links
+                )
+                + b"]}"
+            )
+        table = self._compact(nodes, links)
+        if fmt == "msgpack":
+            return msgpack.packb(table)
+        return json.dumps(table, separators=(",", ":")).encode()
+
+    def _compact(self, nodes: Iterable[int | NetworkNode], links: Iterable[int | NetworkLink]) -> dict:
+        """
+        Columnar form: one array per node field, links as parallel arrays of
+        node positions and relationship codes. Node types and relationship
+        types are lookup tables indexed by those codes; node fields that are
+        null for every node are left out.
+        """
+        if self._node_rows is None:
+            self._node_rows = [self.node_model(i).model_dump() for i in range(len(self.keys))]
+        rows = [self._node_rows[n] if isinstance(n, int) else n.model_dump() for n in nodes]
+        position = {row["id"]: i for i, row in enumerate(rows)}
+
+        node_types: list[str] = []
+        type_codes: dict[str, int] = {}
+        columns: dict[str, list] = {}
+        for field in NetworkNode.model_fields:
+            values = [row[field] for row in rows]
+            if field == "type":
+                values = [type_codes.setdefault(t, len(type_codes)) for t in values]
+                node_types = list(type_codes)
+            elif field not in ("id", "label") and all(v is None for v in values):
+                continue
+            columns[field] = values
+
+        relationships = list(self.relationship_types)
+        sources, targets, codes, weights = [], [], [], []
+        for link in links:
+            if isinstance(link, int):
+                sources.append(position[self.keys[self.link_source[link]]])
+                targets.append(position[self.keys[self.link_target[link]]])
+                codes.append(self.link_type[link])
+                weights.append(self.link_weight[link])
+            else:
+                if link.relationship not in relationships:
+                    relationships.append(link.relationship)
+                sources.append(position[link.source])
+                targets.append(position[link.target])
+                codes.append(relationships.index(link.relationship))
+                weights.append(link.weight)
+        return {
+            "node_types": node_types,
+            "relationships": relationships,
+            "nodes": columns,
+            "links": {"source": sources, "target": targets, "relationship": codes, "weight": weights},
+        }
+
+
+def relationship_rows(db: Session):
+    """Relationships as GraphIndex input rows, in id order."""
+    return (
+        db.query(
+            Relationship.source_type,
+            Relationship.source_id,
+            Relationship.target_type,
+            Relationship.target_id,
+            Relationship.relationship_type,
+            Relationship.weight,
+        )
+        .order_by(Relationship.id)
+    )
+
+
+def build_graph(db: Session) -> GraphIndex:
+    """Load the relationships graph and artist scores from the database."""
+    scored = (
+        db.query(Artist.name, Artist.spotify_id, LatestScore.composite)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .all()
+    )
+    artists = {name: (spotify_id, composite) for name, spotify_id, composite in scored}
+    # Top N ranks artists by their best composite on record
+    best = (
+        db.query(Score.artist_id, func.max(Score.composite).label("best"))
+        .group_by(Score.artist_id)
+        .subquery()
+    )
+    ranked = [
+        name for (name,) in db.query(Artist.name)
+        .join(best, Artist.spotify_id == best.c.artist_id)
+        .order_by(best.c.best.desc().nullslast(), Artist.name)
+    ]
+    extras: dict[str, dict] = {}
+    for key, degree, pagerank, betweenness, community, group in db.query(
+        NodeMetric.node_key, NodeMetric.degree, NodeMetric.pagerank, NodeMetric.betweenness,
+        NodeMetric.community, NodeMetric.community_group,
+    ):
+        extras[key] = {
+            "degree": degree, "pagerank": pagerank, "betweenness": betweenness,
+            "community": community, "community_group": group,
+        }
+    for key, x, y in db.query(NodeLayout.node_key, NodeLayout.x, NodeLayout.y):
+        extras.setdefault(key, {}).update(x=x, y=y)
+    return GraphIndex(relationship_rows(db), artists, ranked, extras)
+
+
+# Rebuilt when relationships, artist names or scores change
+network_graph = VersionedCache(("relationships", "artists", "scores"), build_graph)
@@ -0,0 +1,146 @@
+"""
+Shortest connections between two nodes of the relationships graph.
+
+Paths are found with bidirectional breadth-first search over the GraphIndex
+adjacency: both ends expand one level at a time, always the smaller
+frontier, until they meet. That touches roughly the square root of the
+nodes a one-sided search would, which keeps queries on graphs with
+hundreds of thousands of links in the millisecond range.
+
+Alternatives come from Yen's algorithm: each further path is the shortest
+"spur" off a prefix of an earlier one, with the links already used from
+that prefix blocked. Paths are loopless and ordered by hop count.
+"""
+import heapq
+from dataclasses import dataclass
+
+from indexes.graph import GraphIndex
+
+MAX_HOPS = 6
+MAX_ALTERNATIVES = 5
+
+
+@dataclass(frozen=True)
+class Path:
+    nodes: tuple[int, ...]  # from source to target
+    links: tuple[int, ...]  # links[i] joins nodes[i] and nodes[i + 1]
+
+    @property
+    def hops(self) -> int:
+        return len(self.links)
+
+
+def shortest_path(
+    graph: GraphIndex,
+    source: int,
+    target: int,
+    max_hops: int = MAX_HOPS,
+    types: set[int] | None = None,
+    blocked_nodes: frozenset[int] | set[int] = frozenset(),
+    blocked_links: frozenset[int] | set[int] = frozenset(),
+) -> Path | None:
+    """
+    A shortest path of at most max_hops links, or None.
+
+    types restricts the walk to links of those relationship-type codes;
+    blocked nodes and links are never used.
+    """
+    if source == target:
+        return Path((source,), ())
+    if source in blocked_nodes or target in blocked_nodes:
+        return None
+
+    # node -> (hops from that side, previous node, link to it)
+    forward: dict[int, tuple[int, int, int]] = {source: (0, -1, -1)}
+    backward: dict[int, tuple[int, int, int]] = {target: (0, -1, -1)}
+    forward_frontier, backward_frontier = [source], [target]
+    forward_depth = backward_depth = 0
+
+    while forward_frontier and backward_frontier and forward_depth + backward_depth < max_hops:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        seen, other = (forward, backward) if expand_forward else (backward, forward)
+        frontier = forward_frontier if expand_forward else backward_frontier
+        depth = (forward_depth if expand_forward else backward_depth) + 1
+
+        meeting, best = None, None
+        next_frontier = []
+        for node in frontier:
+            for position in range(graph.offsets[node], graph.offsets[node + 1]):
+                link = graph.incident[position]
+                if link in blocked_links or (types is not None and graph.link_type[link] not in types):
+                    continue
+                neighbor = graph.adjacency[position]
+                if neighbor in seen or neighbor in blocked_nodes:
+                    continue
+                seen[neighbor] = (depth, node, link)
+                next_frontier.append(neighbor)
+                if neighbor in other:
+                    total = depth + other[neighbor][0]
+                    if best is None or total < best:
+                        meeting, best = neighbor, total
+
+        if expand_forward:
+            forward_frontier, forward_depth = next_frontier, depth
+        else:
+            backward_frontier, backward_depth = next_frontier, depth
+        if meeting is not None:
+            return _join(forward, backward, meeting)
+    return None
+
+
+def k_shortest_paths(
+    graph: GraphIndex,
+    source: int,
+    target: int,
+    k: int = 1,
+    max_hops: int = MAX_HOPS,
+    types: set[int] | None = None,
+) -> list[Path]:
+    """Up to k loopless paths, shortest first (Yen's algorithm)."""
+    first = shortest_path(graph, source, target, max_hops, types)
+    if first is None:
+        return []
+    found = [first]
+    candidates: list[tuple[int, tuple[int, ...], Path]] = []
+    queued = {first.links}
+
+    while len(found) < k:
+        previous = found[-1]
+        for i in range(previous.hops):
+            root_nodes, root_links = previous.nodes[:i + 1], previous.links[:i]
+            # Compared by links: parallel links make distinct roots over the same nodes
+            blocked_links = {
+                path.links[i] for path in found
+                if path.hops > i and path.links[:i] == root_links
+            }
+            spur = shortest_path(
+                graph, root_nodes[-1], target, max_hops - i, types,
+                blocked_nodes=set(root_nodes[:-1]), blocked_links=blocked_links,
+            )
+            if spur is None:
+                continue
+            path = Path(root_nodes + spur.nodes[1:], root_links + spur.links)
+            if path.links not in queued:
+                queued.add(path.links)
+                heapq.heappush(candidates, (path.hops, path.links, path))
+        if not candidates:
+            break
+        found.append(heapq.heappop(candidates)[2])
+    return found
+
+
+def _join(forward: dict, backward: dict, meeting: int) -> Path:
+    nodes, links = [meeting], []
+    node = meeting
+    while forward[node][1] != -1:
+        _, node, link = forward[node]
+        nodes.append(node)
+        links.append(link)
+    nodes.reverse()
+    links.reverse()
+    node = meeting
+    while backward[node][1] != -1:
+        _, node, link = backward[node]
+        nodes.append(node)
+        links.append(link)
+    return Path(tuple(nodes), tuple(links))
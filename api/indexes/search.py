@@ -0,0 +1,279 @@
+"""
+Trigram search over artist names, aliases and labels.
+
+Every searchable string is normalized (case, diacritics, "&" vs "and",
+punctuation) and broken into trigrams. A query is answered from the trigram
+postings alone: substring matches are the intersection of the query's
+trigram lists, typo matches are words that share enough trigrams with a
+query term and sit within a small edit distance of it. Cost depends on the
+postings touched, not on the size of the universe, and the same index
+serves SQLite and PostgreSQL.
+
+Matches are ranked exact, then prefix (of the string or one of its words),
+then substring, then fuzzy; ties go to the closest and shortest string.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from sqlalchemy.orm import Session
+
+from materialized.versions import VersionedCache
+from models import Artist
+
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+MIN_SIMILARITY = 0.3  # trigram similarity needed before edit distance is checked
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize(text: str | None) -> str:
+    """Lowercase, strip diacritics and punctuation, spell out "&"."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _NON_WORD.sub(" ", text.replace("&", " and "))
+    return " ".join(text.split())
+
+
+def aliases(name: str) -> set[str]:
+    """Normalized spellings an artist name is commonly searched by."""
+    base = normalize(name)
+    if not base:
+        return set()
+    variants = {base, base.replace(" ", "")}
+    if base.startswith("the "):
+        variants.add(base[4:])
+    if " and " in base:
+        variants.add(base.replace(" and ", " "))
+    return {v for v in variants if v}
+
+
+def label_names(label: str | None) -> set[str]:
+    """Normalized label strings, with compound labels ("A / B") split up."""
+    if not label:
+        return set()
+    parts = {normalize(label)} | {normalize(p) for p in label.split("/")}
+    return {p for p in parts if p}
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of a normalized string (callers add padding as needed)."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_edits(term: str) -> int:
+    """Typos tolerated for a query term of this length."""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+class SearchIndex:
+    """Trigram index over (key, field, text) entries."""
+
+    def __init__(self, entries: list[tuple[str, str, str]]):
+        self._keys: list[str] = []
+        self._texts: list[str] = []
+        self._fields: list[str] = []
+        seen = set()
+        for key, field, text in entries:
+            if text and (key, field, text) not in seen:
+                seen.add((key, field, text))
+                self._keys.append(key)
+                self._fields.append(field)
+                self._texts.append(text)
+
+        # Trigram -> entry ids; strings are padded so word starts are grams too
+        postings: dict[str, list[int]] = defaultdict(list)
+        word_entries: dict[str, list[int]] = defaultdict(list)
+        for doc, text in enumerate(self._texts):
+            for gram in trigrams(f" {text} "):
+                postings[gram].append(doc)
+            for word in set(text.split()):
+                word_entries[word].append(doc)
+        self._postings = dict(postings)
+        self._word_entries = dict(word_entries)
+
+        # Word-level trigrams drive typo matching; sorted words serve prefix extension
+        word_grams: dict[str, list[str]] = defaultdict(list)
+        for word in self._word_entries:
+            for gram in trigrams(f"  {word} "):
+                word_grams[gram].append(word)
+        self._word_grams = dict(word_grams)
+        self._word_gram_counts = {w: len(trigrams(f"  {w} ")) for w in self._word_entries}
+        self._sorted_words = sorted(self._word_entries)
+
+        # One- and two-character substrings, for queries too short for trigrams
+        short: dict[str, set[int]] = defaultdict(set)
+        for doc, text in enumerate(self._texts):
+            for size in (1, 2):
+                for i in range(len(text) - size + 1):
+                    short[text[i:i + size]].add(doc)
+        self._short_postings = dict(short)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def search(
+        self, query: str, field: str | None = None, limit: int | None = None
+    ) -> list[tuple[str, int, float]]:
+        """
+        Ranked (key, match_kind, similarity) for entries matching query.
+
+        Each key appears once, at its best match. field restricts matches to
+        entries of that field. Queries under three characters match as
+        prefixes or substrings, without typo tolerance.
+        """
+        term = normalize(query)
+        if not term:
+            return []
+        matches: dict[int, tuple[int, float]] = {}
+        if len(term) < 3:
+            self._short_matches(term, matches)
+        else:
+            self._substring_matches(term, matches)
+            if " " in term:
+                # "spirit box" should still find the "spiritbox" alias
+                self._substring_matches(term.replace(" ", ""), matches)
+            self._fuzzy_matches(term, matches)
+
+        ranked = sorted(
+            (
+                (kind, -similarity, len(self._texts[doc]), self._texts[doc], doc)
+                for doc, (kind, similarity) in matches.items()
+                if field is None or self._fields[doc] == field
+            )
+        )
+        results, seen = [], set()
+        for kind, similarity, _, _, doc in ranked:
+            key = self._keys[doc]
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append((key, kind, -similarity))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def keys(self, query: str, field: str | None = None) -> set[str]:
+        """Every key with at least one matching entry."""
+        return {key for key, _, _ in self.search(query, field)}
+
+    def _classify(self, term: str, doc: int) -> int:
+        text = self._texts[doc]
+        if text == term:
+            return EXACT
+        if text.startswith(term) or f" {term}" in f" {text}":
+            return PREFIX
+        return SUBSTRING
+
+    def _record(self, matches: dict, doc: int, kind: int, similarity: float) -> None:
+        best = matches.get(doc)
+        if best is None or (kind, -similarity) < (best[0], -best[1]):
+            matches[doc] = (kind, similarity)
+
+    def _short_matches(self, term: str, matches: dict) -> None:
+        for doc in self._short_postings.get(term, ()):
+            self._record(matches, doc, self._classify(term, doc), len(term) / len(self._texts[doc]))
+
+    def _substring_matches(self, term: str, matches: dict) -> None:
+        lists = [self._postings.get(gram, ()) for gram in trigrams(term)]
+        if not all(lists):
+            return
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for docs in lists[1:]:
+            candidates.intersection_update(docs)
+            if not candidates:
+                return
+        for doc in candidates:
+            text = self._texts[doc]
+            if term in text:
+                self._record(matches, doc, self._classify(term, doc), len(term) / len(text))
+
+    def _fuzzy_matches(self, term: str, matches: dict) -> None:
+        """Entries whose words match every query word within max_edits typos."""
+        per_word: list[dict[int, float]] = []
+        for word in term.split():
+            docs: dict[int, float] = {}
+            for candidate, similarity in self._similar_words(word):
+                for doc in self._word_entries[candidate]:
+                    docs[doc] = max(docs.get(doc, 0.0), similarity)
+            if not docs:
+                return
+            per_word.append(docs)
+        per_word.sort(key=len)
+        for doc, similarity in per_word[0].items():
+            scores = [similarity]
+            for docs in per_word[1:]:
+                if doc not in docs:
+                    break
+                scores.append(docs[doc])
+            else:
+                self._record(matches, doc, FUZZY, sum(scores) / len(scores))
+
+    def _similar_words(self, word: str) -> list[tuple[str, float]]:
+        """Indexed words that are a prefix-extension or a near-typo of word."""
+        found = [
+            (candidate, len(word) / len(candidate))
+            for candidate in _with_prefix(self._sorted_words, word)
+        ]
+
+        limit = max_edits(word)
+        if not limit:
+            return found
+        grams = trigrams(f"  {word} ")
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._word_grams.get(gram, ()))
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + self._word_gram_counts[candidate] - common)
+            if similarity < MIN_SIMILARITY or candidate.startswith(word):
+                continue
+            if edit_distance(word, candidate, limit) <= limit:
+                found.append((candidate, similarity))
+        return found
+
+
+def _with_prefix(items: list[str], prefix: str):
+    """Items of a sorted list that start with prefix, via bisect."""
+    i = bisect_left(items, prefix)
+    while i < len(items) and items[i].startswith(prefix):
+        yield items[i]
+        i += 1
+
+
+def _build_artist_index(db: Session) -> SearchIndex:
+    entries = []
+    for spotify_id, name, label in db.query(
+        Artist.spotify_id, Artist.name, Artist.current_label
+    ).filter(Artist.active.is_(True)):
+        entries += [(spotify_id, "name", alias) for alias in aliases(name)]
+        entries += [(spotify_id, "label", text) for text in label_names(label)]
+    return SearchIndex(entries)
+
+
+# Rebuilt whenever the artist universe changes
+artist_search = VersionedCache(("artists",), _build_artist_index)
@@ -0,0 +1,119 @@
+"""
+Autocomplete over artist names, labels and producers.
+
+Every suggestion is stored under its normalized text and under each of its
+word suffixes ("horizon" finds "Bring Me the Horizon") in one sorted array.
+A prefix is a contiguous slice of that array, found with two bisects; the
+best suggestions in the slice by composite score are picked with a heap.
+Prefixes of one or two characters match large slices, so their top
+suggestions are computed once when the index is built.
+"""
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from indexes.search import aliases, normalize
+from materialized.versions import VersionedCache
+from models import Artist, LatestScore, Producer, Relationship
+
+MAX_SUGGESTIONS = 20
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    text: str
+    kind: str  # artist, label or producer
+    spotify_id: str | None
+    composite: float | None
+
+
+class SuggestIndex:
+    """Sorted prefix array with precomputed answers for short prefixes."""
+
+    def __init__(self, suggestions: list[Suggestion]):
+        # Best first: highest composite, then alphabetical
+        self._suggestions = sorted(
+            suggestions, key=lambda s: (-(s.composite or 0.0), s.text.lower(), s.kind)
+        )
+        keys = set()
+        for rank, suggestion in enumerate(self._suggestions):
+            spellings = (
+                aliases(suggestion.text) if suggestion.kind == "artist"
+                else {normalize(suggestion.text)}
+            )
+            for spelling in spellings:
+                words = spelling.split(" ")
+                for i in range(len(words)):
+                    keys.add((" ".join(words[i:]), rank))
+        ordered = sorted(keys)
+        self._keys = [key for key, _ in ordered]
+        self._ranks = [rank for _, rank in ordered]
+
+        short: dict[str, set[int]] = {}
+        for key, rank in ordered:
+            for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+                if len(key) >= length:
+                    short.setdefault(key[:length], set()).add(rank)
+        self._short = {
+            prefix: sorted(ranks)[:MAX_SUGGESTIONS] for prefix, ranks in short.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def suggest(self, query: str, limit: int = 10) -> list[Suggestion]:
+        """Top suggestions whose text, or one of its words, starts with query."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            ranks = self._short.get(prefix, [])[:limit]
+        else:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + "\x7f", lo)
+            # Ranks are positions in best-first order, so smallest is best
+            ranks = heapq.nsmallest(limit, set(self._ranks[lo:hi]))
+        return [self._suggestions[rank] for rank in ranks]
+
+
+def _build_suggest_index(db: Session) -> SuggestIndex:
+    suggestions = []
+    best_by_label: dict[str, float | None] = {}
+    for spotify_id, name, label, composite in (
+        db.query(Artist.spotify_id, Artist.name, Artist.current_label, LatestScore.composite)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .filter(Artist.active.is_(True))
+    ):
+        suggestions.append(Suggestion(name, "artist", spotify_id, composite))
+        for part in {label, *(label or "").split("/")}:
+            part = (part or "").strip()
+            if part:
+                seen = best_by_label.get(part)
+                best_by_label[part] = composite if seen is None else max(seen, composite or seen)
+
+    # Labels and producers rank by the best artist they work with
+    suggestions += [
+        Suggestion(label, "label", None, composite)
+        for label, composite in best_by_label.items()
+    ]
+    producer_best = dict(
+        db.query(Relationship.target_id, func.max(LatestScore.composite))
+        .join(Artist, Artist.name == Relationship.source_id)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .filter(Relationship.relationship_type == "produced_by")
+        .group_by(Relationship.target_id)
+    )
+    suggestions += [
+        Suggestion(name, "producer", None, producer_best.get(name))
+        for (name,) in db.query(Producer.name)
+    ]
+    return SuggestIndex(suggestions)
+
+
+# Rebuilt when names, labels, scores or producer credits change
+artist_suggest = VersionedCache(("artists", "scores", "relationships"), _build_suggest_index)
@@ -0,0 +1,214 @@
+"""
+In-memory read model for the artist dashboard.
+
+The dashboard universe (active artists plus their latest scores) is small
+and only changes when a seed, rescore or score run commits, so it is loaded
+once per artists/scores data version and served from memory:
+
+- one pre-rendered DashboardArtist per artist, plus a copy carrying its
+  sparklines for include_sparkline requests;
+- per sort column, the row order ascending with NULLS LAST and ties broken
+  on spotify_id -- exactly the database's ORDER BY -- plus the matching
+  descending order and a sorted key array for cursor seeks. Names sort by
+  name_key in memory and by the equivalent name_sort expression in SQL;
+- facet bitsets (grade, segment, label tier, agency, management, genre)
+  for filtering and facet counts.
+
+Cursors are the same (value, spotify_id) tokens the SQL path issues, so a
+client can page across a fallback between the two. Set
+DASHBOARD_READ_MODEL=0 to serve every request from SQL instead.
+"""
+import os
+import string
+from array import array
+from bisect import bisect_left, bisect_right
+
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from indexes.facets import FacetIndex, facet_values, mask_from_positions, member_bytes
+from materialized.latest_scores import sparklines
+from materialized.versions import VersionedCache
+from models import Artist, LatestScore
+from pagination import encode_cursor
+from schemas import DashboardArtist
+
+DASHBOARD_READ_MODEL = os.getenv("DASHBOARD_READ_MODEL", "1") != "0"
+
+SORT_FIELDS = (
+    "composite", "trajectory", "industry_signal", "engagement",
+    "release_positioning", "name",
+)
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def name_key(name: str) -> str:
+    """Sort key for artist names, identical to name_sort in SQL.
+
+    Only ASCII letters are folded, as lower() does in SQLite and under
+    COLLATE "C" in PostgreSQL; the result compares by code point, which is
+    the byte order both databases then use.
+    """
+    return name.translate(_ASCII_LOWER)
+
+
+class name_sort(FunctionElement):
+    """SQL for name_key: lower() under byte-wise collation."""
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(name_sort)
+def _name_sort(element, compiler, **kw):
+    # SQLite's default BINARY collation already compares bytes
+    return f"lower({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(name_sort, "postgresql")
+def _name_sort_postgresql(element, compiler, **kw):
+    return f'lower({compiler.process(element.clauses, **kw)} COLLATE "C")'
+
+
+class _SortOrder:
+    """Ascending and descending row orders for one sort column."""
+
+    def __init__(self, rows: list[DashboardArtist], field: str):
+        self.sort_value = name_key if field == "name" else None
+        keys = sorted(
+            (self._key(getattr(row, field), row.spotify_id), i) for i, row in enumerate(rows)
+        )
+        self.keys = [key for key, _ in keys]
+        self.asc = array("i", (i for _, i in keys))
+        self.scored = sum(1 for key in self.keys if key[0] == 0)
+        # Descending keeps NULLS LAST: reverse the scored and unscored blocks separately
+        self.desc = self.asc[:self.scored][::-1] + self.asc[self.scored:][::-1]
+
+    def start(self, descending: bool, value, spotify_id: str) -> int:
+        """Position of the first row strictly after (value, spotify_id)."""
+        key = self._key(value, spotify_id)
+        if not descending:
+            return bisect_right(self.keys, key)
+        before = bisect_left(self.keys, key)  # rows sorting before the cursor, ascending
+        if value is None:
+            return self.scored + len(self.keys) - before
+        return self.scored - before
+
+    def _key(self, value, spotify_id: str) -> tuple:
+        if value is not None and self.sort_value:
+            value = self.sort_value(value)
+        return _key(value, spotify_id)
+
+
+class UniverseReadModel:
+    """Dashboard rows with presorted orders and facet bitsets."""
+
+    def __init__(
+        self,
+        rows: list[DashboardArtist],
+        facets: list[dict[str, list[str]]] | None = None,
+        sparkline_rows: list[DashboardArtist] | None = None,
+    ):
+        self.rows = rows
+        self.sparkline_rows = sparkline_rows or rows
+        self.positions = {row.spotify_id: i for i, row in enumerate(rows)}
+        self.orders = {field: _SortOrder(rows, field) for field in SORT_FIELDS}
+        self.facets = FacetIndex(facets or [{} for _ in rows])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def text_mask(self, spotify_ids: list[set[str]] | None) -> int | None:
+        """Rows matching every set of IDs (text filters), None if there are none."""
+        mask = None
+        for ids in spotify_ids or ():
+            rows = mask_from_positions(
+                (self.positions[s] for s in ids if s in self.positions), len(self.rows)
+            )
+            mask = rows if mask is None else mask & rows
+        return mask
+
+    def matching(
+        self,
+        filters: dict[str, list[str]] | None = None,
+        spotify_ids: list[set[str]] | None = None,
+    ) -> int | None:
+        """Bitset of rows passing every filter, or None when nothing is filtered."""
+        base = self.text_mask(spotify_ids)
+        if not filters:
+            return base
+        return self.facets.select(filters, base)
+
+    def page(
+        self,
+        selected: int | None,
+        sort_by: str,
+        descending: bool,
+        limit: int,
+        offset: int = 0,
+        after: tuple | None = None,
+        with_sparklines: bool = False,
+    ) -> tuple[list[DashboardArtist], str | None]:
+        """One page of rows in sort order, and the cursor for the next page."""
+        rows = self.sparkline_rows if with_sparklines else self.rows
+        order = self.orders[sort_by]
+        sequence = order.desc if descending else order.asc
+        position = order.start(descending, *after) if after else 0
+        members = member_bytes(selected, len(self.rows)) if selected is not None else None
+
+        page: list[DashboardArtist] = []
+        skipped = 0
+        while position < len(sequence) and len(page) <= limit:
+            i = sequence[position]
+            position += 1
+            if members is not None and not members[i >> 3] >> (i & 7) & 1:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            page.append(rows[i])
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = encode_cursor(getattr(last, sort_by), last.spotify_id)
+        return page, next_cursor
+
+
+def _key(value, spotify_id: str) -> tuple:
+    # Unscored rows (value None) sort after every scored row
+    return (0, value, spotify_id) if value is not None else (1, "", spotify_id)
+
+
+def build_universe(db: Session) -> UniverseReadModel:
+    """Load the dashboard universe from the database."""
+    rows, facets, sparkline_rows = [], [], []
+    for artist, score in (
+        db.query(Artist, LatestScore)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .filter(Artist.active.is_(True))
+    ):
+        rows.append(DashboardArtist(
+            spotify_id=artist.spotify_id,
+            name=artist.name,
+            image_url=artist.image_url,
+            current_label=artist.current_label,
+            grade=score.grade if score else None,
+            segment_tag=score.segment_tag if score else None,
+            composite=score.composite if score else None,
+            trajectory=score.trajectory if score else None,
+            industry_signal=score.industry_signal if score else None,
+            engagement=score.engagement if score else None,
+            release_positioning=score.release_positioning if score else None,
+        ))
+        sparkline_rows.append(rows[-1].model_copy(update=sparklines(score)))
+        facets.append(facet_values(artist, score))
+    return UniverseReadModel(rows, facets, sparkline_rows)
+
+
+# Swapped whole whenever a seed, rescore or score run commits
+dashboard_universe = VersionedCache(("artists", "scores"), build_universe)
@@ -16,17 +16,44 @@ _project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from database import Base, engine  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from materialized.artist_documents import refresh_artist_documents  # noqa: E402
+from materialized.cobilling import backfill_co_billing  # noqa: E402
+from materialized.festivals import refresh_festivals  # noqa: E402
+from materialized.latest_scores import refresh_latest_scores  # noqa: E402
+from materialized.node_layouts import refresh_node_layouts  # noqa: E402
+from materialized.node_metrics import refresh_node_metrics  # noqa: E402
+from models import (  # noqa: E402
+    Artist,
+    ArtistDocument,
+    CoBillingMember,
+    Event,
+    Festival,
+    LatestScore,
+    NodeLayout,
+    NodeMetric,
+    Relationship,
+    Score,
+)
 from routers import health, artists, scores, network, seed, events  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
 
 def _run_migrations(eng):
-    """Add columns that create_all won't add to existing tables."""
+    """Add columns and indexes that create_all won't add to existing tables."""
     migrations = [
         ("artists", "booking_agent", "VARCHAR(200)"),
         ("artists", "bandsintown_id", "VARCHAR(200)"),
+        ("events", "latitude", "FLOAT"),
+        ("events", "longitude", "FLOAT"),
+        ("events", "geohash", "VARCHAR(12)"),
+        ("events", "bill_key", "VARCHAR(400)"),
+        ("relationships", "weight", "FLOAT"),
+        ("latest_scores", "composite_history", "TEXT"),
+        ("latest_scores", "trajectory_history", "TEXT"),
+        ("node_metrics", "community", "INTEGER"),
+        ("node_metrics", "community_group", "INTEGER"),
     ]
     with eng.connect() as conn:
         for table, col, col_type in migrations:
@@ -39,11 +66,107 @@ def _run_migrations(eng):
             except Exception:
                 conn.rollback()  # column already exists
 
+    _rebuild_events_autoincrement(eng)
+
+    # Indexes declared on models whose tables predate them
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=eng, checkfirst=True)
+
+
+def _rebuild_events_autoincrement(eng):
+    """
+    Rebuild a SQLite events table created before it used AUTOINCREMENT.
+
+    Without it SQLite hands the highest ids out again once archiving has
+    deleted them, and archiving those new rows then collides with
+    events_archive. Rows that already reuse an archived id are renumbered.
+    """
+    if eng.dialect.name != "sqlite":
+        return
+    with eng.begin() as conn:
+        create_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'events'"
+        )).scalar()
+        if create_sql is None or "AUTOINCREMENT" in create_sql.upper():
+            return
+        conn.execute(text("ALTER TABLE events RENAME TO events_old"))
+        # Index names must be free for the new table's indexes
+        for (name,) in conn.execute(text(
+            "SELECT name FROM sqlite_master"
+            " WHERE type = 'index' AND tbl_name = 'events_old' AND sql IS NOT NULL"
+        )).fetchall():
+            conn.execute(text(f'DROP INDEX "{name}"'))
+        Event.__table__.create(bind=conn)
+        columns = ", ".join(c.name for c in Event.__table__.columns)
+        conn.execute(text(f"INSERT INTO events ({columns}) SELECT {columns} FROM events_old"))
+        conn.execute(text("DROP TABLE events_old"))
+
+        top = conn.execute(text(
+            "SELECT coalesce(max(id), 0) FROM"
+            " (SELECT id FROM events UNION ALL SELECT id FROM events_archive)"
+        )).scalar()
+        conn.execute(
+            text("UPDATE events SET id = id + :top WHERE id IN (SELECT id FROM events_archive)"),
+            {"top": top},
+        )
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'events'"))
+        conn.execute(text(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT 'events', coalesce(max(id), 0) FROM"
+            " (SELECT id FROM events UNION ALL SELECT id FROM events_archive)"
+        ))
+    logger.info("Rebuilt events with AUTOINCREMENT ids")
+
+
+def _backfill_materialized():
+    """Populate derived tables that are empty but have source data."""
+    db = SessionLocal()
+    try:
+        has_festival_events = db.query(Event.id).filter(
+            Event.festival_name.isnot(None)
+        ).first()
+        if has_festival_events and not db.query(Festival).first():
+            count = refresh_festivals(db)
+            logger.info("Backfilled %d festivals", count)
+        co_billed = 0
+        if db.query(Event.id).first() and not db.query(CoBillingMember).first():
+            co_billed = backfill_co_billing(db)
+            logger.info("Backfilled %d co_billed relationships", co_billed)
+        if co_billed or (
+            db.query(Relationship.id).first() and not db.query(NodeMetric).filter(NodeMetric.community.isnot(None)).first()
+        ):
+            count = refresh_node_metrics(db)
+            logger.info("Backfilled %d node metrics", count)
+        if co_billed or (
+            db.query(Relationship.id).first() and not db.query(NodeLayout).first()
+        ):
+            count = refresh_node_layouts(db)
+            logger.info("Backfilled %d node layouts", count)
+        if db.query(Score.id).first() and (
+            not db.query(LatestScore).first()
+            or db.query(LatestScore).filter(LatestScore.composite_history.is_(None)).first()
+        ):
+            count = refresh_latest_scores(db)
+            logger.info("Backfilled %d latest scores", count)
+        # Reads never build documents, so fill in any artist that lacks one
+        undocumented = [
+            sid for (sid,) in db.query(Artist.spotify_id)
+            .outerjoin(ArtistDocument, ArtistDocument.artist_id == Artist.spotify_id)
+            .filter(ArtistDocument.artist_id.is_(None))
+        ]
+        if undocumented:
+            count = refresh_artist_documents(db, undocumented)
+            logger.info("Backfilled %d artist documents", count)
+        db.commit()
+    finally:
+        db.close()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     _run_migrations(engine)
+    _backfill_materialized()
     yield
 
 
@@ -62,6 +185,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Routers
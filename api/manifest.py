@@ -0,0 +1,108 @@
+"""
+Change detection for the data files reloaded by /api/rescore.
+
+data_manifest holds, per file, the SHA-1 of its bytes and of each record
+(canonical JSON, keyed by the record's natural key) as last applied. A
+file whose bytes hash the same is not even parsed; otherwise only records
+whose hash is new or different are handed back to be applied. The
+manifest is updated in the caller's transaction once the changes are
+written, so a failed rescore leaves it pointing at the last good state.
+Records the caller could not apply are skipped, and stay pending until a
+later rescore applies them.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from models import DataManifest
+
+FILE_KEY = ""  # record_key of the whole-file row
+_CHUNK = 500
+
+
+@dataclass
+class FileChanges:
+    file: str
+    digest: str
+    previous_digest: str | None
+    records: list[dict]  # everything in the file
+    changed: list[dict]  # records that are new or differ from the manifest
+    hashes: dict[str, str]  # record key -> digest, now
+    stored: dict[str, str]  # record key -> digest, as last applied
+
+    def skip(self, keys) -> None:
+        """
+        Leave records out of the manifest, as if never applied, so the next
+        rescore reads the file again and offers them as changed.
+        """
+        for k in keys:
+            self.hashes.pop(k, None)
+        self.digest = self.previous_digest
+
+
+def file_changes(db: Session, path: str, key: Callable[[dict], str]) -> FileChanges | None:
+    """Records of a JSON list file changed since the last rescore; None if the file is unchanged."""
+    file = os.path.basename(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    previous = db.get(DataManifest, (file, FILE_KEY))
+    if previous is not None and previous.digest == digest:
+        return None
+
+    records = json.loads(raw)
+    hashes, by_key = {}, {}
+    for record in records:
+        k = key(record)
+        hashes[k] = record_digest(record)
+        by_key[k] = record  # a repeated key: the last one wins
+    stored = {
+        k: d for k, d in db.query(DataManifest.record_key, DataManifest.digest).filter(
+            DataManifest.file == file, DataManifest.record_key != FILE_KEY,
+        )
+    }
+    return FileChanges(
+        file=file,
+        digest=digest,
+        previous_digest=previous.digest if previous is not None else None,
+        records=records,
+        changed=[by_key[k] for k, d in hashes.items() if stored.get(k) != d],
+        hashes=hashes,
+        stored=stored,
+    )
+
+
+def record_digest(record: dict) -> str:
+    body = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(body.encode()).hexdigest()
+
+
+def save_changes(db: Session, changes: FileChanges) -> None:
+    """Store the file's current hashes, writing only rows that differ."""
+    file, stored = changes.file, changes.stored
+    added = [
+        {"file": file, "record_key": k, "digest": d}
+        for k, d in changes.hashes.items() if k not in stored
+    ]
+    updated = [
+        {"file": file, "record_key": k, "digest": d}
+        for k, d in changes.hashes.items() if k in stored and stored[k] != d
+    ]
+    removed = [k for k in stored if k not in changes.hashes]
+    if changes.digest is not None and changes.digest != changes.previous_digest:
+        file_row = {"file": file, "record_key": FILE_KEY, "digest": changes.digest}
+        (updated if changes.previous_digest is not None else added).append(file_row)
+
+    if added:
+        db.execute(insert(DataManifest), added)
+    if updated:
+        db.execute(update(DataManifest), updated)
+    for i in range(0, len(removed), _CHUNK):
+        db.query(DataManifest).filter(
+            DataManifest.file == file, DataManifest.record_key.in_(removed[i:i + _CHUNK]),
+        ).delete(synchronize_session=False)
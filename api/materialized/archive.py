@@ -0,0 +1,42 @@
+"""
+Past-event retention.
+
+Events older than the retention window are moved from the hot events table
+into events_archive, so upcoming, nearby and festival queries only ever scan
+a small table. Archived rows keep their ids and bill keys, so tour history
+and the co-billing graph stay intact.
+"""
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from materialized.versions import bump_version
+from models import Event, EventArchive
+
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", "30"))
+
+
+def archive_past_events(db: Session, retention_days: int = EVENT_RETENTION_DAYS) -> int:
+    """
+    Move events that ended more than retention_days ago into events_archive.
+
+    One INSERT ... SELECT plus one DELETE, inside the caller's transaction.
+    Returns the number of events archived.
+    """
+    cutoff = date.today() - timedelta(days=retention_days)
+    columns = [c.name for c in Event.__table__.columns]
+    moved = db.execute(
+        insert(EventArchive).from_select(
+            columns + ["archived_on"],
+            select(
+                *(Event.__table__.c[name] for name in columns),
+                literal(date.today()),
+            ).where(Event.event_date < cutoff),
+        )
+    ).rowcount
+    db.execute(delete(Event).where(Event.event_date < cutoff))
+    if moved:
+        bump_version(db, "events")
+    return moved
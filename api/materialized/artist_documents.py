@@ -0,0 +1,349 @@
+"""
+Denormalized artist detail documents.
+
+GET /api/artists/{spotify_id} assembles its response from six tables, but
+those inputs only change when a seed, rescore, pipeline run or event
+refresh writes them. artist_documents keeps the finished JSON body per
+artist, with a SHA-1 ETag, so a page view is one primary-key read. Writers
+call refresh_artist_documents for the artists they touched (plus the
+artists whose related list shows them); unchanged documents are not
+rewritten. Reads never write. Documents carry the day they were built on,
+and events that have passed since then are dropped from upcoming_events
+when an older document is read, until the next writer run rebuilds it.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+
+from models import (
+    Artist,
+    ArtistDocument,
+    Event,
+    Label,
+    LatestScore,
+    Producer,
+    Relationship,
+)
+from schemas import (
+    EventResponse,
+    LabelContactInfo,
+    ProducerCredit,
+    RelatedArtistBrief,
+    ScoreResponse,
+    SnapshotResponse,
+)
+from timeseries import HISTORY_MAX_POINTS, lttb, score_metric, snapshot_metric
+
+DETAIL_FIELDS = (
+    "spotify_id", "name", "genres", "image_url", "current_label",
+    "current_manager", "current_management_co", "booking_agency",
+    "booking_agent", "youtube_channel_id", "active", "snapshots", "scores",
+    "upcoming_events", "label_contact", "producers", "related_artists",
+)
+_CHUNK = 500
+
+
+def build_artist_detail(db: Session, artist: Artist) -> dict:
+    """The artist detail response for one artist (see build_artist_details)."""
+    return build_artist_details(db, [artist])[artist.spotify_id]
+
+
+def build_artist_details(db: Session, artists: list[Artist]) -> dict[str, dict]:
+    """
+    Artist detail responses keyed by spotify_id: snapshots, scores, upcoming
+    events, label contact, producers and related artists. Histories are
+    downsampled to at most HISTORY_MAX_POINTS points each.
+
+    Costs a fixed number of queries however many artists are passed and
+    however connected they are: pass artists with snapshots and scores
+    eager-loaded, and every other lookup is one IN query per _CHUNK keys,
+    grouped per artist in memory.
+    """
+    ids = [artist.spotify_id for artist in artists]
+    names = sorted({artist.name for artist in artists})
+
+    # Upcoming events
+    events: dict[str, list] = defaultdict(list)
+    for chunk in _chunks(ids):
+        for e in (
+            db.query(Event)
+            .filter(Event.artist_id.in_(chunk), Event.event_date >= date.today())
+            .order_by(Event.event_date, Event.id)
+        ):
+            events[e.artist_id].append(EventResponse.model_validate(e))
+
+    # Label contact info; compound labels like "Epic Records / Nuclear Blast"
+    # fall back to the first
+    label_names = {
+        artist.spotify_id: (artist.current_label, artist.current_label.split("/")[0].strip())
+        for artist in artists if artist.current_label
+    }
+    labels = {}
+    for chunk in _chunks(sorted({n for pair in label_names.values() for n in pair})):
+        labels.update((label.name, label) for label in db.query(Label).filter(Label.name.in_(chunk)))
+
+    # Producer credits and shared_producer links, keyed by artist name
+    credits: dict[str, list[str]] = defaultdict(list)
+    related_names: dict[str, dict[str, None]] = defaultdict(dict)
+    for chunk in _chunks(names):
+        for source, target in (
+            db.query(Relationship.source_id, Relationship.target_id)
+            .filter(
+                Relationship.source_id.in_(chunk),
+                Relationship.relationship_type == "produced_by",
+            )
+            .order_by(Relationship.id)
+        ):
+            credits[source].append(target)
+    studios = {}
+    for chunk in _chunks(sorted({p for targets in credits.values() for p in targets})):
+        studios.update(
+            db.query(Producer.name, Producer.studio_name).filter(Producer.name.in_(chunk))
+        )
+    shared = {}  # by id: a link can match from both ends, in two chunks
+    for chunk in _chunks(names):
+        shared.update(
+            (rel_id, (source, target))
+            for rel_id, source, target in db.query(
+                Relationship.id, Relationship.source_id, Relationship.target_id
+            ).filter(
+                or_(Relationship.source_id.in_(chunk), Relationship.target_id.in_(chunk)),
+                Relationship.relationship_type == "shared_producer",
+            )
+        )
+    wanted = set(names)
+    for rel_id in sorted(shared):
+        source, target = shared[rel_id]
+        if source in wanted:
+            related_names[source][target] = None
+        if target in wanted:
+            related_names[target][source] = None
+    related_by_name: dict[str, tuple] = {}
+    for chunk in _chunks(sorted({n for others in related_names.values() for n in others})):
+        for target_artist, latest in (
+            db.query(Artist, LatestScore)
+            .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+            .filter(Artist.name.in_(chunk))
+        ):
+            related_by_name.setdefault(target_artist.name, (target_artist, latest))
+
+    details = {}
+    for artist in artists:
+        snapshots, scores = history_series(artist.snapshots, artist.scores)
+
+        label_contact = None
+        if artist.spotify_id in label_names:
+            full, first = label_names[artist.spotify_id]
+            label = labels.get(full) or labels.get(first)
+            if label and (label.key_contact or label.contact_title):
+                label_contact = LabelContactInfo(
+                    label_name=label.name,
+                    key_contact=label.key_contact,
+                    contact_title=label.contact_title,
+                )
+
+        related_artists = []
+        for other_name in related_names.get(artist.name, ()):
+            if other_name not in related_by_name:
+                continue
+            target_artist, latest = related_by_name[other_name]
+            related_artists.append(RelatedArtistBrief(
+                spotify_id=target_artist.spotify_id,
+                name=target_artist.name,
+                image_url=target_artist.image_url,
+                composite=latest.composite if latest else None,
+                grade=latest.grade if latest else None,
+            ))
+
+        details[artist.spotify_id] = {
+            "spotify_id": artist.spotify_id,
+            "name": artist.name,
+            "genres": json.loads(artist.genres) if artist.genres else [],
+            "image_url": artist.image_url,
+            "current_label": artist.current_label,
+            "current_manager": artist.current_manager,
+            "current_management_co": artist.current_management_co,
+            "booking_agency": artist.booking_agency,
+            "booking_agent": artist.booking_agent,
+            "youtube_channel_id": artist.youtube_channel_id,
+            "active": artist.active,
+            "snapshots": snapshots,
+            "scores": scores,
+            "upcoming_events": events.get(artist.spotify_id, []),
+            "label_contact": label_contact,
+            "producers": [
+                ProducerCredit(name=name, studio=studios.get(name))
+                for name in credits.get(artist.name, ())
+            ],
+            "related_artists": related_artists,
+        }
+    return details
+
+
+def history_series(
+    snapshots, scores, max_points: int = HISTORY_MAX_POINTS
+) -> tuple[list[SnapshotResponse], list[ScoreResponse]]:
+    """Snapshot and score rows in date order, downsampled for charts."""
+    snapshots = sorted(snapshots, key=lambda s: s.snapshot_date)
+    snapshots = lttb(
+        snapshots, max_points, x=lambda s: s.snapshot_date, y=snapshot_metric(snapshots),
+    )
+    scores = lttb(
+        sorted(scores, key=lambda s: s.score_date),
+        max_points, x=lambda s: s.score_date, y=score_metric,
+    )
+    return (
+        [SnapshotResponse.model_validate(s) for s in snapshots],
+        [ScoreResponse.model_validate(s) for s in scores],
+    )
+
+
+def refresh_artist_documents(db: Session, artist_ids=None) -> int:
+    """
+    Rebuild documents for the given artists (all when None).
+
+    Runs inside the caller's transaction. Documents whose content is
+    unchanged are left alone. Returns the number of documents written.
+    """
+    db.flush()  # sessions don't autoflush; pending writes must be visible
+    if artist_ids is None:
+        ids = [sid for (sid,) in db.query(Artist.spotify_id).order_by(Artist.spotify_id)]
+    else:
+        ids = sorted(set(artist_ids))
+    written = 0
+    for chunk in _chunks(ids):
+        stored = {
+            doc.artist_id: doc
+            for doc in db.query(ArtistDocument).filter(ArtistDocument.artist_id.in_(chunk))
+        }
+        artists = (
+            db.query(Artist)
+            .options(selectinload(Artist.snapshots), selectinload(Artist.scores))
+            .filter(Artist.spotify_id.in_(chunk))
+            .all()
+        )
+        details = build_artist_details(db, artists)
+        for artist in artists:
+            written += _store(db, artist, details[artist.spotify_id], stored.get(artist.spotify_id))
+    db.flush()
+    return written
+
+
+def get_artist_document(db: Session, spotify_id: str) -> tuple[str, str] | None:
+    """
+    The detail body and ETag for an artist as of today, None if the artist
+    does not exist. An artist no writer has built a document for yet is
+    rendered in memory; nothing is stored.
+    """
+    doc = db.get(ArtistDocument, spotify_id)
+    if doc is not None:
+        return current_document(doc)
+    artist = (
+        db.query(Artist)
+        .options(selectinload(Artist.snapshots), selectinload(Artist.scores))
+        .filter(Artist.spotify_id == spotify_id)
+        .first()
+    )
+    return serialize_detail(build_artist_detail(db, artist)) if artist else None
+
+
+def get_artist_documents(db: Session, artist_ids) -> dict[str, str]:
+    """
+    Batch form of get_artist_document: detail bodies keyed by artist ID,
+    unknown IDs left out. Artists without a document are built together,
+    with the same fixed set of queries per chunk as refresh_artist_documents.
+    """
+    ids = sorted(set(artist_ids))
+    bodies: dict[str, str] = {}
+    for chunk in _chunks(ids):
+        bodies.update(
+            (doc.artist_id, current_document(doc)[0])
+            for doc in db.query(ArtistDocument).filter(ArtistDocument.artist_id.in_(chunk))
+        )
+    missing = [i for i in ids if i not in bodies]
+    for chunk in _chunks(missing):
+        artists = (
+            db.query(Artist)
+            .options(selectinload(Artist.snapshots), selectinload(Artist.scores))
+            .filter(Artist.spotify_id.in_(chunk))
+            .all()
+        )
+        bodies.update(
+            (spotify_id, serialize_detail(detail)[0])
+            for spotify_id, detail in build_artist_details(db, artists).items()
+        )
+    return bodies
+
+
+def current_document(doc: ArtistDocument) -> tuple[str, str]:
+    """A stored document's body and ETag, without events that have since passed."""
+    today = date.today()
+    if doc.built_on >= today:
+        return doc.document, doc.etag
+    detail = json.loads(doc.document)
+    upcoming = [e for e in detail["upcoming_events"] if e["event_date"] >= today.isoformat()]
+    if len(upcoming) == len(detail["upcoming_events"]):
+        return doc.document, doc.etag
+    detail["upcoming_events"] = upcoming
+    return serialize_detail(detail)
+
+
+def serialize_detail(detail: dict) -> tuple[str, str]:
+    """Compact JSON body for a detail dict, and its SHA-1 ETag."""
+    body = json.dumps(jsonable_encoder(detail), ensure_ascii=False, separators=(",", ":"))
+    return body, hashlib.sha1(body.encode()).hexdigest()
+
+
+def with_related_artists(db: Session, artist_ids) -> set[str]:
+    """
+    The artists plus every artist whose related list includes one of them.
+
+    Related-artist entries show the other artist's latest score, so a score
+    change must also rebuild the neighbours' documents.
+    """
+    ids = set(artist_ids)
+    names = set()
+    for chunk in _chunks(sorted(ids)):
+        names.update(
+            name for (name,) in db.query(Artist.name).filter(Artist.spotify_id.in_(chunk))
+        )
+    # Relationships are keyed by artist name
+    neighbours = set()
+    for chunk in _chunks(sorted(names)):
+        for source, target in db.query(Relationship.source_id, Relationship.target_id).filter(
+            Relationship.relationship_type == "shared_producer",
+            or_(Relationship.source_id.in_(chunk), Relationship.target_id.in_(chunk)),
+        ):
+            neighbours.update((source, target))
+    for chunk in _chunks(sorted(neighbours - names)):
+        ids.update(
+            sid for (sid,) in db.query(Artist.spotify_id).filter(Artist.name.in_(chunk))
+        )
+    return ids
+
+
+def _store(db: Session, artist: Artist, detail: dict, doc: ArtistDocument | None) -> int:
+    """Serialize one artist's detail into its document row; 1 if it changed."""
+    body, etag = serialize_detail(detail)
+    today = date.today()
+    if doc is None:
+        db.add(ArtistDocument(
+            artist_id=artist.spotify_id, document=body, etag=etag, built_on=today,
+        ))
+        return 1
+    doc.built_on = today
+    if doc.etag == etag:
+        return 0
+    doc.document = body
+    doc.etag = etag
+    return 1
+
+
+def _chunks(items: list, size: int = _CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
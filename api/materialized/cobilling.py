@@ -0,0 +1,185 @@
+"""
+Co-billing graph maintenance.
+
+Artists who share a bill -- the same festival edition, or the same venue on
+the same night -- get a co_billed relationship whose weight counts the bills
+they shared. Bill membership is kept in co_billing_members (a sparse
+artist x bill matrix). When events are written, only the bills they touch
+are re-read, membership is diffed, and edge weights are adjusted by the
+pairs that actually appeared or disappeared.
+"""
+from collections import Counter, defaultdict
+from datetime import date
+
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.orm import Session
+
+from materialized.versions import bump_version
+from models import Artist, CoBillingMember, Event, EventArchive, Relationship
+
+CO_BILLED = "co_billed"
+_CHUNK = 500  # keeps IN lists well under driver parameter limits
+
+
+def billing_key(
+    event_date: date,
+    venue_name: str | None,
+    city: str | None,
+    festival_name: str | None,
+) -> str | None:
+    """Key shared by every event on the same bill, or None if unknown."""
+    if festival_name:
+        return f"festival:{festival_name}:{event_date.year}"
+    if venue_name:
+        return f"venue:{event_date.isoformat()}:{venue_name}:{city or ''}"
+    return None
+
+
+def active_bill_keys(db: Session, since: date) -> set[str]:
+    """Bills with members playing on or after `since`."""
+    return {
+        key for (key,) in db.query(CoBillingMember.group_key)
+        .filter(CoBillingMember.last_date >= since)
+        .distinct()
+    }
+
+
+def sync_co_billing(db: Session, group_keys: set[str]) -> int:
+    """
+    Bring membership and co_billed edges up to date for the given bills.
+
+    Cost is proportional to the touched bills, not the whole calendar: bills
+    whose lineup is unchanged produce no edge writes. Runs inside the
+    caller's transaction. Returns the number of edges created, reweighted
+    or removed.
+    """
+    keys = sorted(k for k in group_keys if k)
+    if not keys:
+        return 0
+
+    current: dict[str, dict[str, date]] = defaultdict(dict)
+    stored: dict[str, dict[str, date]] = defaultdict(dict)
+    for chunk in _chunks(keys):
+        # Archived events still count: a bill keeps its past lineup
+        for table in (Event, EventArchive):
+            for key, artist_id, last_date in (
+                db.query(table.bill_key, table.artist_id, func.max(table.event_date))
+                .filter(table.bill_key.in_(chunk))
+                .group_by(table.bill_key, table.artist_id)
+            ):
+                seen = current[key].get(artist_id)
+                current[key][artist_id] = max(seen, last_date) if seen else last_date
+        for member in db.query(CoBillingMember).filter(
+            CoBillingMember.group_key.in_(chunk)
+        ):
+            stored[member.group_key][member.artist_id] = member.last_date
+
+    pair_deltas: Counter = Counter()
+    added, removed, moved = [], [], []
+    for key in keys:
+        old, new = stored.get(key, {}), current.get(key, {})
+        joined = new.keys() - old.keys()
+        left = old.keys() - new.keys()
+        # Every new pair includes a joining artist, every lost pair a leaving one
+        for pair in {_pair(a, b) for a in joined for b in new if b != a}:
+            pair_deltas[pair] += 1
+        for pair in {_pair(a, b) for a in left for b in old if b != a}:
+            pair_deltas[pair] -= 1
+        added += [
+            {"group_key": key, "artist_id": a, "last_date": new[a]} for a in joined
+        ]
+        removed += [(key, a) for a in left]
+        moved += [
+            (key, a, new[a]) for a in new.keys() & old.keys() if new[a] != old[a]
+        ]
+
+    for chunk in _chunks(removed):
+        db.query(CoBillingMember).filter(
+            tuple_(CoBillingMember.group_key, CoBillingMember.artist_id).in_(chunk)
+        ).delete(synchronize_session=False)
+    if added:
+        db.execute(insert(CoBillingMember), added)
+    for key, artist_id, last_date in moved:
+        db.query(CoBillingMember).filter(
+            CoBillingMember.group_key == key, CoBillingMember.artist_id == artist_id,
+        ).update({"last_date": last_date}, synchronize_session=False)
+
+    pair_deltas = Counter({p: d for p, d in pair_deltas.items() if d})
+    if not pair_deltas:
+        return 0
+    return _apply_edge_deltas(db, pair_deltas)
+
+
+def backfill_co_billing(db: Session) -> int:
+    """Key existing events and build the co-billing graph from scratch."""
+    for event in db.query(Event).filter(Event.bill_key.is_(None)):
+        event.bill_key = billing_key(
+            event.event_date, event.venue_name, event.city, event.festival_name
+        )
+    db.flush()
+    keys = {
+        key for (key,) in db.query(Event.bill_key)
+        .filter(Event.bill_key.isnot(None))
+        .distinct()
+    }
+    return sync_co_billing(db, keys)
+
+
+def _apply_edge_deltas(db: Session, pair_deltas: Counter) -> int:
+    """Adjust co_billed edge weights by per-pair deltas (artist ID pairs)."""
+    artist_ids = sorted({a for pair in pair_deltas for a in pair})
+    names: dict[str, str] = {}
+    for chunk in _chunks(artist_ids):
+        names.update(
+            db.query(Artist.spotify_id, Artist.name).filter(Artist.spotify_id.in_(chunk))
+        )
+
+    # Relationships are keyed by artist name; order each pair canonically
+    name_deltas: Counter = Counter()
+    for (a, b), delta in pair_deltas.items():
+        if a in names and b in names:
+            name_deltas[_pair(names[a], names[b])] += delta
+
+    pairs = sorted(name_deltas)
+    edges = {}
+    for chunk in _chunks(pairs):
+        for rel in db.query(Relationship).filter(
+            Relationship.relationship_type == CO_BILLED,
+            tuple_(Relationship.source_id, Relationship.target_id).in_(chunk),
+        ):
+            edges[(rel.source_id, rel.target_id)] = rel
+
+    new_edges = []
+    for pair, delta in name_deltas.items():
+        rel = edges.get(pair)
+        if rel is None:
+            if delta > 0:
+                new_edges.append({
+                    "source_type": "artist",
+                    "source_id": pair[0],
+                    "target_type": "artist",
+                    "target_id": pair[1],
+                    "relationship_type": CO_BILLED,
+                    "weight": float(delta),
+                })
+            continue
+        weight = (rel.weight or 0) + delta
+        if weight <= 0:
+            db.delete(rel)
+        else:
+            rel.weight = weight
+    if new_edges:
+        db.execute(insert(Relationship), new_edges)
+    db.flush()
+    if name_deltas:
+        bump_version(db, "relationships")
+    return len(name_deltas)
+
+
+def _pair(a: str, b: str) -> tuple[str, str]:
+    return (a, b) if a < b else (b, a)
+
+
+def _chunks(items: list, size: int = _CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,85 @@
+"""
+Festival rollup maintenance.
+
+Aggregates upcoming festival appearances in SQL (date span, location,
+distinct lineup) and stores one row per festival in the festivals table,
+so /api/events/festivals is a single indexed read.
+"""
+import json
+from datetime import date
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models import Artist, Event, Festival
+
+
+def refresh_festivals(db: Session, festival_names: set[str] | None = None) -> int:
+    """
+    Rebuild festival rows from upcoming events.
+
+    Recomputes only the named festivals when festival_names is given,
+    otherwise the whole table. Runs inside the caller's transaction
+    (no commit). Returns the number of festival rows written.
+    """
+    upcoming = [Event.festival_name.isnot(None), Event.event_date >= date.today()]
+    stale = db.query(Festival)
+    if festival_names is not None:
+        if not festival_names:
+            return 0
+        names = sorted(festival_names)
+        upcoming.append(Event.festival_name.in_(names))
+        stale = stale.filter(Festival.festival_name.in_(names))
+    stale.delete(synchronize_session=False)
+
+    spans = (
+        db.query(
+            Event.festival_name,
+            func.min(Event.event_date),
+            func.max(Event.event_date),
+        )
+        .filter(*upcoming)
+        .group_by(Event.festival_name)
+        .all()
+    )
+
+    # Location comes from the festival's earliest date
+    first_date = func.min(Event.event_date)
+    locations: dict[str, str] = {}
+    for name, city, region, country, _ in (
+        db.query(
+            Event.festival_name, Event.city, Event.region, Event.country, first_date,
+        )
+        .filter(*upcoming)
+        .group_by(Event.festival_name, Event.city, Event.region, Event.country)
+        .order_by(Event.festival_name, first_date)
+    ):
+        if name not in locations:
+            locations[name] = ", ".join(p for p in [city, region, country] if p)
+
+    # Distinct lineup per festival, in order of first appearance
+    lineups: dict[str, list[str]] = {}
+    for name, artist_name in (
+        db.query(Event.festival_name, Artist.name)
+        .join(Artist, Event.artist_id == Artist.spotify_id)
+        .filter(*upcoming)
+        .group_by(Event.festival_name, Artist.name)
+        .order_by(Event.festival_name, first_date, func.min(Event.id))
+    ):
+        lineups.setdefault(name, []).append(artist_name)
+
+    rows = [
+        {
+            "festival_name": name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "location": locations.get(name, ""),
+            "artists": json.dumps(lineups[name]),
+            "artist_count": len(lineups[name]),
+        }
+        for name, start_date, end_date in spans
+        if name in lineups
+    ]
+    if rows:
+        db.execute(insert(Festival), rows)
+    return len(rows)
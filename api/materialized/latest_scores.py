@@ -0,0 +1,156 @@
+"""
+Latest-score maintenance.
+
+latest_scores holds one row per artist mirroring that artist's most recent
+Score. Every code path that writes scores calls refresh_latest_scores for
+the artists it touched, in the same transaction, so readers get the current
+score with a primary-key or indexed lookup instead of a MAX(score_date)
+aggregate over the whole score history.
+
+Each row also carries sparklines: the last SPARKLINE_POINTS composites and
+trajectories. A new score appends to them and a rescore of the same row
+replaces the last element, so a score write costs O(1) extra work. Only
+rows that are new, or whose latest score moved backwards (scores deleted),
+re-read their history.
+"""
+import json
+from collections import defaultdict
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from materialized.versions import bump_version
+from models import LatestScore, Score
+
+SCORE_FIELDS = (
+    "score_date",
+    "trajectory",
+    "industry_signal",
+    "engagement",
+    "release_positioning",
+    "composite",
+    "grade",
+    "segment_tag",
+)
+SPARKLINE_POINTS = 12
+_CHUNK = 500
+
+
+def refresh_latest_scores(db: Session, artist_ids=None) -> int:
+    """
+    Re-derive latest_scores rows for the given artists (all when None).
+
+    Runs inside the caller's transaction. Returns the number of rows
+    inserted, updated or deleted.
+    """
+    db.flush()  # sessions don't autoflush; pending score writes must be visible
+    if artist_ids is None:
+        changed = _refresh(db, None)
+    else:
+        ids = sorted(set(artist_ids))
+        changed = sum(_refresh(db, ids[i:i + _CHUNK]) for i in range(0, len(ids), _CHUNK))
+    if changed:
+        bump_version(db, "scores")
+    return changed
+
+
+def _refresh(db: Session, ids: list[str] | None) -> int:
+    max_dates = db.query(Score.artist_id, func.max(Score.score_date).label("max_date"))
+    existing = db.query(LatestScore)
+    if ids is not None:
+        max_dates = max_dates.filter(Score.artist_id.in_(ids))
+        existing = existing.filter(LatestScore.artist_id.in_(ids))
+    max_dates = max_dates.group_by(Score.artist_id).subquery()
+
+    latest = db.query(Score).join(
+        max_dates,
+        and_(
+            Score.artist_id == max_dates.c.artist_id,
+            Score.score_date == max_dates.c.max_date,
+        ),
+    )
+    current = {row.artist_id: row for row in existing}
+
+    changed = 0
+    reseed = []
+    for score in latest:
+        row = current.pop(score.artist_id, None)
+        if row is None:
+            row = LatestScore(artist_id=score.artist_id)
+            db.add(row)
+            reseed.append(row)
+        elif row.composite_history is None or score.score_date < row.score_date:
+            reseed.append(row)
+        elif row.score_id == score.id:
+            if all(getattr(row, f) == getattr(score, f) for f in SCORE_FIELDS):
+                continue
+            _push(row, score, replace_last=True)
+        else:
+            _push(row, score, replace_last=False)
+        row.score_id = score.id
+        for field in SCORE_FIELDS:
+            setattr(row, field, getattr(score, field))
+        changed += 1
+    _reseed_sparklines(db, reseed)
+
+    # Artists whose scores are all gone
+    for row in current.values():
+        db.delete(row)
+        changed += 1
+
+    db.flush()
+    return changed
+
+
+def sparklines(row: LatestScore | None) -> dict[str, list]:
+    """Sparkline arrays of a latest-score row, for DashboardArtist fields."""
+    return {
+        "composite_history": json.loads(row.composite_history or "[]") if row else [],
+        "trajectory_history": json.loads(row.trajectory_history or "[]") if row else [],
+    }
+
+
+def _push(row: LatestScore, score: Score, replace_last: bool) -> None:
+    """Append (or overwrite the last point with) a score's values."""
+    for column, value in (
+        ("composite_history", score.composite),
+        ("trajectory_history", score.trajectory),
+    ):
+        points = json.loads(getattr(row, column) or "[]")
+        value = float(value) if value is not None else None
+        if replace_last and points:
+            points[-1] = value
+        else:
+            points.append(value)
+        setattr(row, column, json.dumps(points[-SPARKLINE_POINTS:]))
+
+
+def _reseed_sparklines(db: Session, rows: list[LatestScore]) -> None:
+    """Rebuild sparklines from score history for rows that cannot be pushed."""
+    recent: dict[str, list] = defaultdict(list)
+    ids = [row.artist_id for row in rows]
+    for i in range(0, len(ids), _CHUNK):
+        # Only each artist's last SPARKLINE_POINTS scores, newest ranked first
+        ranked = (
+            db.query(
+                Score.artist_id,
+                Score.score_date,
+                Score.composite,
+                Score.trajectory,
+                func.row_number().over(
+                    partition_by=Score.artist_id, order_by=Score.score_date.desc()
+                ).label("recency"),
+            )
+            .filter(Score.artist_id.in_(ids[i:i + _CHUNK]))
+            .subquery()
+        )
+        for artist_id, composite, trajectory in (
+            db.query(ranked.c.artist_id, ranked.c.composite, ranked.c.trajectory)
+            .filter(ranked.c.recency <= SPARKLINE_POINTS)
+            .order_by(ranked.c.artist_id, ranked.c.score_date)
+        ):
+            recent[artist_id].append((composite, trajectory))
+    for row in rows:
+        points = recent[row.artist_id]
+        row.composite_history = json.dumps([c for c, _ in points])
+        row.trajectory_history = json.dumps([t for _, t in points])
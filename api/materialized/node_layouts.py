@@ -0,0 +1,200 @@
+"""
+Force-directed layout of the relationships graph, computed server side.
+
+Positions are recomputed whenever relationships are written and stored
+per node in node_layouts; /api/network/graph returns them as x/y so
+clients can draw the graph without running a simulation.
+
+The layout is Fruchterman-Reingold: links pull their ends together,
+every pair of nodes pushes apart, and the step size cools each
+iteration. The repulsion is vectorized with NumPy: all pairs exactly for
+small graphs, Barnes-Hut beyond EXACT_REPULSION_NODES, where distant
+nodes are grouped into grid cells (a quadtree flattened into levels) and
+repel as one mass at their centre.
+
+Relayouts are warm-started: stored positions are the starting point,
+new nodes start beside their placed neighbours, and the step size is
+kept small, so an update nudges the picture instead of redrawing it.
+"""
+import math
+import random
+import zlib
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from indexes.graph import GraphIndex, relationship_rows
+from models import NodeLayout
+
+COLD_ITERATIONS = 300
+WARM_ITERATIONS = 30
+ITERATION_BUDGET = 1_000_000  # nodes x iterations; large graphs get fewer, down to 30
+COLD_STEP = 0.1  # largest move per iteration, in layout units (the graph spans ~1)
+WARM_STEP = 0.002
+GRAVITY = 0.05  # pull towards the origin keeps disconnected parts in view
+EXACT_REPULSION_NODES = 1000
+_PRECISION = 5
+
+
+def refresh_node_layouts(db: Session) -> int:
+    """
+    Relayout the graph, warm-started from the stored positions.
+
+    Runs inside the caller's transaction (no commit), after the
+    relationship writes are flushed. Returns the number of rows written.
+    """
+    db.flush()
+    graph = GraphIndex(relationship_rows(db))
+    current = {row.node_key: row for row in db.query(NodeLayout)}
+    previous = {key: (row.x, row.y) for key, row in current.items()}
+    positions = layout(graph, previous)
+
+    new_rows, changed = [], 0
+    for key, (x, y) in zip(graph.keys, positions):
+        x, y = round(x, _PRECISION), round(y, _PRECISION)
+        row = current.pop(key, None)
+        if row is None:
+            new_rows.append({"node_key": key, "x": x, "y": y})
+        elif (row.x, row.y) != (x, y):
+            row.x, row.y = x, y
+            changed += 1
+    for row in current.values():
+        db.delete(row)
+    if new_rows:
+        db.execute(insert(NodeLayout), new_rows)
+    db.flush()
+    return changed + len(new_rows) + len(current)
+
+
+def layout(
+    graph: GraphIndex, previous: dict[str, tuple[float, float]] | None = None
+) -> list[tuple[float, float]]:
+    """Positions for every node, starting from previous where known."""
+    n = len(graph)
+    if n == 0:
+        return []
+    previous = previous or {}
+    positions = _initial_positions(graph, previous)
+    warm = sum(1 for key in graph.keys if key in previous) >= n / 2
+    iterations = WARM_ITERATIONS if warm else max(30, min(COLD_ITERATIONS, ITERATION_BUDGET // n))
+    step = WARM_STEP if warm else COLD_STEP
+
+    return _simulate(graph, positions, iterations, step)
+
+
+def _initial_positions(
+    graph: GraphIndex, previous: dict[str, tuple[float, float]]
+) -> list[tuple[float, float]]:
+    positions: list[tuple[float, float] | None] = [previous.get(key) for key in graph.keys]
+    placed = [p for p in positions if p is not None]
+    # Repeated passes let chains of new nodes grow out from placed ones
+    for _ in range(3):
+        for node in range(len(graph)):
+            if positions[node] is not None:
+                continue
+            anchors = [positions[m] for m in graph.neighbors(node) if positions[m] is not None]
+            if anchors:
+                positions[node] = _jitter(
+                    graph.keys[node],
+                    sum(x for x, _ in anchors) / len(anchors),
+                    sum(y for _, y in anchors) / len(anchors),
+                    0.05,
+                )
+    # Anything still unplaced (a cold start, a new component) starts on a disc
+    radius = 0.5 if not placed else max(max(abs(x), abs(y)) for x, y in placed)
+    return [
+        p if p is not None else _jitter(graph.keys[node], 0.0, 0.0, radius)
+        for node, p in enumerate(positions)
+    ]
+
+
+def _jitter(key: str, x: float, y: float, radius: float) -> tuple[float, float]:
+    # Seeded by the node key so the same graph always lays out the same way
+    rng = random.Random(zlib.crc32(key.encode()))
+    angle, distance = rng.uniform(0, 2 * math.pi), radius * math.sqrt(rng.random())
+    return x + distance * math.cos(angle), y + distance * math.sin(angle)
+
+
+def _simulate(graph, positions, iterations, step) -> list[tuple[float, float]]:
+    n = len(graph)
+    k = 1.0 / math.sqrt(n)  # ideal link length for a unit-area layout
+    pos = np.asarray(positions, dtype=float)
+    sources = np.frombuffer(graph.link_source, dtype=np.int32)
+    targets = np.frombuffer(graph.link_target, dtype=np.int32)
+    weights = np.log1p(np.frombuffer(graph.link_weight, dtype=float))[:, None]
+
+    for i in range(iterations):
+        if n <= EXACT_REPULSION_NODES:
+            displacement = _repulsion_exact(pos, k)
+        else:
+            displacement = _repulsion_barnes_hut(pos, k)
+        delta = pos[sources] - pos[targets]
+        distance = np.maximum(np.linalg.norm(delta, axis=1, keepdims=True), 1e-9)
+        pull = delta * distance / k * weights
+        for axis in (0, 1):
+            displacement[:, axis] += np.bincount(targets, pull[:, axis], n)
+            displacement[:, axis] -= np.bincount(sources, pull[:, axis], n)
+        displacement -= GRAVITY * pos * n * k
+
+        # Move at most the current step size, which cools linearly
+        limit = step * (1.0 - i / iterations)
+        length = np.maximum(np.linalg.norm(displacement, axis=1, keepdims=True), 1e-9)
+        pos += displacement / length * np.minimum(length, limit)
+    return [(float(x), float(y)) for x, y in pos]
+
+
+def _repulsion_exact(pos, k):
+    delta = pos[:, None, :] - pos[None, :, :]
+    distance2 = np.maximum((delta ** 2).sum(axis=2), 1e-12)
+    np.fill_diagonal(distance2, np.inf)
+    return (delta * (k * k / distance2)[:, :, None]).sum(axis=1)
+
+
+def _repulsion_barnes_hut(pos, k):
+    """
+    Repulsion with distant nodes approximated by grid-cell centres of mass.
+
+    At each level of a quadtree over the bounding square, a node interacts
+    with the cells that are children of its parent cell's neighbours but
+    not neighbours of its own cell (the usual interaction list); at the
+    finest level, where cells hold about one node, it also interacts with
+    its own and adjacent cells.
+    """
+    n = len(pos)
+    low = pos.min(axis=0)
+    size = max(float((pos.max(axis=0) - low).max()), 1e-9) * (1 + 1e-9)
+    depth = max(2, math.ceil(math.log(n, 4)) + 1)
+    displacement = np.zeros_like(pos)
+
+    for level in range(2, depth + 1):
+        side = 1 << level
+        cell = np.minimum(((pos - low) / size * side).astype(np.int64), side - 1)
+        index = cell[:, 0] * side + cell[:, 1]
+        mass = np.bincount(index, minlength=side * side).astype(float)
+        centre = np.stack([
+            np.bincount(index, weights=pos[:, axis], minlength=side * side) for axis in (0, 1)
+        ], axis=1) / np.maximum(mass, 1)[:, None]
+
+        # The 6x6 children of the parent's neighbourhood, for every node at once
+        parent = cell // 2
+        children = np.arange(6) - 2
+        other_x = np.repeat(2 * parent[:, :1] + children, 6, axis=1)
+        other_y = np.tile(2 * parent[:, 1:] + children, (1, 6))
+        use = (other_x >= 0) & (other_x < side) & (other_y >= 0) & (other_y < side)
+        if level < depth:
+            use &= (np.abs(other_x - cell[:, :1]) > 1) | (np.abs(other_y - cell[:, 1:]) > 1)
+        cells = np.where(use, other_x * side + other_y, 0)
+        cell_mass = np.where(use, mass[cells], 0.0)
+        cell_centre = centre[cells]
+        if level == depth:
+            # Own cell at the finest level: its other members only
+            own = use & (cells == index[:, None])
+            rest = cell_mass - own
+            others = (cell_centre * cell_mass[..., None] - pos[:, None, :]) / np.maximum(rest, 1)[..., None]
+            cell_centre = np.where(own[..., None], others, cell_centre)
+            cell_mass = rest
+        delta = pos[:, None, :] - cell_centre
+        distance2 = np.maximum((delta ** 2).sum(axis=2), 1e-12)
+        displacement += (delta * (cell_mass * k * k / distance2)[..., None]).sum(axis=1)
+    return displacement
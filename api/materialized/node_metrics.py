@@ -0,0 +1,252 @@
+"""
+Centrality metrics for the relationships graph.
+
+Recomputed whenever relationships are written and stored per node in
+node_metrics, so node sizing and /api/network/rankings only read them:
+
+- degree: number of links, and weighted degree (co_billed links count
+  their number of shared bills, every other link 1);
+- weighted PageRank, by power iteration over the sparse adjacency;
+- betweenness, estimated with Brandes' algorithm from a fixed-seed sample
+  of BETWEENNESS_SAMPLES source nodes and scaled to the full graph;
+- communities by Louvain modularity optimisation, at two levels: the
+  first level's communities, and the final level's community groups.
+  Both are numbered largest first and drive the graph's level of detail.
+"""
+import random
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from indexes.graph import GraphIndex, relationship_rows
+from models import NodeMetric
+
+DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITERATIONS = 100
+BETWEENNESS_SAMPLES = 100
+LOUVAIN_MAX_ROUNDS = 50  # local-moving sweeps per level
+LOUVAIN_MAX_LEVELS = 10
+_PRECISION = 8  # digits stored, so recomputing an unchanged graph writes nothing
+
+
+def refresh_node_metrics(db: Session) -> int:
+    """
+    Recompute every node's centrality from the relationships table.
+
+    Runs inside the caller's transaction (no commit), after the
+    relationship writes are flushed. Returns the number of rows written.
+    """
+    db.flush()
+    graph = GraphIndex(relationship_rows(db))
+    weighted = weighted_degrees(graph)
+    ranks = pagerank(graph)
+    between = betweenness(graph)
+    community, group = communities(graph)
+
+    current = {row.node_key: row for row in db.query(NodeMetric)}
+    new_rows, changed = [], 0
+    for node, key in enumerate(graph.keys):
+        values = {
+            "degree": graph.degree(node),
+            "weighted_degree": round(weighted[node], _PRECISION),
+            "pagerank": round(ranks[node], _PRECISION),
+            "betweenness": round(between[node], _PRECISION),
+            "community": community[node],
+            "community_group": group[community[node]],
+        }
+        row = current.pop(key, None)
+        if row is None:
+            new_rows.append({
+                "node_key": key, "node_type": graph.types[node], "label": graph.labels[node],
+                **values,
+            })
+        elif any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            changed += 1
+    for row in current.values():
+        db.delete(row)
+    if new_rows:
+        db.execute(insert(NodeMetric), new_rows)
+    db.flush()
+    return changed + len(new_rows) + len(current)
+
+
+def weighted_degrees(graph: GraphIndex) -> list[float]:
+    """Sum of link weights at each node."""
+    totals = [0.0] * len(graph)
+    for source, target, weight in zip(graph.link_source, graph.link_target, graph.link_weight):
+        totals[source] += weight
+        totals[target] += weight
+    return totals
+
+
+def pagerank(graph: GraphIndex) -> list[float]:
+    """
+    Weighted PageRank with links followed in both directions.
+
+    Each node passes its rank to its neighbours in proportion to link
+    weight; isolated nodes cannot occur (every node has a link).
+    """
+    n = len(graph)
+    if n == 0:
+        return []
+    # Per adjacency position: the node it belongs to and the link's weight
+    owners = np.repeat(np.arange(n), [graph.degree(node) for node in range(n)])
+    weights = np.asarray([graph.link_weight[link] for link in graph.incident])
+    neighbors = np.frombuffer(graph.adjacency, dtype=np.int32).astype(np.int64)
+    share = weights / np.asarray(weighted_degrees(graph))[owners]
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        spread = np.bincount(neighbors, weights=ranks[owners] * share, minlength=n)
+        updated = (1.0 - DAMPING) / n + DAMPING * spread
+        delta = np.abs(updated - ranks).sum()
+        ranks = updated
+        if delta < PAGERANK_TOLERANCE:
+            break
+    return ranks.tolist()
+
+
+def betweenness(graph: GraphIndex, samples: int = BETWEENNESS_SAMPLES) -> list[float]:
+    """
+    Normalized betweenness (0..1) over unweighted shortest paths.
+
+    Exact when the graph has at most `samples` nodes, otherwise estimated
+    from that many source nodes, chosen with a fixed seed so the estimate
+    is stable between runs on the same graph.
+    """
+    n = len(graph)
+    centrality = [0.0] * n
+    if n < 3:
+        return centrality
+    sources = range(n) if n <= samples else random.Random(0).sample(range(n), samples)
+    offsets, adjacency = graph.offsets, graph.adjacency
+
+    for source in sources:
+        # Brandes: BFS counting shortest paths, then accumulate dependencies
+        # back up the BFS order; predecessors are neighbours one hop closer
+        distance = [-1] * n
+        paths = [0] * n
+        dependency = [0.0] * n
+        distance[source], paths[source] = 0, 1
+        order = [source]
+        for node in order:
+            next_distance = distance[node] + 1
+            for neighbor in adjacency[offsets[node]:offsets[node + 1]]:
+                if distance[neighbor] < 0:
+                    distance[neighbor] = next_distance
+                    order.append(neighbor)
+                if distance[neighbor] == next_distance:
+                    paths[neighbor] += paths[node]
+        for node in reversed(order):
+            previous_distance = distance[node] - 1
+            weight = (1.0 + dependency[node]) / paths[node]
+            for neighbor in adjacency[offsets[node]:offsets[node + 1]]:
+                if distance[neighbor] == previous_distance:
+                    dependency[neighbor] += paths[neighbor] * weight
+            if node != source:
+                centrality[node] += dependency[node]
+
+    # Each unordered pair is counted from both ends; scale samples up to n sources
+    scale = (n / len(sources)) / ((n - 1) * (n - 2))
+    return [value * scale for value in centrality]
+
+
+def communities(graph: GraphIndex) -> tuple[list[int], list[int]]:
+    """
+    Community of every node, and the group of every community (Louvain).
+
+    Communities are the first Louvain level: nodes moved between
+    neighbouring communities while modularity improves. Groups are the
+    final level, after repeatedly merging communities the same way.
+    Both are numbered 0.. by node count, largest first.
+    """
+    n = len(graph)
+    neighbors: list[dict[int, float]] = [{} for _ in range(n)]
+    for source, target, weight in zip(graph.link_source, graph.link_target, graph.link_weight):
+        if source != target:
+            neighbors[source][target] = neighbors[source].get(target, 0.0) + weight
+            neighbors[target][source] = neighbors[target].get(source, 0.0) + weight
+    loops = [0.0] * n
+    sizes = [1] * n
+
+    community = _numbered(louvain_level(neighbors, loops), sizes)
+    group = list(range(max(community, default=-1) + 1))
+    neighbors, loops, sizes = _aggregate(neighbors, loops, sizes, community)
+    for _ in range(LOUVAIN_MAX_LEVELS):
+        merged = _numbered(louvain_level(neighbors, loops), sizes)
+        if max(merged, default=-1) + 1 == len(neighbors):
+            break  # no community moved: modularity cannot improve further
+        group = [merged[g] for g in group]
+        neighbors, loops, sizes = _aggregate(neighbors, loops, sizes, merged)
+    return community, group
+
+
+def louvain_level(neighbors: list[dict[int, float]], loops: list[float]) -> list[int]:
+    """
+    One Louvain local-moving phase: each node joins the neighbouring
+    community with the best modularity gain until none moves. Nodes are
+    visited in a fixed-seed order, so the result is reproducible.
+    """
+    n = len(neighbors)
+    degree = [sum(links.values()) + 2 * loop for links, loop in zip(neighbors, loops)]
+    total = sum(degree)
+    if not total:
+        return list(range(n))
+    labels = list(range(n))
+    community_degree = list(degree)
+    order = list(range(n))
+    random.Random(0).shuffle(order)
+    for _ in range(LOUVAIN_MAX_ROUNDS):
+        moved = False
+        for node in order:
+            current = labels[node]
+            weights: dict[int, float] = {}
+            for other, weight in neighbors[node].items():
+                weights[labels[other]] = weights.get(labels[other], 0.0) + weight
+            community_degree[current] -= degree[node]
+            best, best_gain = current, (
+                weights.get(current, 0.0) - community_degree[current] * degree[node] / total
+            )
+            for label, weight in weights.items():
+                gain = weight - community_degree[label] * degree[node] / total
+                if gain > best_gain + 1e-12:
+                    best, best_gain = label, gain
+            community_degree[best] += degree[node]
+            if best != current:
+                labels[node] = best
+                moved = True
+        if not moved:
+            break
+    return labels
+
+
+def _aggregate(neighbors, loops, sizes, labels):
+    """Collapse each community into one node; internal links become a self-loop."""
+    count = max(labels, default=-1) + 1
+    merged: list[dict[int, float]] = [{} for _ in range(count)]
+    merged_loops = [0.0] * count
+    merged_sizes = [0] * count
+    for node, links in enumerate(neighbors):
+        a = labels[node]
+        merged_loops[a] += loops[node]
+        merged_sizes[a] += sizes[node]
+        for other, weight in links.items():
+            b = labels[other]
+            if a == b:
+                merged_loops[a] += weight / 2  # each internal link is seen from both ends
+            else:
+                merged[a][b] = merged[a].get(b, 0.0) + weight
+    return merged, merged_loops, merged_sizes
+
+
+def _numbered(labels: list[int], sizes: list[int]) -> list[int]:
+    """Relabel to 0.. by total size, largest first (ties: smallest label)."""
+    totals: dict[int, int] = {}
+    for label, size in zip(labels, sizes):
+        totals[label] = totals.get(label, 0) + size
+    ranked = sorted(totals, key=lambda label: (-totals[label], label))
+    number = {label: i for i, label in enumerate(ranked)}
+    return [number[label] for label in labels]
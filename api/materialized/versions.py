@@ -0,0 +1,105 @@
+"""
+Data versions and version-keyed caches.
+
+Each data domain ("artists", "scores", "relationships", "events") has a
+counter in data_versions that writers bump inside their transaction.
+VersionedCache holds a value derived from the database and rebuilds it only
+when one of its source counters has moved, so expensive derived structures
+are built once per data version rather than once per request.
+
+Commits in this process invalidate caches immediately; writes from other
+processes (pipeline runners, other workers) are noticed on the next version
+check, at most VERSION_CHECK_SECONDS later.
+"""
+import os
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import DataVersion
+
+VERSION_CHECK_SECONDS = float(os.getenv("VERSION_CHECK_SECONDS", "2"))
+
+_caches: list["VersionedCache"] = []
+
+
+def bump_version(db: Session, *names: str) -> None:
+    """Increment the named counters inside the caller's transaction."""
+    for name in names:
+        updated = (
+            db.query(DataVersion)
+            .filter(DataVersion.name == name)
+            .update({"version": DataVersion.version + 1}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(DataVersion(name=name, version=1))
+    db.flush()
+    db.info.setdefault("bumped_versions", set()).update(names)
+
+
+def read_versions(db: Session, names: tuple[str, ...]) -> tuple[int, ...]:
+    """Current counters for the named domains (0 if never bumped)."""
+    found = dict(
+        db.query(DataVersion.name, DataVersion.version)
+        .filter(DataVersion.name.in_(names))
+    )
+    return tuple(found.get(name, 0) for name in names)
+
+
+class VersionedCache:
+    """A value built from the database, rebuilt when its source versions change."""
+
+    def __init__(
+        self,
+        sources: tuple[str, ...],
+        build: Callable[[Session], object],
+        check_interval: float = VERSION_CHECK_SECONDS,
+    ):
+        self.sources = sources
+        self.check_interval = check_interval
+        self._build = build
+        self._value = None
+        self._version: tuple[int, ...] | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    @property
+    def version(self) -> tuple[int, ...] | None:
+        return self._version
+
+    def get(self, db: Session):
+        """Return the cached value, rebuilding first if the data has changed."""
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self.check_interval:
+            return self._value
+        version = read_versions(db, self.sources)
+        if self._value is None or version != self._version:
+            with self._lock:
+                if self._value is None or version != self._version:
+                    # Swap in the new value whole; readers never see a partial build
+                    self._value = self._build(db)
+                    self._version = version
+        self._checked_at = now
+        return self._value
+
+    def invalidate(self) -> None:
+        """Force a version check on the next get()."""
+        self._checked_at = 0.0
+
+
+@event.listens_for(Session, "after_commit")
+def _recheck_after_local_commit(session):
+    bumped = session.info.pop("bumped_versions", None)
+    if bumped:
+        for cache in _caches:
+            if bumped.intersection(cache.sources):
+                cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_bumps(session):
+    session.info.pop("bumped_versions", None)
@@ -1,6 +1,10 @@
 """
 SQLAlchemy models for Metalcore Index.
-7 tables: artists, artist_snapshots, scores, producers, relationships, labels, events
+Core tables: artists, artist_snapshots, scores, producers, relationships, labels, events
+Derived tables: festivals, co_billing_members, latest_scores, artist_documents, node_metrics,
+    node_layouts
+Archive tables: events_archive
+Bookkeeping: data_versions, data_manifest
 """
 from sqlalchemy import (
     Column,
@@ -11,6 +15,7 @@ from sqlalchemy import (
     Date,
     Text,
     ForeignKey,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
@@ -101,8 +106,9 @@ class Relationship(Base):
     source_id = Column(String(200), nullable=False)
     target_type = Column(String(50), nullable=False)
     target_id = Column(String(200), nullable=False)
-    # signed_to, produced_by, managed_by, booked_by
+    # signed_to, produced_by, managed_by, booked_by, co_billed
     relationship_type = Column(String(100), nullable=False)
+    weight = Column(Float, nullable=True)  # co_billed: number of shared bills
 
     __table_args__ = (
         UniqueConstraint(
@@ -144,12 +150,177 @@ class Event(Base):
     ticket_url = Column(String(500), nullable=True)
     festival_name = Column(String(300), nullable=True)
     lineup_position = Column(String(50), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # venue cell, see indexes/geo.py
+    bill_key = Column(String(400), nullable=True, index=True)  # see materialized/cobilling.py
 
     __table_args__ = (
         UniqueConstraint(
             "artist_id", "event_date", "venue_name",
             name="uq_artist_event",
         ),
+        # Prefix range scans per covering cell, date filter stays in the index
+        Index("ix_events_geohash_date", "geohash", "event_date"),
+        # Keyset pagination over (event_date, id), alone or behind an exact filter
+        Index("ix_events_date_id", "event_date", "id"),
+        Index("ix_events_artist_date", "artist_id", "event_date", "id"),
+        Index("ix_events_country_date", "country", "event_date", "id"),
+        Index("ix_events_region_date", "region", "event_date", "id"),
+        Index("ix_events_city_date", "city", "event_date", "id"),
+        Index("ix_events_type_date", "event_type", "event_date", "id"),
+        # Archived events keep their ids, so SQLite must not hand them out
+        # again (older tables are rebuilt by main._rebuild_events_autoincrement)
+        {"sqlite_autoincrement": True},
     )
 
     artist = relationship("Artist", back_populates="events")
+
+
+class Festival(Base):
+    """Upcoming festival rollup, rebuilt from events whenever they are written."""
+    __tablename__ = "festivals"
+
+    festival_name = Column(String(300), primary_key=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False, index=True)
+    location = Column(String(700), nullable=True)
+    artists = Column(Text, default="[]")  # JSON array, first-appearance order
+    artist_count = Column(Integer, nullable=False, default=0, index=True)
+
+
+class CoBillingMember(Base):
+    """Artists on each bill (festival edition or same-night venue)."""
+    __tablename__ = "co_billing_members"
+
+    group_key = Column(String(400), primary_key=True)
+    artist_id = Column(String(50), ForeignKey("artists.spotify_id"), primary_key=True)
+    last_date = Column(Date, nullable=False, index=True)
+
+
+class EventArchive(Base):
+    """Past events moved out of the hot events table (see materialized/archive.py).
+
+    Mirrors the events columns; rows keep their original event id.
+    """
+    __tablename__ = "events_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    artist_id = Column(String(50), ForeignKey("artists.spotify_id"), nullable=False)
+    event_name = Column(String(500), nullable=False)
+    venue_name = Column(String(300), nullable=True)
+    city = Column(String(200), nullable=True)
+    region = Column(String(100), nullable=True)
+    country = Column(String(100), nullable=True)
+    event_date = Column(Date, nullable=False)
+    event_type = Column(String(50), default="concert")
+    bandsintown_id = Column(String(100), nullable=True)
+    ticketmaster_id = Column(String(100), nullable=True)
+    ticket_url = Column(String(500), nullable=True)
+    festival_name = Column(String(300), nullable=True)
+    lineup_position = Column(String(50), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    bill_key = Column(String(400), nullable=True, index=True)
+    archived_on = Column(Date, nullable=False)
+
+    __table_args__ = (
+        Index("ix_events_archive_artist_date", "artist_id", "event_date", "id"),
+    )
+
+
+class LatestScore(Base):
+    """Most recent score per artist, maintained whenever scores are written."""
+    __tablename__ = "latest_scores"
+
+    artist_id = Column(String(50), ForeignKey("artists.spotify_id"), primary_key=True)
+    score_id = Column(Integer, ForeignKey("scores.id"), nullable=False)
+    score_date = Column(Date, nullable=False)
+    trajectory = Column(Float, nullable=True)
+    industry_signal = Column(Float, nullable=True)
+    engagement = Column(Float, nullable=True)
+    release_positioning = Column(Float, nullable=True)
+    composite = Column(Float, nullable=True, index=True)
+    grade = Column(String(1), nullable=True, index=True)
+    segment_tag = Column(String(50), nullable=True, index=True)
+    # Sparklines: JSON arrays of the last SPARKLINE_POINTS values, oldest first
+    composite_history = Column(Text, nullable=True)
+    trajectory_history = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Dashboard sort keys with the keyset tie-breaker
+        Index("ix_latest_scores_composite_artist", "composite", "artist_id"),
+        Index("ix_latest_scores_trajectory_artist", "trajectory", "artist_id"),
+        Index("ix_latest_scores_industry_artist", "industry_signal", "artist_id"),
+        Index("ix_latest_scores_engagement_artist", "engagement", "artist_id"),
+        Index("ix_latest_scores_release_artist", "release_positioning", "artist_id"),
+    )
+
+
+class ArtistDocument(Base):
+    """Pre-serialized artist detail response, rebuilt when its inputs change."""
+    __tablename__ = "artist_documents"
+
+    artist_id = Column(String(50), ForeignKey("artists.spotify_id"), primary_key=True)
+    document = Column(Text, nullable=False)  # JSON body of GET /api/artists/{id}
+    etag = Column(String(40), nullable=False)  # SHA-1 of document
+    built_on = Column(Date, nullable=False)  # upcoming events are relative to this day
+
+
+class NodeMetric(Base):
+    """Centrality of each relationships-graph node (see materialized/node_metrics.py)."""
+    __tablename__ = "node_metrics"
+
+    node_key = Column(String(300), primary_key=True)  # "type:label", as in NetworkNode.id
+    node_type = Column(String(50), nullable=False)
+    label = Column(String(200), nullable=False)
+    degree = Column(Integer, nullable=False, default=0)
+    weighted_degree = Column(Float, nullable=False, default=0.0)
+    pagerank = Column(Float, nullable=False, default=0.0)
+    betweenness = Column(Float, nullable=False, default=0.0)  # normalized, sampled
+    community = Column(Integer, nullable=True, index=True)  # 0 = largest
+    community_group = Column(Integer, nullable=True)  # community of communities
+
+    __table_args__ = (
+        # Rankings sort keys with the keyset tie-breaker, overall and per type
+        Index("ix_node_metrics_pagerank", "pagerank", "node_key"),
+        Index("ix_node_metrics_betweenness", "betweenness", "node_key"),
+        Index("ix_node_metrics_degree", "degree", "node_key"),
+        Index("ix_node_metrics_weighted_degree", "weighted_degree", "node_key"),
+        Index("ix_node_metrics_type_pagerank", "node_type", "pagerank", "node_key"),
+    )
+
+
+class NodeLayout(Base):
+    """Stored graph layout position per node (see materialized/node_layouts.py)."""
+    __tablename__ = "node_layouts"
+
+    node_key = Column(String(300), primary_key=True)  # "type:label", as in NetworkNode.id
+    x = Column(Float, nullable=False)
+    y = Column(Float, nullable=False)
+
+
+class DataVersion(Base):
+    """Monotonic change counter per data domain (artists, scores, relationships, events).
+
+    Writers bump the counter in the same transaction as their changes; caches
+    compare it to decide whether to rebuild.
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class DataManifest(Base):
+    """Content hashes of the data files last applied by /api/rescore (see manifest.py).
+
+    Per file, one row with the hash of the whole file (record_key "") and
+    one per record, keyed by the record's natural key.
+    """
+    __tablename__ = "data_manifest"
+
+    file = Column(String(100), primary_key=True)  # e.g. "artists.json"
+    record_key = Column(String(500), primary_key=True)
+    digest = Column(String(40), nullable=False)  # SHA-1
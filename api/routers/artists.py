@@ -1,92 +1,269 @@
 """Artist endpoints for the Metalcore Index API."""
 import json
+import logging
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Column, Integer, MetaData, String, Table, or_, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
 
+from batching import parse_fields, parse_ids, select_fields
 from database import get_db
-from models import Artist, Label, Producer, Relationship, Score
+from indexes.facets import label_tier_value, parse_filters
+from indexes.search import EXACT, FUZZY, PREFIX, SUBSTRING, artist_search
+from indexes.suggest import MAX_SUGGESTIONS, artist_suggest
+from indexes.universe import (
+    DASHBOARD_READ_MODEL,
+    dashboard_universe,
+    name_key,
+    name_sort,
+)
+from materialized.artist_documents import (
+    DETAIL_FIELDS,
+    get_artist_document,
+    get_artist_documents,
+    history_series,
+    serialize_detail,
+)
+from materialized.latest_scores import sparklines
+from materialized.versions import VersionedCache
+from models import Artist, ArtistSnapshot, LatestScore, Score
+from pagination import decode_cursor, encode_cursor
 from schemas import (
+    ArtistSearchHit,
     DashboardArtist,
     DashboardResponse,
-    EventResponse,
-    LabelContactInfo,
-    ProducerCredit,
-    RelatedArtistBrief,
+    FacetCountsResponse,
     ScoreResponse,
     SnapshotResponse,
+    SuggestionResponse,
 )
+from timeseries import HISTORY_MAX_POINTS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/artists", tags=["artists"])
 
 
+# Dashboard sort keys; every sort is tie-broken on spotify_id for keyset paging
+SORT_COLUMNS = {
+    "composite": LatestScore.composite,
+    "trajectory": LatestScore.trajectory,
+    "industry_signal": LatestScore.industry_signal,
+    "engagement": LatestScore.engagement,
+    "release_positioning": LatestScore.release_positioning,
+    "name": name_sort(Artist.name),
+}
+
+# Filtered totals, computed once per artists/scores data version
+_dashboard_totals = VersionedCache(("artists", "scores"), lambda db: {})
+_MAX_CACHED_TOTALS = 1024
+
+# Text-filter hit sets above this size are joined through a per-connection
+# temporary table rather than bound as one parameter each
+MAX_IN_IDS = 500
+_filter_ids = Table(
+    "dashboard_filter_ids",
+    MetaData(),
+    Column("filter_no", Integer, nullable=False),
+    Column("spotify_id", String(50), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
 @router.get("/dashboard", response_model=DashboardResponse)
 def get_dashboard(
-    grade: Optional[str] = Query(None, description="Filter by grade (A, B, C, D)"),
-    segment: Optional[str] = Query(None, description="Filter by segment tag"),
-    label: Optional[str] = Query(None, description="Filter by label"),
-    search: Optional[str] = Query(None, description="Search by name"),
+    grade: Optional[str] = Query(None, description="Grade(s), e.g. A or A,B"),
+    segment: Optional[str] = Query(None, description="Segment tag(s)"),
+    label_tier: Optional[str] = Query(None, description="Label tier(s): 1, 2, 3, unranked, unsigned"),
+    agency: Optional[str] = Query(None, description="Booking agency(ies)"),
+    management: Optional[str] = Query(None, description="Management company(ies)"),
+    genre: Optional[str] = Query(None, description="Genre(s)"),
+    label: Optional[str] = Query(None, description="Filter by label (typo-tolerant)"),
+    search: Optional[str] = Query(None, description="Search by name (typo-tolerant)"),
     sort_by: str = Query("composite", description="Sort field"),
     sort_dir: str = Query("desc", description="Sort direction (asc/desc)"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (replaces offset)"
+    ),
+    include_sparkline: bool = Query(
+        False, description="Add the last composites and trajectories to each row"
+    ),
     db: Session = Depends(get_db),
 ):
-    """Dashboard endpoint: artists with latest scores, filterable and sortable."""
-    # Subquery for latest score per artist
-    from sqlalchemy import func
-
-    latest_score_date = (
-        db.query(Score.artist_id, func.max(Score.score_date).label("max_date"))
-        .group_by(Score.artist_id)
-        .subquery()
+    """Dashboard endpoint: artists with latest scores, filterable and sortable.
+
+    Pass the returned next_cursor to fetch the following page; a cursor page
+    seeks straight to its position, so deep pages cost the same as page one.
+    Served from the in-memory universe read model, with SQL as the fallback.
+    Facet filters take comma-separated values: OR within a facet, AND across.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "composite"
+    descending = sort_dir != "asc"
+    filters = parse_filters(
+        grade=grade, segment=segment, label_tier=label_tier,
+        agency=agency, management=management, genre=genre,
     )
 
-    query = (
-        db.query(Artist, Score)
-        .outerjoin(
-            latest_score_date, Artist.spotify_id == latest_score_date.c.artist_id
+    after = None
+    if cursor:
+        after_value, after_id = decode_cursor(cursor, 2)
+        value_type = str if sort_by == "name" else (int, float)
+        if not isinstance(after_id, str) or not (
+            after_value is None or isinstance(after_value, value_type)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (after_value, after_id)
+        offset = 0
+
+    id_filters = _text_filters(db, label, search)
+    universe = _universe(db)
+    if universe is not None:
+        selected = universe.matching(filters, id_filters)
+        artists, next_cursor = universe.page(
+            selected, sort_by, descending, limit, offset, after, include_sparkline
         )
-        .outerjoin(
-            Score,
-            (Score.artist_id == Artist.spotify_id)
-            & (Score.score_date == latest_score_date.c.max_date),
+        return DashboardResponse(
+            artists=artists,
+            total=len(universe) if selected is None else selected.bit_count(),
+            universe_size=len(universe),
+            next_cursor=next_cursor,
         )
-        .filter(Artist.active.is_(True))
+    return _dashboard_from_db(
+        db, filters, label, search, id_filters,
+        sort_by, descending, limit, offset, after, include_sparkline,
     )
 
-    # Filters
-    if grade:
-        query = query.filter(Score.grade == grade.upper())
-    if segment:
-        query = query.filter(Score.segment_tag == segment)
+
+@router.get("/facets", response_model=FacetCountsResponse)
+def get_facets(
+    grade: Optional[str] = Query(None, description="Grade(s), e.g. A or A,B"),
+    segment: Optional[str] = Query(None, description="Segment tag(s)"),
+    label_tier: Optional[str] = Query(None, description="Label tier(s): 1, 2, 3, unranked, unsigned"),
+    agency: Optional[str] = Query(None, description="Booking agency(ies)"),
+    management: Optional[str] = Query(None, description="Management company(ies)"),
+    genre: Optional[str] = Query(None, description="Genre(s)"),
+    label: Optional[str] = Query(None, description="Filter by label (typo-tolerant)"),
+    search: Optional[str] = Query(None, description="Search by name (typo-tolerant)"),
+    db: Session = Depends(get_db),
+):
+    """Artist counts for every facet value under the dashboard filters.
+
+    Each facet is counted with its own filter left out, so the counts show
+    what adding another value to a multi-value filter would return.
+    """
+    filters = parse_filters(
+        grade=grade, segment=segment, label_tier=label_tier,
+        agency=agency, management=management, genre=genre,
+    )
+    universe = _universe(db)
+    if universe is None:
+        # Facet counts have no SQL path; use the versioned build even when
+        # the dashboard itself is served from SQL
+        universe = dashboard_universe.get(db)
+    base = universe.text_mask(_text_filters(db, label, search))
+    selected = universe.facets.select(filters, base)
+    return FacetCountsResponse(
+        total=selected.bit_count(),
+        universe_size=len(universe),
+        facets=universe.facets.counts(filters, base),
+    )
+
+
+def _text_filters(
+    db: Session, label: Optional[str], search: Optional[str]
+) -> list[set[str]]:
+    """Artist IDs matching each text filter, resolved through the trigram index."""
+    id_filters = []
     if label:
-        query = query.filter(Artist.current_label.ilike(f"%{label}%"))
+        id_filters.append(artist_search.get(db).keys(label, "label"))
     if search:
-        query = query.filter(Artist.name.ilike(f"%{search}%"))
+        id_filters.append(artist_search.get(db).keys(search, "name"))
+    return id_filters
 
-    # Count before pagination
-    total = query.count()
-    universe_size = db.query(Artist).filter(Artist.active.is_(True)).count()
+
+def _universe(db: Session):
+    """The dashboard read model, or None to fall back to SQL."""
+    if not DASHBOARD_READ_MODEL:
+        return None
+    try:
+        return dashboard_universe.get(db)
+    except SQLAlchemyError:
+        logger.exception("Dashboard read model unavailable, using SQL")
+        db.rollback()
+        return None
+
+
+def _dashboard_from_db(
+    db: Session,
+    filters: dict[str, list[str]],
+    label: Optional[str],
+    search: Optional[str],
+    id_filters: list[set[str]],
+    sort_by: str,
+    descending: bool,
+    limit: int,
+    offset: int,
+    after: Optional[tuple],
+    include_sparkline: bool = False,
+) -> DashboardResponse:
+    # Filters
+    conditions = [Artist.active.is_(True), *_facet_conditions(db, filters)]
+    conditions += _id_conditions(db, id_filters)
+    query = (
+        db.query(Artist, LatestScore)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .filter(*conditions)
+    )
+
+    # Totals are cached per data version instead of counted on every page.
+    # Other requests may clear the dict at any time, so values are read
+    # into locals and never looked up twice.
+    totals = _dashboard_totals.get(db)
+    if len(totals) >= _MAX_CACHED_TOTALS:
+        totals.clear()
+    universe_size = totals.get(None)
+    if universe_size is None:
+        universe_size = totals[None] = db.query(Artist).filter(Artist.active.is_(True)).count()
+    filter_key = (
+        tuple((facet, tuple(values)) for facet, values in sorted(filters.items())),
+        label,
+        search,
+    )
+    total = totals.get(filter_key)
+    if total is None:
+        total = totals[filter_key] = query.count()
 
     # Sort
-    sort_column = {
-        "composite": Score.composite,
-        "trajectory": Score.trajectory,
-        "industry_signal": Score.industry_signal,
-        "engagement": Score.engagement,
-        "release_positioning": Score.release_positioning,
-        "name": Artist.name,
-    }.get(sort_by, Score.composite)
-
-    if sort_dir == "asc":
-        query = query.order_by(sort_column.asc().nullslast())
+    sort_column = SORT_COLUMNS[sort_by]
+    if after:
+        scored = (
+            db.query(Artist, LatestScore)
+            .join(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+            .filter(*conditions)
+        )
+        results = _seek(query, scored, sort_by, descending, *after, limit + 1)
     else:
-        query = query.order_by(sort_column.desc().nullslast())
+        if descending:
+            query = query.order_by(sort_column.desc().nullslast(), Artist.spotify_id.desc())
+        else:
+            query = query.order_by(sort_column.asc().nullslast(), Artist.spotify_id.asc())
+        results = query.offset(offset).limit(limit + 1).all()
 
-    results = query.offset(offset).limit(limit).all()
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last_artist, last_score = results[-1]
+        source = last_artist if sort_by == "name" else last_score
+        next_cursor = encode_cursor(
+            getattr(source, sort_by) if source else None, last_artist.spotify_id
+        )
 
     artists = []
     for artist, score in results:
@@ -103,114 +280,303 @@ def get_dashboard(
                 industry_signal=score.industry_signal if score else None,
                 engagement=score.engagement if score else None,
                 release_positioning=score.release_positioning if score else None,
+                **(sparklines(score) if include_sparkline else {}),
             )
         )
 
-    return DashboardResponse(artists=artists, total=total, universe_size=universe_size)
+    return DashboardResponse(
+        artists=artists,
+        total=total,
+        universe_size=universe_size,
+        next_cursor=next_cursor,
+    )
 
 
-@router.get("/{spotify_id}")
-def get_artist(spotify_id: str, db: Session = Depends(get_db)):
-    """Full artist detail with snapshot history and score history."""
-    artist = db.query(Artist).filter(Artist.spotify_id == spotify_id).first()
-    if not artist:
-        from fastapi import HTTPException
+_MATCH_NAMES = {EXACT: "exact", PREFIX: "prefix", SUBSTRING: "substring", FUZZY: "fuzzy"}
+
+
+@router.get("/search", response_model=list[ArtistSearchHit])
+def search_artists(
+    q: str = Query(..., min_length=1, description="Name or label to look for"),
+    field: Optional[str] = Query(None, pattern="^(name|label)$", description="Restrict to names or labels"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Ranked artist search: exact, prefix, substring, then typo matches."""
+    hits = artist_search.get(db).search(q, field, limit)
+    if not hits:
+        return []
+    rows = {
+        artist.spotify_id: (artist, score)
+        for artist, score in db.query(Artist, LatestScore)
+        .outerjoin(LatestScore, LatestScore.artist_id == Artist.spotify_id)
+        .filter(Artist.spotify_id.in_([key for key, _, _ in hits]))
+    }
+    results = []
+    for spotify_id, kind, similarity in hits:
+        if spotify_id not in rows:
+            continue
+        artist, score = rows[spotify_id]
+        results.append(ArtistSearchHit(
+            spotify_id=artist.spotify_id,
+            name=artist.name,
+            current_label=artist.current_label,
+            grade=score.grade if score else None,
+            composite=score.composite if score else None,
+            match=_MATCH_NAMES[kind],
+            similarity=round(similarity, 3),
+        ))
+    return results
 
-        raise HTTPException(status_code=404, detail="Artist not found")
 
-    genres = json.loads(artist.genres) if artist.genres else []
-    snapshots = [
-        SnapshotResponse.model_validate(s)
-        for s in sorted(artist.snapshots, key=lambda s: s.snapshot_date)
-    ]
-    scores = [
-        ScoreResponse.model_validate(s)
-        for s in sorted(artist.scores, key=lambda s: s.score_date)
-    ]
-
-    # Upcoming events
-    upcoming_events = [
-        EventResponse.model_validate(e)
-        for e in sorted(artist.events, key=lambda e: e.event_date)
-        if e.event_date >= date.today()
-    ]
-
-    # Label contact info (via Relationship + Label tables)
-    label_contact = None
-    if artist.current_label:
-        label = db.query(Label).filter(
-            Label.name == artist.current_label
-        ).first()
-        if not label:
-            # Try partial match for compound labels like "Epic Records / Nuclear Blast"
-            first_label = artist.current_label.split("/")[0].strip()
-            label = db.query(Label).filter(
-                Label.name == first_label
-            ).first()
-        if label and (label.key_contact or label.contact_title):
-            label_contact = LabelContactInfo(
-                label_name=label.name,
-                key_contact=label.key_contact,
-                contact_title=label.contact_title,
+@router.get("/suggest", response_model=list[SuggestionResponse])
+def suggest(
+    q: str = Query(..., min_length=1, description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db),
+):
+    """Autocomplete for the search box: artists, labels and producers by composite.
+
+    Served from an in-memory index; the database is only consulted for the
+    periodic data-version check.
+    """
+    return artist_suggest.get(db).suggest(q, limit)
+
+
+def _id_conditions(db: Session, id_filters: list[set[str]]) -> list:
+    """Artist.spotify_id conditions for the text-filter hit sets."""
+    conditions, large = [], []
+    for ids in id_filters:
+        if len(ids) <= MAX_IN_IDS:
+            conditions.append(Artist.spotify_id.in_(sorted(ids)))
+        else:
+            large.append(ids)
+    if large:
+        connection = db.connection()
+        connection.execute(CreateTable(_filter_ids, if_not_exists=True))
+        connection.execute(_filter_ids.delete())
+        connection.execute(_filter_ids.insert(), [
+            {"filter_no": n, "spotify_id": spotify_id}
+            for n, ids in enumerate(large)
+            for spotify_id in ids
+        ])
+        conditions += [
+            Artist.spotify_id.in_(
+                select(_filter_ids.c.spotify_id).where(_filter_ids.c.filter_no == n)
             )
+            for n in range(len(large))
+        ]
+    return conditions
 
-    # Producer credits from relationships
-    producers = []
-    prod_rels = db.query(Relationship).filter(
-        Relationship.source_id == artist.name,
-        Relationship.relationship_type == "produced_by",
-    ).all()
-    for pr in prod_rels:
-        prod = db.query(Producer).filter(Producer.name == pr.target_id).first()
-        producers.append(ProducerCredit(
-            name=pr.target_id,
-            studio=prod.studio_name if prod else None,
-        ))
 
-    # Related artists via shared_producer
-    related_artists = []
-    shared_rels = db.query(Relationship).filter(
-        (
-            (Relationship.source_id == artist.name)
-            | (Relationship.target_id == artist.name)
-        ),
-        Relationship.relationship_type == "shared_producer",
-    ).all()
-    seen_related = set()
-    for sr in shared_rels:
-        other_name = sr.target_id if sr.source_id == artist.name else sr.source_id
-        if other_name in seen_related:
-            continue
-        seen_related.add(other_name)
-        target_artist = db.query(Artist).filter(Artist.name == other_name).first()
-        if target_artist:
-            latest = db.query(Score).filter(
-                Score.artist_id == target_artist.spotify_id
-            ).order_by(Score.score_date.desc()).first()
-            related_artists.append(RelatedArtistBrief(
-                spotify_id=target_artist.spotify_id,
-                name=target_artist.name,
-                image_url=target_artist.image_url,
-                composite=latest.composite if latest else None,
-                grade=latest.grade if latest else None,
-            ))
+def _facet_conditions(db: Session, filters: dict[str, list[str]]) -> list:
+    """SQL equivalents of the facet bitset filters."""
+    conditions = []
+    for facet, values in filters.items():
+        if facet == "grade":
+            conditions.append(LatestScore.grade.in_(values))
+        elif facet == "segment":
+            conditions.append(LatestScore.segment_tag.in_(values))
+        elif facet == "agency":
+            conditions.append(Artist.booking_agency.in_(values))
+        elif facet == "management":
+            conditions.append(Artist.current_management_co.in_(values))
+        elif facet == "genre":
+            # genres is a JSON array in a text column; match the quoted element
+            conditions.append(or_(*(
+                Artist.genres.contains(json.dumps(value), autoescape=True)
+                for value in values
+            )))
+        elif facet == "label_tier":
+            # Tiers come from a fuzzy lookup, so resolve them over distinct labels
+            labels = [
+                name for (name,) in db.query(Artist.current_label)
+                .filter(Artist.current_label.isnot(None)).distinct()
+                if label_tier_value(name) in values
+            ]
+            condition = Artist.current_label.in_(labels)
+            if "unsigned" in values:
+                condition = or_(condition, Artist.current_label.is_(None))
+            conditions.append(condition)
+    return conditions
+
+
+def _seek(query, scored, sort_by: str, descending: bool, value, spotify_id: str, limit: int) -> list:
+    """
+    Up to limit rows strictly after (value, spotify_id) in NULLS LAST order.
+
+    query outer-joins latest scores, scored inner-joins them. Rows with a
+    sort value come from a range seek on (sort column, id), which for
+    score sorts the ix_latest_scores_* indexes answer directly; the
+    trailing block of unscored rows is a second query, run only when the
+    first runs out.
+    """
+    column = SORT_COLUMNS[sort_by]
+    rows = []
+    if value is not None:
+        if sort_by == "name":
+            source, tie = query, Artist.spotify_id
+            value = name_key(value)
+        else:
+            # Seek on the index's own artist_id column, driving from latest_scores
+            source, tie = scored, LatestScore.artist_id
+        key = tuple_(column, tie)
+        if descending:
+            seek = source.filter(key < (value, spotify_id)).order_by(column.desc(), tie.desc())
+        else:
+            seek = source.filter(key > (value, spotify_id)).order_by(column.asc(), tie.asc())
+        rows = seek.limit(limit).all()
+        spotify_id = None  # the unscored block is read from its start
+    if len(rows) < limit:
+        unscored = query.filter(column.is_(None))
+        if spotify_id is not None:
+            unscored = unscored.filter(
+                Artist.spotify_id < spotify_id if descending else Artist.spotify_id > spotify_id
+            )
+        order = Artist.spotify_id.desc() if descending else Artist.spotify_id.asc()
+        rows += unscored.order_by(order).limit(limit - len(rows)).all()
+    return rows
+
+
+@router.get("/batch")
+def get_artists_batch(
+    ids: str = Query(..., description="Comma-separated spotify IDs"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated detail fields to return (default all)"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Artist detail for several artists in one call, keyed by spotify_id.
 
+    Documents are read with one IN query; unknown IDs are left out.
+    """
+    wanted = parse_ids(ids)
+    selected = parse_fields(fields, DETAIL_FIELDS)
+    if selected is not None:
+        selected.add("spotify_id")
+    bodies = get_artist_documents(db, wanted)
     return {
-        "spotify_id": artist.spotify_id,
-        "name": artist.name,
-        "genres": genres,
-        "image_url": artist.image_url,
-        "current_label": artist.current_label,
-        "current_manager": artist.current_manager,
-        "current_management_co": artist.current_management_co,
-        "booking_agency": artist.booking_agency,
-        "booking_agent": artist.booking_agent,
-        "youtube_channel_id": artist.youtube_channel_id,
-        "active": artist.active,
-        "snapshots": snapshots,
-        "scores": scores,
-        "upcoming_events": upcoming_events,
-        "label_contact": label_contact,
-        "producers": producers,
-        "related_artists": related_artists,
+        spotify_id: select_fields(json.loads(bodies[spotify_id]), selected)
+        for spotify_id in wanted
+        if spotify_id in bodies
     }
+
+
+@router.get("/{spotify_id}/history/snapshots", response_model=list[SnapshotResponse])
+def get_snapshot_history(
+    spotify_id: str,
+    response: Response,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Full-resolution snapshot history, oldest first, paged by date."""
+    return _history_page(
+        db, response, ArtistSnapshot, ArtistSnapshot.snapshot_date,
+        spotify_id, from_date, to_date, limit, cursor,
+    )
+
+
+@router.get("/{spotify_id}/history/scores", response_model=list[ScoreResponse])
+def get_score_history(
+    spotify_id: str,
+    response: Response,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Full-resolution score history, oldest first, paged by date."""
+    return _history_page(
+        db, response, Score, Score.score_date,
+        spotify_id, from_date, to_date, limit, cursor,
+    )
+
+
+def _history_page(
+    db: Session, response: Response, model, date_column, spotify_id: str,
+    from_date: Optional[date], to_date: Optional[date], limit: int, cursor: Optional[str],
+):
+    # One row per artist per day, so the date alone is a unique keyset
+    query = db.query(model).filter(model.artist_id == spotify_id)
+    if from_date:
+        query = query.filter(date_column >= from_date)
+    if to_date:
+        query = query.filter(date_column <= to_date)
+    if cursor:
+        (after,) = decode_cursor(cursor, 1)
+        try:
+            after = date.fromisoformat(after)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(date_column > after)
+    rows = query.order_by(date_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(getattr(rows[-1], date_column.key))
+    return rows
+
+
+@router.get("/{spotify_id}")
+def get_artist(
+    spotify_id: str,
+    request: Request,
+    from_date: Optional[date] = Query(None, alias="from", description="History start date"),
+    to_date: Optional[date] = Query(None, alias="to", description="History end date"),
+    max_points: Optional[int] = Query(
+        None, ge=2, le=2000,
+        description=f"Downsample each history to this many points (default {HISTORY_MAX_POINTS})",
+    ),
+    db: Session = Depends(get_db),
+):
+    """Full artist detail with snapshot history and score history.
+
+    Served from the pre-built artist document with an ETag; a matching
+    If-None-Match gets 304 Not Modified. Histories are downsampled (LTTB)
+    to at most max_points points; from/to/max_points re-read just the
+    requested window, and the ETag then covers that response. Full-resolution
+    pages live under /history.
+    """
+    document = get_artist_document(db, spotify_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Artist not found")
+    body, etag = document
+    if from_date or to_date or max_points:
+        detail = json.loads(body)
+        snapshots, scores = _history_window(db, spotify_id, from_date, to_date)
+        detail["snapshots"], detail["scores"] = history_series(
+            snapshots, scores, max_points or HISTORY_MAX_POINTS
+        )
+        body, etag = serialize_detail(detail)
+    etag = f'"{etag}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _history_window(
+    db: Session, spotify_id: str, from_date: Optional[date], to_date: Optional[date]
+) -> tuple[list, list]:
+    """Snapshot and score rows for an artist between from_date and to_date."""
+    series = []
+    for model, column in (
+        (ArtistSnapshot, ArtistSnapshot.snapshot_date),
+        (Score, Score.score_date),
+    ):
+        query = db.query(model).filter(model.artist_id == spotify_id)
+        if from_date:
+            query = query.filter(column >= from_date)
+        if to_date:
+            query = query.filter(column <= to_date)
+        series.append(query.all())
+    return series[0], series[1]
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
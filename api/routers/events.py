@@ -1,19 +1,33 @@
 """Event endpoints for the Metalcore Index API."""
+import json
 import logging
 import os
 from datetime import date, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import and_, or_, tuple_
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Artist, Event
-from schemas import EventResponse, FestivalSummary
+from indexes.geo import covering_cells, encode_geohash, haversine_km, radius_bbox, split_bbox
+from materialized.archive import EVENT_RETENTION_DAYS, archive_past_events
+from materialized.cobilling import active_bill_keys, billing_key, sync_co_billing
+from materialized.festivals import refresh_festivals
+from materialized.artist_documents import refresh_artist_documents
+from materialized.node_layouts import refresh_node_layouts
+from materialized.node_metrics import refresh_node_metrics
+from materialized.versions import bump_version
+from models import Artist, Event, EventArchive, Festival
+from pagination import decode_cursor, encode_cursor
+from schemas import EventResponse, FestivalSummary, NearbyEvent
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 logger = logging.getLogger(__name__)
 
+# A circle fills pi/4 of its bounding square: over-fetch a third per page
+NEARBY_OVERFETCH_DIVISOR = 3
+
 
 @router.get("/artist/{spotify_id}", response_model=list[EventResponse])
 def get_artist_events(spotify_id: str, db: Session = Depends(get_db)):
@@ -27,15 +41,71 @@ def get_artist_events(spotify_id: str, db: Session = Depends(get_db)):
     return events
 
 
+@router.get("/history/{spotify_id}", response_model=list[EventResponse])
+def get_artist_history(
+    spotify_id: str,
+    response: Response,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Past tour dates for an artist, newest first, across hot and archived events."""
+    yesterday = date.today() - timedelta(days=1)
+    upper = min(to_date, yesterday) if to_date else yesterday
+    before = None
+    if cursor:
+        before_date, before_id = decode_cursor(cursor, 2)
+        try:
+            before_date = date.fromisoformat(before_date)
+            before_id = int(before_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        before = (before_date, before_id)
+
+    # Each table answers from its (artist_id, event_date, id) index; merge the two pages
+    rows = []
+    for table in (Event, EventArchive):
+        query = db.query(table).filter(
+            table.artist_id == spotify_id, table.event_date <= upper
+        )
+        if from_date:
+            query = query.filter(table.event_date >= from_date)
+        if before:
+            query = query.filter(tuple_(table.event_date, table.id) < before)
+        rows += (
+            query.order_by(table.event_date.desc(), table.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+    rows.sort(key=lambda e: (e.event_date, e.id), reverse=True)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].event_date, rows[-1].id)
+    return rows
+
+
 @router.get("/upcoming", response_model=list[EventResponse])
 def get_upcoming_events(
+    response: Response,
     days: int = Query(90, ge=1, le=365),
     artist: Optional[str] = Query(None, description="Filter by artist name"),
+    country: Optional[str] = Query(None, description="Exact country code"),
+    region: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+    event_type: Optional[str] = Query(None, description="concert or festival"),
     festival_only: bool = Query(False),
     limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
 ):
-    """Get all upcoming events, optionally filtered."""
+    """Get upcoming events ordered by (event_date, id), optionally filtered.
+
+    Pages are keyset-paginated: when more rows remain, the X-Next-Cursor
+    response header carries the cursor for the next request.
+    """
     cutoff = date.today() + timedelta(days=days)
     query = (
         db.query(Event)
@@ -43,54 +113,166 @@ def get_upcoming_events(
     )
 
     if artist:
-        query = query.join(Artist).filter(Artist.name.ilike(f"%{artist}%"))
-
+        artist_ids = _resolve_artist_ids(db, artist)
+        if not artist_ids:
+            return []
+        query = query.filter(Event.artist_id.in_(artist_ids))
+    if country:
+        query = query.filter(Event.country == country)
+    if region:
+        query = query.filter(Event.region == region)
+    if city:
+        query = query.filter(Event.city == city)
+    if event_type:
+        query = query.filter(Event.event_type == event_type)
     if festival_only:
         query = query.filter(Event.festival_name.isnot(None))
 
-    events = query.order_by(Event.event_date.asc()).limit(limit).all()
+    if cursor:
+        after_date, after_id = decode_cursor(cursor, 2)
+        try:
+            after_date = date.fromisoformat(after_date)
+            after_id = int(after_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(Event.event_date, Event.id) > (after_date, after_id))
+
+    events = (
+        query.order_by(Event.event_date.asc(), Event.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            events[-1].event_date, events[-1].id
+        )
     return events
 
 
-@router.get("/festivals", response_model=list[FestivalSummary])
-def get_festivals(db: Session = Depends(get_db)):
-    """Get upcoming festival appearances grouped by festival name."""
-    events = (
-        db.query(Event, Artist.name)
-        .join(Artist, Event.artist_id == Artist.spotify_id)
+def _resolve_artist_ids(db: Session, name: str) -> list[str]:
+    """Artist IDs for a name: exact match first, then substring on the artists table."""
+    ids = [row.spotify_id for row in db.query(Artist.spotify_id).filter(Artist.name == name)]
+    if not ids:
+        ids = [
+            row.spotify_id
+            for row in db.query(Artist.spotify_id).filter(Artist.name.ilike(f"%{name}%"))
+        ]
+    return ids
+
+
+@router.get("/nearby", response_model=list[NearbyEvent])
+def get_nearby_events(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(200, gt=0, le=5000),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    days: int = Query(90, ge=1, le=365),
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Upcoming events within radius_km of lat/lon, or inside a bounding box.
+
+    Bounding boxes with min_lon > max_lon wrap across the antimeridian.
+    """
+    if lat is not None and lon is not None:
+        boxes = radius_bbox(lat, lon, radius_km)
+    elif None not in (min_lat, min_lon, max_lat, max_lon):
+        if min_lat > max_lat:
+            raise HTTPException(status_code=422, detail="min_lat exceeds max_lat")
+        boxes = split_bbox(min_lat, min_lon, max_lat, max_lon)
+        lat = lon = None
+    else:
+        raise HTTPException(
+            status_code=422,
+            detail="Provide lat and lon, or min_lat, min_lon, max_lat and max_lon",
+        )
+
+    # Index range scan per covering geohash cell, then an exact test
+    cells = covering_cells(boxes)
+    cutoff = date.today() + timedelta(days=days)
+    candidates = (
+        db.query(*(getattr(Event, field) for field in EventResponse.model_fields))
         .filter(
-            Event.festival_name.isnot(None),
             Event.event_date >= date.today(),
+            Event.event_date <= cutoff,
+            Event.geohash.isnot(None),
+            or_(*(
+                and_(Event.geohash >= cell, Event.geohash < cell + "~")
+                for cell in cells
+            )),
+            or_(*(
+                and_(
+                    Event.latitude.between(b_min_lat, b_max_lat),
+                    Event.longitude.between(b_min_lon, b_max_lon),
+                )
+                for b_min_lat, b_min_lon, b_max_lat, b_max_lon in boxes
+            )),
         )
-        .order_by(Event.event_date.asc())
-        .all()
+        .order_by(Event.event_date.asc(), Event.id.asc())
     )
 
-    # Group by festival name
-    festivals: dict[str, dict] = {}
-    for event, artist_name in events:
-        key = event.festival_name
-        if key not in festivals:
-            festivals[key] = {
-                "festival_name": key,
-                "start_date": event.event_date,
-                "end_date": event.event_date,
-                "location": ", ".join(
-                    p for p in [event.city, event.region, event.country] if p
-                ),
-                "artists": [],
-            }
-        fest = festivals[key]
-        if event.event_date < fest["start_date"]:
-            fest["start_date"] = event.event_date
-        if event.event_date > fest["end_date"]:
-            fest["end_date"] = event.event_date
-        if artist_name not in fest["artists"]:
-            fest["artists"].append(artist_name)
-
-    # Sort by number of artists (most popular festivals first)
-    result = sorted(festivals.values(), key=lambda f: -len(f["artists"]))
-    return [FestivalSummary(**f) for f in result]
+    # Pages in (event_date, id) order, sized for the share of the bounding
+    # boxes that falls outside the radius. Once limit events are in, the
+    # rest of that day is still read so it can be ordered by distance.
+    batch = limit + limit // NEARBY_OVERFETCH_DIVISOR + 1
+    results: list[NearbyEvent] = []
+    last_date = None
+    after = None
+    while True:
+        query = candidates
+        if after is not None:
+            query = query.filter(tuple_(Event.event_date, Event.id) > after)
+        rows = query.limit(batch).all()
+        for row in rows:
+            if last_date is not None and row.event_date > last_date:
+                break
+            distance = None
+            if lat is not None:
+                distance = haversine_km(lat, lon, row.latitude, row.longitude)
+                if distance > radius_km:
+                    continue
+            results.append(NearbyEvent(
+                **row._mapping,
+                distance_km=round(distance, 1) if distance is not None else None,
+            ))
+            if len(results) == limit:
+                last_date = row.event_date
+        else:
+            if len(rows) == batch:
+                after = (rows[-1].event_date, rows[-1].id)
+                continue
+        break
+
+    results.sort(key=lambda e: (e.event_date, e.distance_km or 0, e.id))
+    return results[:limit]
+
+
+@router.get("/festivals", response_model=list[FestivalSummary])
+def get_festivals(db: Session = Depends(get_db)):
+    """Get upcoming festivals, largest lineups first.
+
+    Served from the festivals rollup, which is rebuilt on every event refresh.
+    """
+    festivals = (
+        db.query(Festival)
+        .filter(Festival.end_date >= date.today())
+        .order_by(Festival.artist_count.desc(), Festival.start_date.asc())
+        .all()
+    )
+    return [
+        FestivalSummary(
+            festival_name=f.festival_name,
+            start_date=f.start_date,
+            end_date=f.end_date,
+            location=f.location or "",
+            artists=json.loads(f.artists) if f.artists else [],
+        )
+        for f in festivals
+    ]
 
 
 def _verify_secret(x_seed_secret: str = Header(...)):
@@ -99,6 +281,19 @@ def _verify_secret(x_seed_secret: str = Header(...)):
         raise HTTPException(status_code=403, detail="Invalid seed secret")
 
 
+@router.post("/archive")
+def archive_events(
+    days: int = Query(EVENT_RETENTION_DAYS, ge=0, description="Keep this many days of past events hot"),
+    db: Session = Depends(get_db),
+    _auth=Depends(_verify_secret),
+):
+    """Move past events older than `days` into events_archive."""
+    archived = archive_past_events(db, days)
+    db.commit()
+    logger.info("Archived %d past events", archived)
+    return {"status": "archived", "events_archived": archived}
+
+
 @router.post("/refresh")
 def refresh_events(
     db: Session = Depends(get_db),
@@ -116,6 +311,9 @@ def refresh_events(
         collector = BandsintownCollector()
         artists = db.query(Artist).filter(Artist.active.is_(True)).all()
 
+        # Bills that lose their future events below and must be re-derived
+        touched_bills = active_bill_keys(db, date.today())
+
         # Clear ALL future events first and commit separately
         deleted = db.query(Event).filter(
             Event.event_date >= date.today()
@@ -132,33 +330,59 @@ def refresh_events(
                 else:
                     raw_events = simulate_bandsintown_events(artist.name)
 
-                for e in raw_events:
-                    db.add(Event(
-                        artist_id=artist.spotify_id,
-                        event_name=e.event_name,
-                        venue_name=e.venue_name,
-                        city=e.city,
-                        region=e.region,
-                        country=e.country,
-                        event_date=e.event_date,
-                        event_type=e.event_type,
-                        bandsintown_id=e.bandsintown_id,
-                        ticket_url=e.ticket_url,
-                        festival_name=e.festival_name,
-                    ))
-                    total_events += 1
-                db.flush()
+                # Savepoint per artist so one bad payload doesn't discard
+                # the events already staged for other artists
+                artist_bills = set()
+                with db.begin_nested():
+                    for e in raw_events:
+                        bill_key = billing_key(
+                            e.event_date, e.venue_name, e.city, e.festival_name
+                        )
+                        artist_bills.add(bill_key)
+                        db.add(Event(
+                            artist_id=artist.spotify_id,
+                            event_name=e.event_name,
+                            venue_name=e.venue_name,
+                            city=e.city,
+                            region=e.region,
+                            country=e.country,
+                            event_date=e.event_date,
+                            event_type=e.event_type,
+                            bandsintown_id=e.bandsintown_id,
+                            ticket_url=e.ticket_url,
+                            festival_name=e.festival_name,
+                            latitude=e.latitude,
+                            longitude=e.longitude,
+                            geohash=(
+                                encode_geohash(e.latitude, e.longitude)
+                                if e.latitude is not None and e.longitude is not None
+                                else None
+                            ),
+                            bill_key=bill_key,
+                        ))
+                total_events += len(raw_events)
+                touched_bills |= artist_bills
             except Exception as exc:
-                db.rollback()
                 errors.append(f"{artist.name}: {exc}")
                 logger.error("Event error for %s: %s", artist.name, exc)
 
+        festivals = refresh_festivals(db)
+        co_billed = sync_co_billing(db, touched_bills)
+        if co_billed:
+            refresh_node_metrics(db)
+            refresh_node_layouts(db)
+        archived = archive_past_events(db)
+        refresh_artist_documents(db, [a.spotify_id for a in artists])
+        bump_version(db, "events")
         db.commit()
         logger.info("Refreshed events: %d events for %d artists", total_events, len(artists))
         return {
             "status": "refreshed",
             "artists_processed": len(artists),
             "events_added": total_events,
+            "festivals": festivals,
+            "co_billed_edges_changed": co_billed,
+            "events_archived": archived,
             "source": "bandsintown" if collector.is_available else "simulated",
             "errors": errors[:10] if errors else [],
         }
@@ -1,139 +1,170 @@
 """Network graph endpoints for the Metalcore Index API."""
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Artist, Relationship, Score
-from schemas import NetworkGraph, NetworkNode, NetworkLink
+from indexes.graph import FORMATS, network_graph
+from indexes.paths import MAX_ALTERNATIVES, MAX_HOPS, k_shortest_paths
+from models import NodeMetric
+from pagination import decode_cursor, encode_cursor
+from schemas import NetworkGraph, NetworkPath, NetworkPathResponse, NodeRanking
 
 router = APIRouter(prefix="/api/network", tags=["network"])
 
+RANKING_COLUMNS = {
+    "pagerank": NodeMetric.pagerank,
+    "betweenness": NodeMetric.betweenness,
+    "degree": NodeMetric.degree,
+    "weighted_degree": NodeMetric.weighted_degree,
+}
+
 
 @router.get("/graph", response_model=NetworkGraph)
 def get_network_graph(
     center: Optional[str] = Query(None, description="Center node ID (spotify_id or name)"),
     depth: int = Query(1, ge=1, le=3, description="Traversal depth from center"),
     top_n: Optional[int] = Query(None, ge=5, le=75, description="Show only top N artists by score"),
+    lod: int = Query(
+        0, ge=0, le=2, description="Level of detail: 0 every node, 1 communities, 2 community groups"
+    ),
+    expand: Optional[str] = Query(
+        None, description="Supernode ids to open, comma-separated (e.g. group:0,community:4)"
+    ),
+    fmt: str = Query(
+        "json", alias="format", pattern="^(json|compact|msgpack)$",
+        description="json (NetworkGraph), or the columnar compact form as JSON or MessagePack",
+    ),
     db: Session = Depends(get_db),
 ):
-    """Build network graph from relationships table."""
-    relationships = db.query(Relationship).all()
-
-    nodes_map: dict[str, NetworkNode] = {}
-    links: list[NetworkLink] = []
-
-    # Build all nodes from relationships
-    for rel in relationships:
-        src_key = f"{rel.source_type}:{rel.source_id}"
-        tgt_key = f"{rel.target_type}:{rel.target_id}"
-
-        if src_key not in nodes_map:
-            nodes_map[src_key] = NetworkNode(
-                id=src_key,
-                label=rel.source_id,
-                type=rel.source_type,
-            )
-        if tgt_key not in nodes_map:
-            nodes_map[tgt_key] = NetworkNode(
-                id=tgt_key,
-                label=rel.target_id,
-                type=rel.target_type,
-            )
-
-        links.append(
-            NetworkLink(
-                source=src_key,
-                target=tgt_key,
-                relationship=rel.relationship_type,
+    """Network graph from the cached relationships graph index.
+
+    center and top_n are alternative filters: center keeps the nodes
+    within depth of it, top_n the top N artists by best composite plus
+    their direct connections. Giving both is a 400.
+
+    Without center or top_n, lod > 0 returns clusters collapsed into
+    supernodes with merged, weighted links between them.
+
+    format=compact returns {node_types, relationships, nodes, links}:
+    nodes maps each NetworkNode field to an array (type as a code into
+    node_types), and links holds parallel source/target arrays of node
+    positions plus relationship codes into relationships and weights.
+    """
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=501, detail="format=msgpack is not available on this server")
+    if center and top_n:
+        raise HTTPException(status_code=400, detail="center and top_n cannot be combined")
+    graph = network_graph.get(db)
+    media_type = FORMATS[fmt]
+    if lod and not center and not top_n:
+        opened = frozenset(s.strip() for s in (expand or "").split(",") if s.strip())
+        return Response(content=graph.clustered(lod, opened, fmt), media_type=media_type)
+
+    nodes: Optional[set[int]] = None
+    if center:
+        center_node = graph.resolve(center)
+        if center_node is not None:  # No match, return all
+            nodes = graph.neighborhood(center_node, depth)
+    elif top_n:
+        # Top artists plus their direct connections
+        nodes = set()
+        for node in graph.top_artists(top_n):
+            nodes.add(node)
+            nodes.update(graph.neighbors(node))
+
+    return Response(content=graph.render(nodes, fmt), media_type=media_type)
+
+
+@router.get("/path", response_model=NetworkPathResponse)
+def get_network_path(
+    source: str = Query(..., alias="from", description="Start node (key, spotify_id or name)"),
+    target: str = Query(..., alias="to", description="End node (key, spotify_id or name)"),
+    max_hops: int = Query(4, ge=1, le=MAX_HOPS),
+    types: Optional[str] = Query(
+        None, description="Relationship types to follow, e.g. produced_by,signed_to"
+    ),
+    k: int = Query(1, ge=1, le=MAX_ALTERNATIVES, description="Number of alternative paths"),
+    db: Session = Depends(get_db),
+):
+    """How two nodes are connected: the k shortest paths between them.
+
+    Nodes resolve like the graph endpoint's center. Paths are shortest
+    first and never revisit a node. types names relationship types in the
+    graph; any other name is a 400.
+    """
+    graph = network_graph.get(db)
+    source_node, target_node = graph.resolve(source), graph.resolve(target)
+    for name, node in ((source, source_node), (target, target_node)):
+        if node is None:
+            raise HTTPException(status_code=404, detail=f"Node not found: {name}")
+
+    type_codes = None
+    if types:
+        names = {t.strip() for t in types.split(",") if t.strip()}
+        unknown = sorted(names - graph.type_codes.keys())
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown relationship types: {', '.join(unknown)}"
             )
-        )
-
-    # Enrich artist nodes with composite scores and spotify_id
-    artists = db.query(Artist).all()
-    for artist in artists:
-        key = f"artist:{artist.name}"
-        if key in nodes_map:
-            nodes_map[key].spotify_id = artist.spotify_id
-            latest_score = (
-                db.query(Score)
-                .filter(Score.artist_id == artist.spotify_id)
-                .order_by(Score.score_date.desc())
-                .first()
+        type_codes = {graph.type_codes[name] for name in names}
+
+    paths = k_shortest_paths(graph, source_node, target_node, k, max_hops, type_codes)
+    return NetworkPathResponse(
+        source=graph.node_model(source_node),
+        target=graph.node_model(target_node),
+        paths=[
+            NetworkPath(
+                hops=path.hops,
+                nodes=[graph.node_model(n) for n in path.nodes],
+                links=[graph.link_model(e) for e in path.links],
             )
-            if latest_score:
-                nodes_map[key].score = latest_score.composite
-
-    # Filter to top N artists if specified and no center
-    if not center and top_n:
-        from sqlalchemy import func
-
-        top_scores = (
-            db.query(Score.artist_id, func.max(Score.composite).label("max_comp"))
-            .group_by(Score.artist_id)
-            .subquery()
+            for path in paths
+        ],
+    )
+
+
+@router.get("/rankings", response_model=list[NodeRanking])
+def get_rankings(
+    response: Response,
+    sort_by: str = Query("pagerank", description="pagerank, betweenness, degree or weighted_degree"),
+    node_type: Optional[str] = Query(
+        None, alias="type", description="artist, producer, label, management or agency"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Graph nodes ranked by precomputed centrality, most central first."""
+    if sort_by not in RANKING_COLUMNS:
+        sort_by = "pagerank"
+    column = RANKING_COLUMNS[sort_by]
+    query = db.query(NodeMetric)
+    if node_type:
+        query = query.filter(NodeMetric.node_type == node_type)
+    if cursor:
+        after_value, after_key = decode_cursor(cursor, 2)
+        if not isinstance(after_value, (int, float)) or not isinstance(after_key, str):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(column, NodeMetric.node_key) < (after_value, after_key))
+
+    rows = query.order_by(column.desc(), NodeMetric.node_key.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            getattr(rows[-1], sort_by), rows[-1].node_key
         )
-        top_artists = (
-            db.query(Artist.name)
-            .join(top_scores, Artist.spotify_id == top_scores.c.artist_id)
-            .order_by(top_scores.c.max_comp.desc().nullslast())
-            .limit(top_n)
-            .all()
+    return [
+        NodeRanking(
+            id=row.node_key,
+            label=row.label,
+            type=row.node_type,
+            degree=row.degree,
+            weighted_degree=row.weighted_degree,
+            pagerank=row.pagerank,
+            betweenness=row.betweenness,
         )
-        top_names = {a.name for a in top_artists}
-        top_keys = {f"artist:{name}" for name in top_names}
-        # Include top artists + their direct connections
-        connected = set()
-        for link in links:
-            if link.source in top_keys or link.target in top_keys:
-                connected.add(link.source)
-                connected.add(link.target)
-        nodes_map = {k: v for k, v in nodes_map.items() if k in connected}
-        links = [lnk for lnk in links if lnk.source in connected and lnk.target in connected]
-
-    # Filter by center node if specified
-    if center:
-        connected = _get_connected_nodes(center, links, nodes_map, depth)
-        nodes_map = {k: v for k, v in nodes_map.items() if k in connected}
-        links = [
-            link
-            for link in links
-            if link.source in connected and link.target in connected
-        ]
-
-    return NetworkGraph(nodes=list(nodes_map.values()), links=links)
-
-
-def _get_connected_nodes(
-    center: str,
-    links: list[NetworkLink],
-    nodes_map: dict[str, NetworkNode],
-    depth: int,
-) -> set[str]:
-    """BFS to find nodes within N hops of center."""
-    # Try to match center to a node
-    center_key = None
-    for key, node in nodes_map.items():
-        if center.lower() in node.label.lower() or center.lower() in key.lower():
-            center_key = key
-            break
-
-    if not center_key:
-        return set(nodes_map.keys())  # No match, return all
-
-    visited: set[str] = {center_key}
-    frontier: set[str] = {center_key}
-
-    for _ in range(depth):
-        next_frontier: set[str] = set()
-        for link in links:
-            if link.source in frontier:
-                next_frontier.add(link.target)
-            if link.target in frontier:
-                next_frontier.add(link.source)
-        next_frontier -= visited
-        visited |= next_frontier
-        frontier = next_frontier
-
-    return visited
+        for row in rows
+    ]
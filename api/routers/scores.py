@@ -1,7 +1,11 @@
 """Score endpoints for the Metalcore Index API."""
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from batching import parse_fields, parse_ids
 from database import get_db
 from models import Score
 from schemas import ScoreResponse
@@ -9,6 +13,36 @@ from schemas import ScoreResponse
 router = APIRouter(prefix="/api/scores", tags=["scores"])
 
 
+@router.get("/batch")
+def get_scores_batch(
+    ids: str = Query(..., description="Comma-separated artist spotify IDs"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated score fields to return (default all)"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Score histories for several artists in one IN query, keyed by artist ID.
+
+    Each history is newest first, like /api/scores/{artist_id}.
+    """
+    wanted = parse_ids(ids)
+    selected = parse_fields(fields, ScoreResponse.model_fields)
+    query = db.query(Score).filter(Score.artist_id.in_(wanted))
+    if from_date:
+        query = query.filter(Score.score_date >= from_date)
+    if to_date:
+        query = query.filter(Score.score_date <= to_date)
+
+    histories: dict[str, list[dict]] = {artist_id: [] for artist_id in wanted}
+    for score in query.order_by(Score.artist_id, Score.score_date.desc()):
+        histories[score.artist_id].append(
+            ScoreResponse.model_validate(score).model_dump(include=selected)
+        )
+    return histories
+
+
 @router.get("/{artist_id}", response_model=list[ScoreResponse])
 def get_artist_scores(artist_id: str, db: Session = Depends(get_db)):
     """Get score history for an artist."""
@@ -8,11 +8,18 @@ import os
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Header
+from sqlalchemy import insert, tuple_, update
 from sqlalchemy.orm import Session
 
 from database import get_db, Base, engine
+from manifest import file_changes, save_changes
+from materialized.artist_documents import refresh_artist_documents, with_related_artists
+from materialized.latest_scores import refresh_latest_scores
+from materialized.node_layouts import refresh_node_layouts
+from materialized.node_metrics import refresh_node_metrics
+from materialized.versions import bump_version
 from models import (
-    Artist, ArtistSnapshot, Score, Producer, Label, Relationship,
+    Artist, ArtistSnapshot, LatestScore, Score, Producer, Label, Relationship,
 )
 from scoring.engine import (
     compute_industry_signal,
@@ -32,6 +39,10 @@ try:
 except ImportError:
     simulate_spotify_data = None
     simulate_release_data = None
+try:
+    from pipeline.youtube_collector import simulate_youtube_data
+except ImportError:
+    simulate_youtube_data = None
 
 router = APIRouter(tags=["seed"])
 logger = logging.getLogger(__name__)
@@ -40,11 +51,11 @@ DATA_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
     "data",
 )
+_CHUNK = 500  # keys per IN list
 
 
 def _load_json(filename):
-    path = os.path.join(DATA_DIR, filename)
-    with open(path) as f:
+    with open(_data_path(filename)) as f:
         return json.load(f)
 
 
@@ -60,7 +71,11 @@ def seed_database(
     _auth=Depends(_verify_secret),
 ):
     """Seed production DB with artists, producers, labels,
-    relationships, snapshots, and scores. Only runs if empty."""
+    relationships, snapshots, and scores. Only runs if empty.
+
+    Rows are built in memory from one pass over each data file and
+    written with one multi-row INSERT per table, in a single transaction;
+    scores are computed from those rows rather than read back."""
     artist_count = db.query(Artist).count()
     if artist_count > 0:
         return {
@@ -72,187 +87,185 @@ def seed_database(
     today = date.today()
 
     # --- Artists ---
-    artists_data = _load_json("artists.json")
     matches_path = os.path.join(DATA_DIR, "spotify_matches.json")
     spotify_map = {}
     if os.path.exists(matches_path):
         for m in _load_json("spotify_matches.json"):
             spotify_map[m["name"]] = m
 
-    for a in artists_data:
+    artist_rows = []
+    for a in _load_json("artists.json"):
         match = spotify_map.get(a["name"])
-        spotify_id = match["spotify_id"] if match else a["spotify_id"]
-        image_url = match.get("image_url") if match else None
         genres = (
             match.get("genres", a.get("genres", []))
             if match else a.get("genres", [])
         )
-        db.add(Artist(
-            spotify_id=spotify_id,
-            name=a["name"],
-            genres=json.dumps(genres),
-            image_url=image_url,
-            current_label=a.get("current_label"),
-            current_manager=a.get("current_manager"),
-            current_management_co=a.get("current_management_co"),
-            booking_agency=a.get("booking_agency"),
-            active=True,
-        ))
-    db.flush()
-    logger.info("Seeded %d artists", len(artists_data))
-
-    # --- Producers ---
-    for p in _load_json("producers.json"):
-        db.add(Producer(
-            name=p["name"],
-            studio_name=p.get("studio_name"),
-            location=p.get("location"),
-            credits=json.dumps(p.get("credits", [])),
-            tier=p.get("tier"),
-            sonic_signature=p.get("sonic_signature"),
-        ))
-    db.flush()
-
-    # --- Labels ---
-    for lbl in _load_json("labels.json"):
-        db.add(Label(
-            name=lbl["name"],
-            parent_company=lbl.get("parent_company"),
-            distribution=lbl.get("distribution"),
-            key_contact=lbl.get("key_contact"),
-            contact_title=lbl.get("contact_title"),
-        ))
-    db.flush()
-
-    # --- Relationships ---
+        artist_rows.append({
+            "spotify_id": match["spotify_id"] if match else a["spotify_id"],
+            "name": a["name"],
+            "genres": json.dumps(genres),
+            "image_url": match.get("image_url") if match else None,
+            "current_label": _text(a.get("current_label")),
+            "current_manager": _text(a.get("current_manager")),
+            "current_management_co": _text(a.get("current_management_co")),
+            "booking_agency": _text(a.get("booking_agency")),
+            "active": True,
+        })
+
+    producer_rows = [
+        {
+            "name": p["name"],
+            "studio_name": p.get("studio_name"),
+            "location": p.get("location"),
+            "credits": json.dumps(p.get("credits", [])),
+            "tier": p.get("tier"),
+            "sonic_signature": p.get("sonic_signature"),
+        }
+        for p in _load_json("producers.json")
+    ]
+    label_rows = [
+        {
+            "name": lbl["name"],
+            "parent_company": lbl.get("parent_company"),
+            "distribution": lbl.get("distribution"),
+            "key_contact": lbl.get("key_contact"),
+            "contact_title": lbl.get("contact_title"),
+        }
+        for lbl in _load_json("labels.json")
+    ]
+
+    # Relationships, noting each artist's first producer for scoring
+    relationship_rows = []
+    producer_of: dict[str, str] = {}
     for r in _load_json("relationships.json"):
-        db.add(Relationship(
-            source_type=r["source_type"],
-            source_id=r["source_id"],
-            target_type=r["target_type"],
-            target_id=r["target_id"],
-            relationship_type=r["relationship_type"],
-        ))
-    db.flush()
-
-    # --- Simulated Snapshots ---
-    artists = db.query(Artist).filter(Artist.active.is_(True)).all()
-    for artist in artists:
-        sp_data = simulate_spotify_data(artist.name, artist.spotify_id)
+        relationship_rows.append({
+            "source_type": r["source_type"],
+            "source_id": r["source_id"],
+            "target_type": r["target_type"],
+            "target_id": r["target_id"],
+            "relationship_type": r["relationship_type"],
+        })
+        if r["source_type"] == "artist" and r["relationship_type"] == "produced_by":
+            producer_of.setdefault(r["source_id"], r["target_id"])
+
+    # --- Simulated snapshots and scores ---
+    snapshot_rows, score_rows = [], []
+    for artist in artist_rows:
+        name = artist["name"]
+        sp_data = simulate_spotify_data(name, artist["spotify_id"])
         yt_data = None
-        try:
-            from pipeline.youtube_collector import simulate_youtube_data
-            yt_data = simulate_youtube_data(
-                artist.name, artist.youtube_channel_id or ""
-            )
-        except Exception:
-            pass
-
-        db.add(ArtistSnapshot(
-            artist_id=artist.spotify_id,
-            snapshot_date=today,
-            spotify_popularity=sp_data.popularity,
-            spotify_followers=sp_data.followers,
-            youtube_subscribers=yt_data.subscriber_count if yt_data else None,
-            youtube_total_views=yt_data.total_views if yt_data else None,
-            youtube_recent_views=(
-                yt_data.recent_video_views if yt_data else None
-            ),
-            youtube_comment_count=(
-                yt_data.recent_comment_count if yt_data else None
-            ),
-        ))
-    db.flush()
-
-    # --- Scores ---
-    for artist in artists:
-        snapshots = (
-            db.query(ArtistSnapshot)
-            .filter(ArtistSnapshot.artist_id == artist.spotify_id)
-            .order_by(ArtistSnapshot.snapshot_date.desc())
-            .limit(2)
-            .all()
-        )
-        current_snap = snapshots[0] if snapshots else None
-
-        # Trajectory from popularity baseline
-        pop = current_snap.spotify_popularity or 0 if current_snap else 0
-        trajectory = 20 + (pop * 0.75)
-
-        # Industry signal
-        producer_name = _get_producer(artist.name, db)
-        industry_signal = compute_industry_signal(
-            label_name=artist.current_label,
-            producer_name=producer_name,
-            agency_name=artist.booking_agency,
-            management_name=artist.current_management_co,
-        )
+        if simulate_youtube_data is not None:
+            try:
+                yt_data = simulate_youtube_data(name, "")
+            except Exception:
+                pass
+        snapshot_rows.append({
+            "artist_id": artist["spotify_id"],
+            "snapshot_date": today,
+            "spotify_popularity": sp_data.popularity,
+            "spotify_followers": sp_data.followers,
+            "youtube_subscribers": yt_data.subscriber_count if yt_data else None,
+            "youtube_total_views": yt_data.total_views if yt_data else None,
+            "youtube_recent_views": yt_data.recent_video_views if yt_data else None,
+            "youtube_comment_count": yt_data.recent_comment_count if yt_data else None,
+        })
+        score_rows.append(_seed_score(artist, snapshot_rows[-1], sp_data, producer_of.get(name), today))
+
+    for model, rows in (
+        (Artist, artist_rows),
+        (Producer, producer_rows),
+        (Label, label_rows),
+        (Relationship, relationship_rows),
+        (ArtistSnapshot, snapshot_rows),
+        (Score, score_rows),
+    ):
+        if rows:
+            # render_nulls keeps rows with different missing fields in one batch
+            db.execute(insert(model).execution_options(render_nulls=True), rows)
+    logger.info("Seeded %d artists", len(artist_rows))
+
+    refresh_latest_scores(db)
+    refresh_artist_documents(db)  # after latest scores, which related artists show
+    refresh_node_metrics(db)
+    refresh_node_layouts(db)
+    bump_version(db, "artists", "relationships")
 
-        # Engagement
-        sp_sim = simulate_spotify_data(artist.name, artist.spotify_id)
-        track_pops = sp_sim.top_track_popularities
-        yt_vel = None
-        if current_snap and current_snap.youtube_recent_views:
-            views = current_snap.youtube_recent_views
-            comments = current_snap.youtube_comment_count or 0
-            if views > 0:
-                yt_vel = (comments / views) * 1000
-        engagement = compute_engagement(
-            track_popularity_distribution=track_pops,
-            youtube_comment_velocity=yt_vel,
-        )
+    db.commit()
 
-        # Release positioning
-        rel_data = simulate_release_data(artist.name)
-        release_positioning = compute_release_positioning(
-            rel_data.months_since_release
-        )
+    final_counts = {
+        "artists": len(artist_rows),
+        "producers": len(producer_rows),
+        "labels": len(label_rows),
+        "relationships": len(relationship_rows),
+        "snapshots": len(snapshot_rows),
+        "scores": len(score_rows),
+    }
+    logger.info("Seed complete: %s", final_counts)
 
-        composite = compute_composite(
-            trajectory, industry_signal, engagement, release_positioning
-        )
-        grade = assign_grade(composite)
+    return {"status": "seeded", "counts": final_counts}
+
+
+def _seed_score(artist: dict, snapshot: dict, sp_data, producer_name: str | None, today: date) -> dict:
+    """Score row for a freshly seeded artist from its simulated snapshot."""
+    # Trajectory from popularity baseline
+    pop = snapshot["spotify_popularity"] or 0
+    trajectory = 20 + (pop * 0.75)
+
+    industry_signal = compute_industry_signal(
+        label_name=artist["current_label"],
+        producer_name=producer_name,
+        agency_name=artist["booking_agency"],
+        management_name=artist["current_management_co"],
+    )
+
+    yt_vel = None
+    views = snapshot["youtube_recent_views"]
+    if views:
+        comments = snapshot["youtube_comment_count"] or 0
+        if views > 0:
+            yt_vel = (comments / views) * 1000
+    engagement = compute_engagement(
+        track_popularity_distribution=sp_data.top_track_popularities,
+        youtube_comment_velocity=yt_vel,
+    )
 
-        # Determine producer tier for segment tagging
-        prod_tier = None
-        if producer_name:
-            prod_tier = _fuzzy_lookup(producer_name, PRODUCER_TIERS)
+    rel_data = simulate_release_data(artist["name"])
+    release_positioning = compute_release_positioning(
+        rel_data.months_since_release
+    )
 
-        segment_tag = assign_segment_tag(
+    composite = compute_composite(
+        trajectory, industry_signal, engagement, release_positioning
+    )
+
+    # Determine producer tier for segment tagging
+    prod_tier = None
+    if producer_name:
+        prod_tier = _fuzzy_lookup(producer_name, PRODUCER_TIERS)
+
+    return {
+        "artist_id": artist["spotify_id"],
+        "score_date": today,
+        "trajectory": round(trajectory, 2),
+        "industry_signal": round(industry_signal, 2),
+        "engagement": round(engagement, 2),
+        "release_positioning": round(release_positioning, 2),
+        "composite": round(composite, 2),
+        "grade": assign_grade(composite),
+        "segment_tag": assign_segment_tag(
             composite=composite,
             trajectory=trajectory,
             industry_signal=industry_signal,
             previous_composite=None,
-            label_name=artist.current_label,
+            label_name=artist["current_label"],
             producer_tier=prod_tier,
-        )
-
-        db.add(Score(
-            artist_id=artist.spotify_id,
-            score_date=today,
-            trajectory=round(trajectory, 2),
-            industry_signal=round(industry_signal, 2),
-            engagement=round(engagement, 2),
-            release_positioning=round(release_positioning, 2),
-            composite=round(composite, 2),
-            grade=grade,
-            segment_tag=segment_tag,
-        ))
-    db.flush()
-
-    db.commit()
-
-    final_counts = {
-        "artists": db.query(Artist).count(),
-        "producers": db.query(Producer).count(),
-        "labels": db.query(Label).count(),
-        "relationships": db.query(Relationship).count(),
-        "snapshots": db.query(ArtistSnapshot).count(),
-        "scores": db.query(Score).count(),
+        ),
     }
-    logger.info("Seed complete: %s", final_counts)
 
-    return {"status": "seeded", "counts": final_counts}
+
+def _text(value):
+    """A text field from the data files; empty objects ({}) mean missing."""
+    return value if value != {} else None
 
 
 @router.post("/api/rescore")
@@ -262,153 +275,165 @@ def rescore_all(
 ):
     """Reload all data from JSON files: artists, producers, relationships, scores.
     Uses pre-computed scores from scores.json (built by R/build_scores.R from
-    real mined data: Wikipedia pageviews, Deezer fans, Reddit buzz, Kworb streams)."""
-    artists = db.query(Artist).all()
-
-    # Refresh artist metadata and insert new artists from data files
-    artists_data = _load_json("artists.json")
-    name_to_data = {a["name"]: a for a in artists_data}
-    existing_names = {a.name for a in artists}
+    real mined data: Wikipedia pageviews, Deezer fans, Reddit buzz, Kworb streams).
+
+    Files unchanged since the last rescore are skipped, and from the others
+    only records whose content hash changed are applied (see manifest.py)."""
+    artist_changes = file_changes(db, _data_path("artists.json"), lambda a: a["name"])
+    producer_changes = file_changes(db, _data_path("producers.json"), lambda p: p["name"])
+    rel_changes = file_changes(db, _data_path("relationships.json"), _relationship_key)
+    score_changes = file_changes(db, _data_path("scores.json"), lambda s: s["artist_id"])
     metadata_updated = 0
     artists_added = 0
-
-    # Update existing artist metadata
-    for artist in artists:
-        src = name_to_data.get(artist.name)
-        if not src:
-            continue
-        changed = False
-        for field in ["current_label", "booking_agency", "current_management_co",
-                      "current_manager", "booking_agent"]:
-            if src.get(field) and getattr(artist, field, None) != src[field]:
-                setattr(artist, field, src[field])
-                changed = True
-        if changed:
-            metadata_updated += 1
-
-    # Insert new artists not yet in DB
-    for a in artists_data:
-        if a["name"] in existing_names:
-            continue
-        db.add(Artist(
-            spotify_id=a["spotify_id"],
-            name=a["name"],
-            genres=json.dumps(a.get("genres", [])),
-            image_url=None,
-            current_label=a.get("current_label"),
-            current_manager=a.get("current_manager"),
-            current_management_co=a.get("current_management_co"),
-            booking_agency=a.get("booking_agency"),
-            booking_agent=a.get("booking_agent"),
-            active=True,
-        ))
-        artists_added += 1
-    db.flush()
-
-    # Refresh producers from data file
-    producers_data = _load_json("producers.json")
-    existing_producers = {p.name for p in db.query(Producer).all()}
     producers_added = 0
-    for p in producers_data:
-        if p["name"] not in existing_producers:
-            db.add(Producer(
-                name=p["name"],
-                studio_name=p.get("studio_name"),
-                location=p.get("location"),
-                credits=json.dumps(p.get("credits", [])),
-                tier=p.get("tier"),
-                sonic_signature=p.get("sonic_signature"),
-            ))
-            producers_added += 1
-    db.flush()
-
-    # Refresh relationships from data file
-    rels_data = _load_json("relationships.json")
-    existing_rels = {
-        (r.source_id, r.target_id, r.relationship_type)
-        for r in db.query(Relationship).all()
-    }
     rels_added = 0
-    for r in rels_data:
-        key = (r["source_id"], r["target_id"], r["relationship_type"])
-        if key not in existing_rels:
-            db.add(Relationship(
-                source_type=r["source_type"],
-                source_id=r["source_id"],
-                target_type=r["target_type"],
-                target_id=r["target_id"],
-                relationship_type=r["relationship_type"],
-            ))
-            rels_added += 1
-    db.flush()
-
-    # Load pre-computed scores from scores.json
-    scores_data = _load_json("scores.json")
-    # Build lookup by artist_id (real Spotify ID from scores.json)
-    scores_by_id = {s["artist_id"]: s for s in scores_data}
-    # Also build lookup by artist name for fallback (DB may use placeholder IDs)
-    artists_data_map = {a.get("spotify_id"): a["name"] for a in artists_data}
-    scores_by_name = {}
-    for s in scores_data:
-        name = artists_data_map.get(s["artist_id"])
-        if name:
-            scores_by_name[name] = s
-    today = date.today()
-    updated = 0
-
-    # Re-query to include newly added artists
-    artists = db.query(Artist).all()
-
-    for artist in artists:
-        # Try matching by spotify_id first, then by name
-        score_src = scores_by_id.get(artist.spotify_id)
-        if not score_src:
-            score_src = scores_by_name.get(artist.name)
-        if not score_src:
-            logger.warning("No pre-computed score for %s (%s)", artist.name, artist.spotify_id)
-            continue
-
-        trajectory = score_src.get("trajectory", 0)
-        industry_signal = score_src.get("industry_signal", 0)
-        engagement = score_src.get("engagement", 0)
-        release_positioning = score_src.get("release_positioning", 0)
-        composite = score_src.get("composite", 0)
-        grade = score_src.get("grade", "D")
-        segment_tag = score_src.get("segment_tag", "Established Stable")
-
-        # Update existing score or create new one
-        existing = (
-            db.query(Score)
-            .filter(Score.artist_id == artist.spotify_id)
-            .order_by(Score.score_date.desc())
-            .first()
-        )
-        if existing:
-            existing.trajectory = round(trajectory, 2)
-            existing.industry_signal = round(industry_signal, 2)
-            existing.engagement = round(engagement, 2)
-            existing.release_positioning = round(release_positioning, 2)
-            existing.composite = round(composite, 2)
-            existing.grade = grade
-            existing.segment_tag = segment_tag
-            existing.score_date = today
+    touched_ids = set()
+    new_artist_ids = []
+    new_producers = []
+    new_rels = []
+
+    if artist_changes:
+        changed = {a["name"]: a for a in artist_changes.changed}
+        names = sorted(changed)
+        existing_names = set()
+        # Update existing artist metadata
+        for i in range(0, len(names), _CHUNK):
+            for artist in db.query(Artist).filter(Artist.name.in_(names[i:i + _CHUNK])):
+                existing_names.add(artist.name)
+                src = changed[artist.name]
+                updated_fields = False
+                for field in ["current_label", "booking_agency", "current_management_co",
+                              "current_manager", "booking_agent"]:
+                    if src.get(field) and getattr(artist, field, None) != src[field]:
+                        setattr(artist, field, src[field])
+                        updated_fields = True
+                if updated_fields:
+                    metadata_updated += 1
+                    touched_ids.add(artist.spotify_id)
+
+        # Insert new artists not yet in DB
+        new_rows = [
+            {
+                "spotify_id": a["spotify_id"],
+                "name": a["name"],
+                "genres": json.dumps(a.get("genres", [])),
+                "image_url": None,
+                "current_label": _text(a.get("current_label")),
+                "current_manager": _text(a.get("current_manager")),
+                "current_management_co": _text(a.get("current_management_co")),
+                "booking_agency": _text(a.get("booking_agency")),
+                "booking_agent": _text(a.get("booking_agent")),
+                "active": True,
+            }
+            for a in changed.values() if a["name"] not in existing_names
+        ]
+        if new_rows:
+            db.execute(insert(Artist).execution_options(render_nulls=True), new_rows)
+        artists_added = len(new_rows)
+        new_artist_ids = [row["spotify_id"] for row in new_rows]
+
+    # New producers from the data file
+    if producer_changes:
+        changed = {p["name"]: p for p in producer_changes.changed}
+        names = sorted(changed)
+        existing_producers = set()
+        for i in range(0, len(names), _CHUNK):
+            existing_producers.update(
+                name for (name,) in db.query(Producer.name).filter(Producer.name.in_(names[i:i + _CHUNK]))
+            )
+        new_rows = [
+            {
+                "name": p["name"],
+                "studio_name": p.get("studio_name"),
+                "location": p.get("location"),
+                "credits": json.dumps(p.get("credits", [])),
+                "tier": p.get("tier"),
+                "sonic_signature": p.get("sonic_signature"),
+            }
+            for name, p in changed.items() if name not in existing_producers
+        ]
+        if new_rows:
+            db.execute(insert(Producer).execution_options(render_nulls=True), new_rows)
+        producers_added = len(new_rows)
+        new_producers = [row["name"] for row in new_rows]
+
+    # New relationships from the data file
+    if rel_changes:
+        changed = {
+            (r["source_id"], r["target_id"], r["relationship_type"]): r for r in rel_changes.changed
+        }
+        keys = sorted(changed)
+        existing_rels = set()
+        for i in range(0, len(keys), _CHUNK):
+            existing_rels.update(
+                tuple(row) for row in db.query(
+                    Relationship.source_id, Relationship.target_id, Relationship.relationship_type,
+                ).filter(
+                    tuple_(
+                        Relationship.source_id, Relationship.target_id, Relationship.relationship_type,
+                    ).in_(keys[i:i + _CHUNK])
+                )
+            )
+        new_rows = [
+            {
+                "source_type": r["source_type"],
+                "source_id": r["source_id"],
+                "target_type": r["target_type"],
+                "target_id": r["target_id"],
+                "relationship_type": r["relationship_type"],
+            }
+            for key, r in changed.items() if key not in existing_rels
+        ]
+        if new_rows:
+            db.execute(insert(Relationship), new_rows)
+        rels_added = len(new_rows)
+        new_rels = new_rows
+
+    # Pre-computed scores: changed records, plus any artist added above
+    rescored_ids = []
+    if score_changes or new_artist_ids:
+        scores_data = score_changes.records if score_changes else _load_json("scores.json")
+        to_apply = {s["artist_id"]: s for s in score_changes.changed} if score_changes else {}
+        new_ids = set(new_artist_ids)
+        to_apply.update((s["artist_id"], s) for s in scores_data if s["artist_id"] in new_ids)
+        rescored_ids, unmatched = _apply_scores(db, to_apply, artist_changes)
+        touched_ids.update(rescored_ids)
+        if score_changes and unmatched:
+            # Offered again next time, when their artist may exist
+            score_changes.skip(unmatched)
+
+    refresh_latest_scores(db, rescored_ids)
+    # Documents list producer credits (with studios) and shared_producer links
+    touched_ids |= _artists_named(
+        db,
+        {name for r in new_rels for name in (r["source_id"], r["target_id"])}
+        | _credited_artists(db, new_producers),
+    )
+    if touched_ids:
+        refresh_artist_documents(db, with_related_artists(db, touched_ids))
+    if metadata_updated or artists_added:
+        bump_version(db, "artists")
+    if producers_added or rels_added:
+        refresh_node_metrics(db)
+        refresh_node_layouts(db)
+        bump_version(db, "relationships")
+
+    unchanged = []
+    for name, changes in (
+        ("artists.json", artist_changes),
+        ("producers.json", producer_changes),
+        ("relationships.json", rel_changes),
+        ("scores.json", score_changes),
+    ):
+        if changes:
+            save_changes(db, changes)
         else:
-            db.add(Score(
-                artist_id=artist.spotify_id,
-                score_date=today,
-                trajectory=round(trajectory, 2),
-                industry_signal=round(industry_signal, 2),
-                engagement=round(engagement, 2),
-                release_positioning=round(release_positioning, 2),
-                composite=round(composite, 2),
-                grade=grade,
-                segment_tag=segment_tag,
-            ))
-        updated += 1
-
+            unchanged.append(name)
     db.commit()
-    logger.info("Rescore complete: %d scored, %d metadata refreshed, %d new artists, %d producers, %d rels",
-                updated, metadata_updated, artists_added, producers_added, rels_added)
+    updated = len(rescored_ids)
+    logger.info("Rescore complete: %d scored, %d metadata refreshed, %d new artists, %d producers, %d rels"
+                " (unchanged: %s)", updated, metadata_updated, artists_added, producers_added, rels_added,
+                ", ".join(unchanged) or "none")
     return {
         "status": "rescored",
         "artists_updated": updated,
@@ -416,17 +441,106 @@ def rescore_all(
         "artists_added": artists_added,
         "producers_added": producers_added,
         "relationships_added": rels_added,
+        "files_unchanged": unchanged,
     }
 
 
-def _get_producer(artist_name: str, db) -> str | None:
-    rel = (
-        db.query(Relationship)
-        .filter(
-            Relationship.source_type == "artist",
-            Relationship.source_id == artist_name,
-            Relationship.relationship_type == "produced_by",
+def _apply_scores(
+    db: Session, scores_by_id: dict, artist_changes
+) -> tuple[list[str], list[str]]:
+    """
+    Write score records onto each matching artist's latest score row (or a
+    new one for today). Records match artists by spotify_id, then by name
+    through artists.json, since the DB may use placeholder IDs. Returns the
+    spotify_ids of the artists scored, and the keys of records that matched
+    no artist.
+    """
+    if not scores_by_id:
+        return [], []
+    ids = sorted(scores_by_id)
+    matched: dict[str, dict] = {}  # artist spotify_id -> score record
+    for i in range(0, len(ids), _CHUNK):
+        for (sid,) in db.query(Artist.spotify_id).filter(Artist.spotify_id.in_(ids[i:i + _CHUNK])):
+            matched[sid] = scores_by_id[sid]
+    unmatched = [sid for sid in ids if sid not in matched]
+    if unmatched:
+        artists_data = artist_changes.records if artist_changes else _load_json("artists.json")
+        name_for_id = {a.get("spotify_id"): a["name"] for a in artists_data}
+        by_name = {name_for_id[sid]: scores_by_id[sid] for sid in unmatched if sid in name_for_id}
+        names = sorted(by_name)
+        for i in range(0, len(names), _CHUNK):
+            for sid, name in db.query(Artist.spotify_id, Artist.name).filter(
+                Artist.name.in_(names[i:i + _CHUNK])
+            ):
+                matched.setdefault(sid, by_name[name])
+    applied = {record["artist_id"] for record in matched.values()}
+    unmatched = [key for key in ids if key not in applied]
+    if unmatched:
+        logger.warning("%d pre-computed scores match no artist", len(unmatched))
+
+    # Current latest score rows, via the latest_scores mirror
+    artist_ids = sorted(matched)
+    latest_ids = {}
+    for i in range(0, len(artist_ids), _CHUNK):
+        latest_ids.update(
+            db.query(Score.artist_id, Score.id)
+            .join(LatestScore, LatestScore.score_id == Score.id)
+            .filter(Score.artist_id.in_(artist_ids[i:i + _CHUNK]))
         )
-        .first()
-    )
-    return rel.target_id if rel else None
+    today = date.today()
+    updates, inserts = [], []
+    for sid in artist_ids:
+        score_src = matched[sid]
+        values = {
+            "score_date": today,
+            "trajectory": round(score_src.get("trajectory", 0), 2),
+            "industry_signal": round(score_src.get("industry_signal", 0), 2),
+            "engagement": round(score_src.get("engagement", 0), 2),
+            "release_positioning": round(score_src.get("release_positioning", 0), 2),
+            "composite": round(score_src.get("composite", 0), 2),
+            "grade": score_src.get("grade", "D"),
+            "segment_tag": score_src.get("segment_tag", "Established Stable"),
+        }
+        # Update existing score or create new one
+        if sid in latest_ids:
+            updates.append({"id": latest_ids[sid], **values})
+        else:
+            inserts.append({"artist_id": sid, **values})
+    if updates:
+        db.execute(update(Score), updates)
+    if inserts:
+        db.execute(insert(Score), inserts)
+    return artist_ids, unmatched
+
+
+def _artists_named(db: Session, names) -> set[str]:
+    """spotify_ids of the artists with these names (relationships use names)."""
+    names = sorted(names)
+    ids = set()
+    for i in range(0, len(names), _CHUNK):
+        ids.update(
+            sid for (sid,) in db.query(Artist.spotify_id).filter(Artist.name.in_(names[i:i + _CHUNK]))
+        )
+    return ids
+
+
+def _credited_artists(db: Session, producers) -> set[str]:
+    """Names of the artists with a produced_by credit for any of these producers."""
+    producers = sorted(producers)
+    names = set()
+    for i in range(0, len(producers), _CHUNK):
+        names.update(
+            source for (source,) in db.query(Relationship.source_id).filter(
+                Relationship.relationship_type == "produced_by",
+                Relationship.target_id.in_(producers[i:i + _CHUNK]),
+            )
+        )
+    return names
+
+
+def _data_path(filename: str) -> str:
+    return os.path.join(DATA_DIR, filename)
+
+
+def _relationship_key(r: dict) -> str:
+    return json.dumps([r["source_id"], r["target_id"], r["relationship_type"]])
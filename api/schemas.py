@@ -110,15 +110,25 @@ class RelatedArtistBrief(BaseModel):
 class NetworkNode(BaseModel):
     id: str
     label: str
-    type: str  # artist, producer, label, management
+    type: str  # artist, producer, label, management; community, group for supernodes
     score: Optional[float] = None
     spotify_id: Optional[str] = None
+    # Centrality, precomputed whenever relationships change
+    degree: Optional[int] = None
+    pagerank: Optional[float] = None
+    betweenness: Optional[float] = None
+    # Precomputed layout position (the whole graph spans roughly -1..1)
+    x: Optional[float] = None
+    y: Optional[float] = None
+    community: Optional[int] = None
+    size: Optional[int] = None  # supernodes: number of nodes folded in
 
 
 class NetworkLink(BaseModel):
     source: str
     target: str
-    relationship: str
+    relationship: str  # "clustered" for merged links between supernodes
+    weight: Optional[float] = None
 
 
 class NetworkGraph(BaseModel):
@@ -126,6 +136,30 @@ class NetworkGraph(BaseModel):
     links: list[NetworkLink]
 
 
+class NodeRanking(BaseModel):
+    """A graph node with its stored centrality metrics."""
+    id: str
+    label: str
+    type: str
+    degree: int
+    weighted_degree: float
+    pagerank: float
+    betweenness: float
+
+
+class NetworkPath(BaseModel):
+    """Nodes from source to target; links[i] joins nodes[i] and nodes[i + 1]."""
+    hops: int
+    nodes: list[NetworkNode]
+    links: list[NetworkLink]
+
+
+class NetworkPathResponse(BaseModel):
+    source: NetworkNode
+    target: NetworkNode
+    paths: list[NetworkPath]  # shortest first; empty when not connected
+
+
 # --- Label ---
 
 class LabelResponse(BaseModel):
@@ -154,12 +188,44 @@ class DashboardArtist(BaseModel):
     industry_signal: Optional[float] = None
     engagement: Optional[float] = None
     release_positioning: Optional[float] = None
+    # Last composites / trajectories, oldest first; only with include_sparkline
+    composite_history: Optional[list[Optional[float]]] = None
+    trajectory_history: Optional[list[Optional[float]]] = None
 
 
 class DashboardResponse(BaseModel):
     artists: list[DashboardArtist]
     total: int
     universe_size: int
+    next_cursor: Optional[str] = None
+
+
+class FacetCountsResponse(BaseModel):
+    """Artists per facet value under the current dashboard filters."""
+    total: int
+    universe_size: int
+    facets: dict[str, dict[str, int]]
+
+
+class ArtistSearchHit(BaseModel):
+    """A ranked search match: match is exact, prefix, substring or fuzzy."""
+    spotify_id: str
+    name: str
+    current_label: Optional[str] = None
+    grade: Optional[str] = None
+    composite: Optional[float] = None
+    match: str
+    similarity: float
+
+
+class SuggestionResponse(BaseModel):
+    """Autocomplete entry; spotify_id is only set for artists."""
+    text: str
+    kind: str  # artist, label or producer
+    spotify_id: Optional[str] = None
+    composite: Optional[float] = None
+
+    model_config = {"from_attributes": True}
 
 
 # --- Events ---
@@ -176,10 +242,16 @@ class EventResponse(BaseModel):
     ticket_url: Optional[str] = None
     festival_name: Optional[str] = None
     lineup_position: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     model_config = {"from_attributes": True}
 
 
+class NearbyEvent(EventResponse):
+    distance_km: Optional[float] = None  # only set for radius queries
+
+
 class FestivalSummary(BaseModel):
     festival_name: str
     start_date: date
@@ -199,7 +271,12 @@ class DashboardParams(BaseModel):
     sort_dir: Optional[str] = None
     grade: Optional[str] = None
     segment: Optional[str] = None
+    label_tier: Optional[str] = None
+    agency: Optional[str] = None
+    management: Optional[str] = None
+    genre: Optional[str] = None
     label: Optional[str] = None
     search: Optional[str] = None
     limit: int = 100
     offset: int = 0
+    cursor: Optional[str] = None
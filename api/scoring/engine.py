@@ -237,6 +237,13 @@ def assign_segment_tag(
     return "Sleeping Giant"
 
 
+def label_tier(label_name: str | None) -> int | None:
+    """Tier of a label as used by industry signal, None if unsigned or unranked."""
+    if not label_name:
+        return None
+    return _fuzzy_lookup(label_name, LABEL_TIERS)
+
+
 def _fuzzy_lookup(name: str, lookup: dict[str, int]) -> int | None:
     """Case-insensitive partial match against tier lookup table."""
     name_lower = name.lower().strip()
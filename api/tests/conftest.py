@@ -0,0 +1,51 @@
+import os
+import sys
+
+# Modules import each other as top-level names (run from api/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from database import Base, get_db  # noqa: E402
+from main import app  # noqa: E402
+from materialized import versions  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    # Every test database starts at the same data versions, so a value
+    # cached by an earlier test would look current
+    for cache in versions._caches:
+        cache._value, cache._version = None, None
+    yield
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine, sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    _, Session = session_factory
+
+    def override():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    # Not entered as a context manager, so startup migrations stay off the dev database
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,211 @@
+"""
+Query budget for GET /api/artists/{spotify_id}.
+
+The detail page must cost a fixed number of queries however connected the
+artist is: building its document batches every lookup, and serving it is
+one primary-key read.
+"""
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from materialized.artist_documents import refresh_artist_documents
+from materialized.latest_scores import refresh_latest_scores
+from models import (
+    Artist,
+    ArtistDocument,
+    ArtistSnapshot,
+    Event,
+    Label,
+    Producer,
+    Relationship,
+    Score,
+)
+
+# Statements for refreshing one artist's document, whatever its connections:
+# the stored document, the artist with snapshots and scores, events, label,
+# producer credits, studios, shared-producer links, related artists, write
+BUILD_BUDGET = 11
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+
+def seed_label(db) -> None:
+    db.add(Label(name="Test Records", key_contact="A. Person", contact_title="A&R"))
+
+
+def seed_artist(db, spotify_id: str, related: int) -> None:
+    """One artist with history, events, producers and related acts."""
+    name = f"Band {spotify_id}"
+    today = date.today()
+    db.add(Artist(
+        spotify_id=spotify_id, name=name, genres='["metalcore"]',
+        current_label="Test Records", active=True,
+    ))
+    for day in range(5):
+        db.add(ArtistSnapshot(
+            artist_id=spotify_id, snapshot_date=today - timedelta(days=day),
+            spotify_popularity=50 + day,
+        ))
+        db.add(Score(
+            artist_id=spotify_id, score_date=today - timedelta(days=day),
+            composite=60.0 + day, grade="B",
+        ))
+    db.add(Event(
+        artist_id=spotify_id, event_name="Show", event_date=today + timedelta(days=3),
+    ))
+    for i in range(related):
+        other_id, other_name = f"{spotify_id}-r{i}", f"Related {spotify_id} {i}"
+        producer = f"Producer {spotify_id} {i}"
+        db.add(Artist(spotify_id=other_id, name=other_name, active=True))
+        db.add(Score(artist_id=other_id, score_date=today, composite=40.0 + i, grade="C"))
+        db.add(Producer(name=producer, studio_name=f"Studio {i}"))
+        db.add(Relationship(
+            source_type="artist", source_id=name, target_type="producer",
+            target_id=producer, relationship_type="produced_by",
+        ))
+        db.add(Relationship(
+            source_type="artist", source_id=name, target_type="artist",
+            target_id=other_name, relationship_type="shared_producer",
+        ))
+    db.flush()
+
+
+@pytest.mark.parametrize("related", [0, 3, 40])
+def test_document_build_is_constant(session_factory, related):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    seed_artist(db, "a1", related)
+    refresh_latest_scores(db, None)
+    db.commit()
+
+    with count_queries(engine) as statements:
+        refresh_artist_documents(db, ["a1"])
+    db.commit()
+
+    assert len(statements) <= BUILD_BUDGET, statements
+    detail = db.get(ArtistDocument, "a1")
+    assert detail is not None
+    assert detail.document.count('"studio"') == related
+    db.close()
+
+
+def test_build_cost_does_not_grow_with_connections(session_factory):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    seed_artist(db, "small", 1)
+    seed_artist(db, "large", 25)
+    refresh_latest_scores(db, None)
+    db.commit()
+
+    counts = {}
+    for spotify_id in ("small", "large"):
+        with count_queries(engine) as statements:
+            refresh_artist_documents(db, [spotify_id])
+        counts[spotify_id] = len(statements)
+    db.commit()
+    assert counts["small"] == counts["large"]
+    db.close()
+
+
+def test_get_artist_is_one_read(session_factory, client):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    seed_artist(db, "a1", 30)
+    refresh_latest_scores(db, None)
+    refresh_artist_documents(db)
+    db.commit()
+    db.close()
+
+    with count_queries(engine) as statements:
+        response = client.get("/api/artists/a1")
+    assert response.status_code == 200
+    assert len(response.json()["related_artists"]) == 30
+    assert len(statements) == 1, statements
+
+    with count_queries(engine) as statements:
+        response = client.get(
+            "/api/artists/a1", headers={"If-None-Match": response.headers["etag"]}
+        )
+    assert response.status_code == 304
+    assert len(statements) == 1, statements
+
+
+def test_get_artist_without_document_stays_in_budget(session_factory, client):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    seed_artist(db, "a1", 30)
+    refresh_latest_scores(db, None)
+    db.commit()
+    db.close()
+
+    with count_queries(engine) as statements:
+        response = client.get("/api/artists/a1")
+    assert response.status_code == 200
+    # The document lookup misses and the detail is built in memory, unstored
+    assert len(statements) <= BUILD_BUDGET, statements
+    assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+
+
+def test_refresh_cost_does_not_grow_with_artists(session_factory):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    for i in range(20):
+        seed_artist(db, f"a{i}", 3)
+    refresh_latest_scores(db, None)
+    db.commit()
+
+    with count_queries(engine) as one:
+        refresh_artist_documents(db, ["a0"])
+    db.commit()
+    db.query(ArtistDocument).delete()
+    db.commit()
+    ids = [sid for (sid,) in db.query(Artist.spotify_id)]
+    with count_queries(engine) as everyone:
+        refresh_artist_documents(db, ids)
+    db.commit()
+
+    assert len(everyone) == len(one), everyone
+    assert db.query(ArtistDocument).count() == 80
+    db.close()
+
+
+def test_batch_without_documents_is_constant(session_factory, client):
+    engine, Session = session_factory
+    db = Session()
+    seed_label(db)
+    for i in range(10):
+        seed_artist(db, f"a{i}", 4)
+    refresh_latest_scores(db, None)
+    db.commit()
+    db.close()
+
+    counts = {}
+    for size in (1, 10):
+        ids = ",".join(f"a{i}" for i in range(size))
+        with count_queries(engine) as statements:
+            response = client.get("/api/artists/batch", params={"ids": ids})
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        assert all(len(detail["producers"]) == 4 for detail in response.json().values())
+        counts[size] = len(statements)
+    assert counts[1] == counts[10]
@@ -0,0 +1,106 @@
+"""Geohash covers: every point in the search area falls in a covering cell."""
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from indexes.geo import (
+    EARTH_RADIUS_KM,
+    MAX_COVER_CELLS,
+    _cell_size,
+    covering_cells,
+    encode_geohash,
+    haversine_km,
+    radius_bbox,
+    split_bbox,
+)
+from models import Artist, Event
+
+
+def destination(lat: float, lon: float, bearing: float, km: float) -> tuple[float, float]:
+    """Point km away from (lat, lon) along a great circle."""
+    d, b = km / EARTH_RADIUS_KM, math.radians(bearing)
+    p1, l1 = math.radians(lat), math.radians(lon)
+    p2 = math.asin(math.sin(p1) * math.cos(d) + math.cos(p1) * math.sin(d) * math.cos(b))
+    l2 = l1 + math.atan2(
+        math.sin(b) * math.sin(d) * math.cos(p1), math.cos(d) - math.sin(p1) * math.sin(p2)
+    )
+    return math.degrees(p2), (math.degrees(l2) + 540) % 360 - 180
+
+
+def covered(cells: list[str], lat: float, lon: float) -> bool:
+    geohash = encode_geohash(lat, lon)
+    return any(geohash.startswith(cell) for cell in cells)
+
+
+def edge_centres() -> list[tuple[float, float]]:
+    """Centres on and just beside cell edges at several precisions."""
+    centres = [(0.0, 0.0), (45.0, -90.0), (0.0, 179.99), (-33.75, 151.875), (89.5, 10.0)]
+    for precision in (2, 4, 5, 6):
+        height, width = _cell_size(precision)
+        lat, lon = 52 - 52 % height, 13 - 13 % width  # a cell corner near Berlin
+        for nudge in (-1e-9, 0.0, 1e-9):
+            centres.append((lat + nudge, lon + nudge))
+    return centres
+
+
+@pytest.mark.parametrize("radius_km", [0.5, 5, 60, 400])
+def test_radius_cover_contains_the_circle(radius_km):
+    rng = random.Random(radius_km)
+    for lat, lon in edge_centres():
+        cells = covering_cells(radius_bbox(lat, lon, radius_km))
+        assert 0 < len(cells) <= MAX_COVER_CELLS
+        for _ in range(200):
+            # Bias samples towards the rim, where covers go wrong
+            km = radius_km * rng.random() ** 0.1
+            point = destination(lat, lon, rng.uniform(0, 360), km)
+            assert covered(cells, *point), (lat, lon, point)
+
+
+def test_box_cover_contains_edges_and_corners():
+    for box in ((51.0, -0.5, 52.0, 0.5), (-10.0, 170.0, 10.0, -170.0), (0.0, 0.0, 0.0, 0.0)):
+        boxes = split_bbox(*box)
+        cells = covering_cells(boxes)
+        for min_lat, min_lon, max_lat, max_lon in boxes:
+            for lat in (min_lat, (min_lat + max_lat) / 2, max_lat):
+                for lon in (min_lon, (min_lon + max_lon) / 2, max_lon):
+                    assert covered(cells, lat, lon), (box, lat, lon)
+
+
+def test_antimeridian_box_splits():
+    assert split_bbox(0, 170, 10, -170) == [(0, 170, 10, 180.0), (0, -180.0, 10, -170)]
+    assert split_bbox(-95, 0, 95, 10) == [(-90.0, 0, 90.0, 10)]
+
+
+def test_nearby_matches_exact_distance_across_cell_edges(session_factory, client):
+    _, Session = session_factory
+    db = Session()
+    today = date.today()
+    db.add(Artist(spotify_id="a1", name="Band", active=True))
+    # Venues either side of the (0, 0) corner, where all four top-level cells meet
+    rng = random.Random(7)
+    venues = []
+    for i in range(80):
+        lat, lon = destination(0.0, 0.0, rng.uniform(0, 360), rng.uniform(0, 80))
+        venues.append((lat, lon))
+        db.add(Event(
+            artist_id="a1", event_name=f"Show {i}", venue_name=f"Venue {i}",
+            event_date=today + timedelta(days=1 + i % 5),
+            latitude=lat, longitude=lon, geohash=encode_geohash(lat, lon),
+        ))
+    db.commit()
+    db.close()
+
+    for lat, lon, radius_km in ((0.0, 0.0, 50), (0.1, -0.1, 30), (-0.2, 0.05, 75)):
+        response = client.get(
+            "/api/events/nearby",
+            params={"lat": lat, "lon": lon, "radius_km": radius_km, "limit": 1000},
+        )
+        assert response.status_code == 200
+        found = {event["venue_name"] for event in response.json()}
+        expected = {
+            f"Venue {i}" for i, venue in enumerate(venues)
+            if haversine_km(lat, lon, *venue) <= radius_km
+        }
+        assert found == expected
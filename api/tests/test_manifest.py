@@ -0,0 +1,83 @@
+"""
+Rescore change detection: records the caller skips stay pending.
+
+A score whose artist is not in the database yet cannot be applied; it is
+skipped, so the next rescore must offer it again rather than treat the
+file as unchanged.
+"""
+import json
+
+from manifest import FILE_KEY, file_changes, save_changes
+from models import DataManifest
+
+
+def write(path, records) -> None:
+    path.write_text(json.dumps(records))
+
+
+def by_artist(record: dict) -> str:
+    return record["artist_id"]
+
+
+def test_unchanged_file_is_not_read_again(session_factory, tmp_path):
+    _, Session = session_factory
+    db = Session()
+    path = tmp_path / "scores.json"
+    write(path, [{"artist_id": "a1", "composite": 50}])
+
+    changes = file_changes(db, str(path), by_artist)
+    assert [r["artist_id"] for r in changes.changed] == ["a1"]
+    save_changes(db, changes)
+    db.commit()
+
+    assert file_changes(db, str(path), by_artist) is None
+    db.close()
+
+
+def test_skipped_records_are_offered_until_applied(session_factory, tmp_path):
+    _, Session = session_factory
+    db = Session()
+    path = tmp_path / "scores.json"
+    write(path, [{"artist_id": "a1", "composite": 50}, {"artist_id": "ghost", "composite": 70}])
+
+    changes = file_changes(db, str(path), by_artist)
+    changes.skip(["ghost"])
+    save_changes(db, changes)
+    db.commit()
+    # Only the applied record is recorded, and the file is not marked as seen
+    assert {k for (k,) in db.query(DataManifest.record_key)} == {"a1"}
+
+    changes = file_changes(db, str(path), by_artist)
+    assert changes is not None
+    assert [r["artist_id"] for r in changes.changed] == ["ghost"]
+    changes.skip(["ghost"])
+    save_changes(db, changes)
+    db.commit()
+
+    # An edit elsewhere in the file still carries the pending record along
+    write(path, [{"artist_id": "a1", "composite": 55}, {"artist_id": "ghost", "composite": 70}])
+    changes = file_changes(db, str(path), by_artist)
+    assert sorted(r["artist_id"] for r in changes.changed) == ["a1", "ghost"]
+    save_changes(db, changes)  # the artist exists now: nothing skipped
+    db.commit()
+
+    assert file_changes(db, str(path), by_artist) is None
+    assert {k for (k,) in db.query(DataManifest.record_key)} == {FILE_KEY, "a1", "ghost"}
+    db.close()
+
+
+def test_removed_records_leave_the_manifest(session_factory, tmp_path):
+    _, Session = session_factory
+    db = Session()
+    path = tmp_path / "scores.json"
+    write(path, [{"artist_id": "a1"}, {"artist_id": "a2"}])
+    save_changes(db, file_changes(db, str(path), by_artist))
+    db.commit()
+
+    write(path, [{"artist_id": "a2"}])
+    changes = file_changes(db, str(path), by_artist)
+    assert changes.changed == []
+    save_changes(db, changes)
+    db.commit()
+    assert {k for (k,) in db.query(DataManifest.record_key)} == {FILE_KEY, "a2"}
+    db.close()
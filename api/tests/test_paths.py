@@ -0,0 +1,115 @@
+"""Connection paths: bidirectional BFS and Yen's alternatives."""
+import random
+from collections import deque
+
+import pytest
+
+from indexes.graph import GraphIndex
+from indexes.paths import k_shortest_paths, shortest_path
+
+TYPES = ("produced_by", "signed_to", "shared_producer")
+
+
+def random_graph(seed: int, nodes: int, links: int) -> GraphIndex:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(links):
+        a, b = rng.sample(range(nodes), 2)
+        rows.append(("artist", f"N{a}", "artist", f"N{b}", rng.choice(TYPES), None))
+    return GraphIndex(rows)
+
+
+def link_ends(graph: GraphIndex, link: int) -> set[int]:
+    return {graph.link_source[link], graph.link_target[link]}
+
+
+def plain_bfs(graph: GraphIndex, source: int, types: set[int] | None) -> dict[int, int]:
+    """Hops from source to every reachable node, one side at a time."""
+    neighbours: dict[int, list[int]] = {}
+    for link, (a, b) in enumerate(zip(graph.link_source, graph.link_target)):
+        if types is None or graph.link_type[link] in types:
+            neighbours.setdefault(a, []).append(b)
+            neighbours.setdefault(b, []).append(a)
+    hops, queue = {source: 0}, deque([source])
+    while queue:
+        node = queue.popleft()
+        for other in neighbours.get(node, ()):
+            if other not in hops:
+                hops[other] = hops[node] + 1
+                queue.append(other)
+    return hops
+
+
+def assert_walk(graph: GraphIndex, path, source: int, target: int) -> None:
+    assert path.nodes[0] == source and path.nodes[-1] == target
+    assert len(path.nodes) == path.hops + 1
+    for i, link in enumerate(path.links):
+        assert link_ends(graph, link) == {path.nodes[i], path.nodes[i + 1]}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bidirectional_matches_plain_bfs(seed):
+    graph = random_graph(seed, nodes=60, links=90)
+    rng = random.Random(seed)
+    for types in (None, {graph.type_codes[TYPES[0]], graph.type_codes[TYPES[1]]}):
+        for _ in range(30):
+            source, target = rng.randrange(60), rng.randrange(60)
+            if f"artist:N{source}" not in graph.node_ids or f"artist:N{target}" not in graph.node_ids:
+                continue
+            source, target = graph.node_ids[f"artist:N{source}"], graph.node_ids[f"artist:N{target}"]
+            expected = plain_bfs(graph, source, types).get(target)
+            for max_hops in (2, 6):
+                path = shortest_path(graph, source, target, max_hops, types)
+                if expected is None or expected > max_hops:
+                    assert path is None
+                else:
+                    assert path is not None and path.hops == expected
+                    assert_walk(graph, path, source, target)
+                    if types is not None:
+                        assert all(graph.link_type[link] in types for link in path.links)
+
+
+def simple_paths(graph: GraphIndex, source: int, target: int, max_hops: int) -> list[int]:
+    """Hop counts of every loopless path, by exhaustive search."""
+    found = []
+
+    def extend(node, visited, hops):
+        if node == target:
+            found.append(hops)
+            return
+        if hops == max_hops:
+            return
+        for position in range(graph.offsets[node], graph.offsets[node + 1]):
+            other = graph.adjacency[position]
+            if other not in visited:
+                extend(other, visited | {other}, hops + 1)
+
+    extend(source, {source}, 0)
+    return sorted(found)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_yen_paths_are_loopless_distinct_and_shortest_first(seed):
+    graph = random_graph(seed, nodes=12, links=22)
+    rng = random.Random(seed)
+    nodes = len(graph.keys)
+    for _ in range(10):
+        source, target = rng.sample(range(nodes), 2)
+        paths = k_shortest_paths(graph, source, target, k=5, max_hops=5)
+        for path in paths:
+            assert_walk(graph, path, source, target)
+            assert len(set(path.nodes)) == len(path.nodes)
+        assert len({path.links for path in paths}) == len(paths)
+        # The k shortest of all loopless paths, in order
+        assert [path.hops for path in paths] == simple_paths(graph, source, target, 5)[:5]
+
+
+def test_no_path_and_same_node():
+    graph = GraphIndex([
+        ("artist", "A", "producer", "P", "produced_by", None),
+        ("artist", "B", "label", "L", "signed_to", None),
+    ])
+    a, b = graph.node_ids["artist:A"], graph.node_ids["artist:B"]
+    assert shortest_path(graph, a, b) is None
+    assert k_shortest_paths(graph, a, b, k=3) == []
+    assert shortest_path(graph, a, a).hops == 0
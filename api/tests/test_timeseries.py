@@ -0,0 +1,107 @@
+"""LTTB downsampling: bounded output that keeps peaks, ends and gaps."""
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from materialized.latest_scores import refresh_latest_scores
+from models import Artist, ArtistSnapshot, Score
+from timeseries import lttb
+
+START = date(2024, 1, 1)
+
+
+def series(values) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(day=START + timedelta(days=i), value=v) for i, v in enumerate(values)
+    ]
+
+
+def downsample(points, max_points: int) -> list[SimpleNamespace]:
+    return lttb(points, max_points, x=lambda p: p.day, y=lambda p: p.value)
+
+
+@pytest.mark.parametrize("max_points", [3, 7, 50, 99])
+def test_keeps_ends_order_and_bound(max_points):
+    points = series([(i * 37) % 101 for i in range(100)])
+    kept = downsample(points, max_points)
+    assert len(kept) == max_points
+    assert kept[0] is points[0] and kept[-1] is points[-1]
+    assert [p.day for p in kept] == sorted({p.day for p in kept})
+
+
+def test_short_series_and_tiny_budgets():
+    points = series([1, 2, 3])
+    assert downsample(points, 3) == points
+    assert downsample(points, 10) == points
+    longer = series(range(10))
+    assert downsample(longer, 2) == [longer[0], longer[-1]]
+
+
+def test_peak_survives():
+    values = [10.0] * 200
+    values[123] = 99.0
+    kept = downsample(series(values), 20)
+    assert any(p.value == 99.0 for p in kept)
+
+
+def test_gaps_never_replace_values():
+    values = [None if i % 2 else float(i % 7) for i in range(60)]
+    kept = downsample(series(values), 12)
+    assert all(p.value is not None for p in kept[:-1])  # the last point is always kept
+
+
+def test_all_gap_bucket_keeps_a_gap_point():
+    values = [float(i) for i in range(40)]
+    values[10:30] = [None] * 20
+    kept = downsample(series(values), 8)
+    assert len(kept) == 8
+    assert any(p.value is None for p in kept)  # the outage still shows on the chart
+    assert all(p.value is not None for p in kept if not 10 <= (p.day - START).days < 30)
+
+
+def test_leading_gap_series():
+    values = [None] * 10 + [float(i) for i in range(30)]
+    kept = downsample(series(values), 6)
+    assert len(kept) == 6
+    assert kept[0].value is None and kept[-1].value == 29.0
+
+
+def test_detail_window_and_max_points(session_factory, client):
+    _, Session = session_factory
+    db = Session()
+    today = date.today()
+    db.add(Artist(spotify_id="a1", name="Band", active=True))
+    for day in range(120):
+        db.add(ArtistSnapshot(
+            artist_id="a1", snapshot_date=today - timedelta(days=day),
+            spotify_popularity=day % 17,
+        ))
+        db.add(Score(
+            artist_id="a1", score_date=today - timedelta(days=day), composite=float(day % 13),
+        ))
+    db.flush()
+    refresh_latest_scores(db, None)
+    db.commit()
+    db.close()
+
+    full = client.get("/api/artists/a1")
+    assert len(full.json()["snapshots"]) == 120
+
+    start, end = today - timedelta(days=89), today - timedelta(days=30)
+    params = {"from": start.isoformat(), "to": end.isoformat(), "max_points": 10}
+    windowed = client.get("/api/artists/a1", params=params)
+    assert windowed.status_code == 200
+    body = windowed.json()
+    for key, field in (("snapshots", "snapshot_date"), ("scores", "score_date")):
+        days = [row[field] for row in body[key]]
+        assert len(days) == 10
+        assert days[0] == start.isoformat() and days[-1] == end.isoformat()
+        assert days == sorted(days)
+
+    # The window has its own ETag, and revalidates against it
+    assert windowed.headers["etag"] != full.headers["etag"]
+    again = client.get(
+        "/api/artists/a1", params=params, headers={"If-None-Match": windowed.headers["etag"]}
+    )
+    assert again.status_code == 304
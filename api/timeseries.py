@@ -0,0 +1,91 @@
+"""
+Time-series downsampling for history charts.
+
+Largest-Triangle-Three-Buckets (LTTB) keeps the first and last points and,
+for each bucket in between, the point that forms the largest triangle with
+its neighbours' picks. The result follows the visual shape of the series
+(peaks and dips survive) with a bounded number of points, whatever the
+length of the history.
+"""
+from datetime import date
+from typing import Callable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+HISTORY_MAX_POINTS = 300  # default cap for chart series in API responses
+
+
+def lttb(
+    points: Sequence[T],
+    max_points: int,
+    x: Callable[[T], date],
+    y: Callable[[T], Optional[float]],
+) -> list[T]:
+    """
+    Downsample points (sorted by x) to at most max_points with LTTB.
+
+    Whole records are kept, so every field of a selected point survives.
+    Missing y values are gaps: they never stand in for a bucket that has a
+    value, and a bucket without any keeps its first point so the gap shows.
+    """
+    n = len(points)
+    if max_points >= n or n <= 2:
+        return list(points)
+    if max_points < 3:
+        return [points[0], points[-1]][:max(max_points, 1)]
+
+    xs = [x(p).toordinal() for p in points]
+    ys = [None if (value := y(p)) is None else float(value) for p in points]
+    # Stand-in height for an anchor that is itself a gap
+    first_value = next((v for v in ys if v is not None), 0.0)
+
+    selected = [0]
+    bucket = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = end, min(int((i + 2) * bucket) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        ay = ys[a] if ys[a] is not None else first_value
+        following = [j for j in range(next_start, next_end) if ys[j] is not None]
+        if following:
+            avg_x = sum(xs[j] for j in following) / len(following)
+            avg_y = sum(ys[j] for j in following) / len(following)
+        else:
+            avg_x, avg_y = xs[next_end - 1], ay
+
+        best, best_area = None, -1.0
+        for j in range(start, end):
+            if ys[j] is None:
+                continue
+            area = abs(
+                (xs[a] - avg_x) * (ys[j] - ay) - (xs[a] - xs[j]) * (avg_y - ay)
+            )
+            if area > best_area:
+                best, best_area = j, area
+        if best is None:
+            selected.append(start)  # the whole bucket is a gap
+            continue
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return [points[i] for i in selected]
+
+
+def snapshot_metric(snapshots) -> Callable[[object], Optional[float]]:
+    """
+    Series that drives snapshot downsampling: Spotify popularity, or
+    followers for histories with no popularity at all. Chosen once per
+    series so the two scales are never mixed.
+    """
+    if any(s.spotify_popularity is not None for s in snapshots):
+        return lambda s: s.spotify_popularity
+    return lambda s: s.spotify_followers
+
+
+def score_metric(score) -> Optional[float]:
+    """Series that drives score downsampling."""
+    return score.composite
@@ -28,6 +28,8 @@ class BandsintownEventData:
     ticket_url: str | None
     festival_name: str | None
     bandsintown_id: str | None
+    latitude: float | None = None
+    longitude: float | None = None
 
 
 class BandsintownCollector:
@@ -101,6 +103,8 @@ class BandsintownCollector:
             ticket_url=raw.get("url"),
             festival_name=title if is_festival else None,
             bandsintown_id=str(raw.get("id", "")),
+            latitude=_to_float(venue.get("latitude")),
+            longitude=_to_float(venue.get("longitude")),
         )
 
     def collect_batch(
@@ -122,43 +126,51 @@ class BandsintownCollector:
         return results
 
 
+def _to_float(value) -> float | None:
+    """Bandsintown sends venue coordinates as strings; blank means unknown."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
 # --- Simulated data for local development ---
 
-# Realistic venues for heavy music
+# Realistic venues for heavy music (name, city, region, country, lat, lon)
 _VENUES = [
-    ("Mercury Ballroom", "Louisville", "KY", "US"),
-    ("The Basement East", "Nashville", "TN", "US"),
-    ("House of Blues", "Chicago", "IL", "US"),
-    ("The Fillmore", "Philadelphia", "PA", "US"),
-    ("Irving Plaza", "New York", "NY", "US"),
-    ("The Roxy", "Los Angeles", "CA", "US"),
-    ("Marquee Theatre", "Tempe", "AZ", "US"),
-    ("The Masquerade", "Atlanta", "GA", "US"),
-    ("White Oak Music Hall", "Houston", "TX", "US"),
-    ("Summit Music Hall", "Denver", "CO", "US"),
-    ("The Palladium", "Worcester", "MA", "US"),
-    ("The NorVa", "Norfolk", "VA", "US"),
-    ("Ace of Spades", "Sacramento", "CA", "US"),
-    ("The Fillmore Silver Spring", "Silver Spring", "MD", "US"),
-    ("Jannus Live", "St. Petersburg", "FL", "US"),
-    ("Alexandra Palace", "London", None, "GB"),
-    ("Columbiahalle", "Berlin", None, "DE"),
-    ("Groezrock Festival", "Meerhout", None, "BE"),
-    ("Download Festival", "Donington Park", "Derbyshire", "GB"),
-    ("Wacken Open Air", "Wacken", "Schleswig-Holstein", "DE"),
+    ("Mercury Ballroom", "Louisville", "KY", "US", 38.2536, -85.7585),
+    ("The Basement East", "Nashville", "TN", "US", 36.1791, -86.7506),
+    ("House of Blues", "Chicago", "IL", "US", 41.8883, -87.6292),
+    ("The Fillmore", "Philadelphia", "PA", "US", 39.9661, -75.1339),
+    ("Irving Plaza", "New York", "NY", "US", 40.7349, -73.9883),
+    ("The Roxy", "Los Angeles", "CA", "US", 34.0904, -118.3891),
+    ("Marquee Theatre", "Tempe", "AZ", "US", 33.4293, -111.9303),
+    ("The Masquerade", "Atlanta", "GA", "US", 33.7543, -84.3976),
+    ("White Oak Music Hall", "Houston", "TX", "US", 29.7834, -95.3651),
+    ("Summit Music Hall", "Denver", "CO", "US", 39.7551, -104.9946),
+    ("The Palladium", "Worcester", "MA", "US", 42.266, -71.8028),
+    ("The NorVa", "Norfolk", "VA", "US", 36.8482, -76.2889),
+    ("Ace of Spades", "Sacramento", "CA", "US", 38.5776, -121.4838),
+    ("The Fillmore Silver Spring", "Silver Spring", "MD", "US", 38.9969, -77.0262),
+    ("Jannus Live", "St. Petersburg", "FL", "US", 27.7718, -82.6376),
+    ("Alexandra Palace", "London", None, "GB", 51.5942, -0.131),
+    ("Columbiahalle", "Berlin", None, "DE", 52.4839, 13.3869),
+    ("Groezrock Festival", "Meerhout", None, "BE", 51.1318, 5.0781),
+    ("Download Festival", "Donington Park", "Derbyshire", "GB", 52.8302, -1.375),
+    ("Wacken Open Air", "Wacken", "Schleswig-Holstein", "DE", 54.024, 9.3762),
 ]
 
 _FESTIVALS = [
-    ("Download Festival", "Donington Park", "Derbyshire", "GB"),
-    ("Sonic Temple", "Columbus", "OH", "US"),
-    ("Welcome to Rockville", "Daytona Beach", "FL", "US"),
-    ("Aftershock Festival", "Sacramento", "CA", "US"),
-    ("Blue Ridge Rock Festival", "Alton", "VA", "US"),
-    ("Hellfest", "Clisson", "Loire-Atlantique", "FR"),
-    ("Wacken Open Air", "Wacken", "Schleswig-Holstein", "DE"),
-    ("Heavy Montreal", "Montreal", "QC", "CA"),
-    ("Slam Dunk Festival", "Leeds", "West Yorkshire", "GB"),
-    ("Impericon Festival", "Leipzig", "Saxony", "DE"),
+    ("Download Festival", "Donington Park", "Derbyshire", "GB", 52.8302, -1.375),
+    ("Sonic Temple", "Columbus", "OH", "US", 40.0095, -82.9911),
+    ("Welcome to Rockville", "Daytona Beach", "FL", "US", 29.1853, -81.0701),
+    ("Aftershock Festival", "Sacramento", "CA", "US", 38.6005, -121.5052),
+    ("Blue Ridge Rock Festival", "Alton", "VA", "US", 36.5741, -79.2842),
+    ("Hellfest", "Clisson", "Loire-Atlantique", "FR", 47.0983, -1.2722),
+    ("Wacken Open Air", "Wacken", "Schleswig-Holstein", "DE", 54.024, 9.3762),
+    ("Heavy Montreal", "Montreal", "QC", "CA", 45.5138, -73.5323),
+    ("Slam Dunk Festival", "Leeds", "West Yorkshire", "GB", 53.7853, -1.4612),
+    ("Impericon Festival", "Leipzig", "Saxony", "DE", 51.2917, 12.3712),
 ]
 
 
@@ -193,7 +205,7 @@ def simulate_bandsintown_events(
 
         # Pick venue deterministically
         venue_idx = (name_hash + i * 13) % len(_VENUES)
-        venue_name, city, region, country = _VENUES[venue_idx]
+        venue_name, city, region, country, lat, lon = _VENUES[venue_idx]
 
         # Some shows are festivals (big bands get more)
         is_festival = (
@@ -203,7 +215,7 @@ def simulate_bandsintown_events(
 
         if is_festival:
             fest_idx = (name_hash + i) % len(_FESTIVALS)
-            fest_name, city, region, country = _FESTIVALS[fest_idx]
+            fest_name, city, region, country, lat, lon = _FESTIVALS[fest_idx]
             venue_name = fest_name
             event_name = fest_name
         else:
@@ -222,6 +234,8 @@ def simulate_bandsintown_events(
             ticket_url=None,
             festival_name=fest_name,
             bandsintown_id=f"sim_{name_hash}_{i}",
+            latitude=lat,
+            longitude=lon,
         ))
 
     # Sort by date
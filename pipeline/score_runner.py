@@ -19,7 +19,12 @@ sys.path.insert(0, os.path.join(project_root, "api"))
 sys.path.insert(0, project_root)
 
 from database import Base, engine, SessionLocal  # noqa: E402
-from models import Artist, ArtistSnapshot, Score  # noqa: E402
+from materialized.artist_documents import (  # noqa: E402
+    refresh_artist_documents,
+    with_related_artists,
+)
+from materialized.latest_scores import refresh_latest_scores  # noqa: E402
+from models import Artist, ArtistSnapshot, LatestScore, Score  # noqa: E402
 from scoring.engine import (  # noqa: E402
     compute_trajectory,
     compute_industry_signal,
@@ -55,8 +60,13 @@ def run_scores(simulate: bool = False):
         artists = db.query(Artist).filter(Artist.active.is_(True)).all()
         logger.info("Scoring %d active artists", len(artists))
 
+        # Previous composites come from latest_scores; build it if missing
+        if not db.query(LatestScore).first():
+            refresh_latest_scores(db)
+
         created = 0
         skipped = 0
+        scored_ids = []
 
         for artist in artists:
             # Check if score already exists for today
@@ -160,12 +170,7 @@ def run_scores(simulate: bool = False):
             grade = assign_grade(composite)
 
             # Previous composite for segment tag
-            prev_score = (
-                db.query(Score)
-                .filter(Score.artist_id == artist.spotify_id)
-                .order_by(Score.score_date.desc())
-                .first()
-            )
+            prev_score = db.get(LatestScore, artist.spotify_id)
             prev_composite = prev_score.composite if prev_score else None
 
             segment_tag = assign_segment_tag(
@@ -188,6 +193,7 @@ def run_scores(simulate: bool = False):
                 segment_tag=segment_tag,
             )
             db.add(score)
+            scored_ids.append(artist.spotify_id)
             created += 1
 
             logger.debug(
@@ -196,6 +202,8 @@ def run_scores(simulate: bool = False):
                 release_positioning, composite, grade, segment_tag,
             )
 
+        refresh_latest_scores(db, scored_ids)
+        refresh_artist_documents(db, with_related_artists(db, scored_ids))
         db.commit()
         logger.info(
             "Scoring complete: %d created, %d skipped", created, skipped
@@ -20,6 +20,8 @@ sys.path.insert(0, os.path.join(project_root, "api"))
 sys.path.insert(0, project_root)
 
 from database import Base, engine, SessionLocal  # noqa: E402
+from materialized.artist_documents import refresh_artist_documents  # noqa: E402
+from materialized.versions import bump_version  # noqa: E402
 from models import Artist, ArtistSnapshot  # noqa: E402
 from pipeline.spotify_collector import (  # noqa: E402
     SpotifyCollector,
@@ -76,6 +78,7 @@ def run_snapshot(simulate: bool = False):
             )
 
         created = 0
+        snapshot_ids = []
         skipped = 0
 
         for artist in artists:
@@ -145,8 +148,13 @@ def run_snapshot(simulate: bool = False):
                 youtube_comment_count=yt_comments,
             )
             db.add(snapshot)
+            snapshot_ids.append(artist.spotify_id)
             created += 1
 
+        if created:
+            # Live Spotify data may have refreshed artist images and genres
+            bump_version(db, "artists")
+            refresh_artist_documents(db, snapshot_ids)
         db.commit()
         logger.info(
             "Snapshot complete: %d created, %d skipped (already exists)",
@@ -3,14 +3,22 @@ import type {
   DashboardParams,
   ArtistDetail,
   NetworkGraph,
+  NetworkNode,
+  CompactNetworkGraph,
+  NetworkPathResponse,
+  NodeRanking,
   ScoreRecord,
   EventRecord,
+  NearbyEventRecord,
   FestivalSummary,
+  Suggestion,
+  FacetCounts,
+  CursorPage,
 } from "../types";
 
 const BASE = import.meta.env.VITE_API_URL ?? "";
 
-async function fetchJSON<T>(path: string, retries = 2): Promise<T> {
+async function fetchWithRetry(path: string, retries = 2): Promise<Response> {
   for (let attempt = 0; attempt <= retries; attempt++) {
     try {
       const res = await fetch(`${BASE}${path}`);
@@ -24,7 +32,7 @@ async function fetchJSON<T>(path: string, retries = 2): Promise<T> {
       if (!res.ok) {
         throw new Error(`API ${res.status}: ${res.statusText}`);
       }
-      return res.json();
+      return res;
     } catch (err) {
       if (attempt < retries && err instanceof TypeError) {
         // Network error (service waking up) -- retry
@@ -37,6 +45,16 @@ async function fetchJSON<T>(path: string, retries = 2): Promise<T> {
   throw new Error("API unavailable after retries");
 }
 
+async function fetchJSON<T>(path: string): Promise<T> {
+  return (await fetchWithRetry(path)).json();
+}
+
+// Keyset-paginated endpoints return the next page's cursor in X-Next-Cursor
+async function fetchPage<T>(path: string): Promise<CursorPage<T>> {
+  const res = await fetchWithRetry(path);
+  return { items: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 function toQueryString(params: Record<string, unknown>): string {
   const qs = new URLSearchParams();
   for (const [key, val] of Object.entries(params)) {
@@ -54,6 +72,19 @@ export async function getDashboard(
   return fetchJSON(`/api/artists/dashboard${toQueryString(params as unknown as Record<string, unknown>)}`);
 }
 
+export async function getFacets(
+  params: Omit<DashboardParams, "sort_by" | "sort_dir" | "limit" | "offset" | "cursor" | "include_sparkline"> = {}
+): Promise<FacetCounts> {
+  return fetchJSON(`/api/artists/facets${toQueryString(params as unknown as Record<string, unknown>)}`);
+}
+
+export async function getSuggestions(
+  q: string,
+  limit = 8
+): Promise<Suggestion[]> {
+  return fetchJSON(`/api/artists/suggest${toQueryString({ q, limit })}`);
+}
+
 export async function getArtistDetail(
   spotifyId: string
 ): Promise<ArtistDetail> {
@@ -66,25 +97,110 @@ export async function getScoreHistory(
   return fetchJSON(`/api/scores/${spotifyId}`);
 }
 
+export async function getArtistsBatch(
+  spotifyIds: string[],
+  fields?: (keyof ArtistDetail)[]
+): Promise<Record<string, Partial<ArtistDetail>>> {
+  return fetchJSON(
+    `/api/artists/batch${toQueryString({
+      ids: spotifyIds.join(","),
+      fields: fields?.join(","),
+    })}`
+  );
+}
+
+export async function getScoresBatch(
+  spotifyIds: string[],
+  params: { from?: string; to?: string } = {}
+): Promise<Record<string, ScoreRecord[]>> {
+  return fetchJSON(
+    `/api/scores/batch${toQueryString({ ids: spotifyIds.join(","), ...params })}`
+  );
+}
+
 export async function getNetworkGraph(
   center?: string,
   depth?: number,
-  top_n?: number
+  top_n?: number,
+  lod?: 0 | 1 | 2,
+  expand?: string[]
 ): Promise<NetworkGraph> {
   const params: Record<string, unknown> = {};
   if (center) params.center = center;
   if (depth) params.depth = depth;
   if (top_n) params.top_n = top_n;
-  return fetchJSON(`/api/network/graph${toQueryString(params)}`);
+  if (lod) params.lod = lod;
+  if (expand?.length) params.expand = expand.join(",");
+  params.format = "compact";
+  return inflateGraph(await fetchJSON<CompactNetworkGraph>(`/api/network/graph${toQueryString(params)}`));
+}
+
+function inflateGraph(compact: CompactNetworkGraph): NetworkGraph {
+  const columns = Object.entries(compact.nodes) as [keyof NetworkNode, unknown[]][];
+  const nodes = compact.nodes.id.map((_, i) => {
+    const node = {} as Record<string, unknown>;
+    for (const [field, values] of columns) node[field] = values[i];
+    node.type = compact.node_types[compact.nodes.type[i]];
+    return node as unknown as NetworkNode;
+  });
+  const { source, target, relationship, weight } = compact.links;
+  const links = source.map((s, i) => ({
+    source: nodes[s].id,
+    target: nodes[target[i]].id,
+    relationship: compact.relationships[relationship[i]],
+    weight: weight[i],
+  }));
+  return { nodes, links };
+}
+
+export async function getNetworkRankings(params: {
+  sort_by?: "pagerank" | "betweenness" | "degree" | "weighted_degree";
+  type?: NodeRanking["type"];
+  limit?: number;
+  cursor?: string;
+} = {}): Promise<CursorPage<NodeRanking>> {
+  return fetchPage(`/api/network/rankings${toQueryString(params)}`);
+}
+
+export async function getNetworkPath(params: {
+  from: string;
+  to: string;
+  max_hops?: number;
+  types?: string; // comma-separated relationship types
+  k?: number;
+}): Promise<NetworkPathResponse> {
+  return fetchJSON(`/api/network/path${toQueryString(params)}`);
 }
 
 export async function getUpcomingEvents(params: {
   days?: number;
   artist?: string;
+  country?: string;
+  region?: string;
+  city?: string;
+  event_type?: "concert" | "festival";
   festival_only?: boolean;
   limit?: number;
-} = {}): Promise<EventRecord[]> {
-  return fetchJSON(`/api/events/upcoming${toQueryString(params as Record<string, unknown>)}`);
+  cursor?: string;
+} = {}): Promise<CursorPage<EventRecord>> {
+  return fetchPage(`/api/events/upcoming${toQueryString(params as Record<string, unknown>)}`);
+}
+
+export async function getArtistEventHistory(
+  spotifyId: string,
+  params: { from?: string; to?: string; limit?: number; cursor?: string } = {}
+): Promise<CursorPage<EventRecord>> {
+  return fetchPage(`/api/events/history/${spotifyId}${toQueryString(params)}`);
+}
+
+export async function getNearbyEvents(params: {
+  lat: number;
+  lon: number;
+  radius_km?: number;
+  days?: number;
+  limit?: number;
+}): Promise<NearbyEventRecord[]> {
+  return fetchJSON(`/api/events/nearby${toQueryString(params as Record<string, unknown>)}`);
 }
 
 export async function getFestivals(): Promise<FestivalSummary[]> {
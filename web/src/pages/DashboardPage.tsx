@@ -7,13 +7,18 @@ import {
   ChevronDown,
   Filter,
 } from "lucide-react";
-import { getDashboard } from "../api/client";
+import { getDashboard, getSuggestions } from "../api/client";
 import { GradeBadge } from "../components/shared/GradeBadge";
 import { SegmentTag } from "../components/shared/SegmentTag";
 import { CompositeBar } from "../components/shared/CompositeBar";
 import { FilterChip } from "../components/shared/FilterChip";
 import { StatsRow } from "../components/dashboard/StatsRow";
-import type { DashboardArtist, Grade, SegmentTag as SegType } from "../types";
+import type {
+  DashboardArtist,
+  Grade,
+  SegmentTag as SegType,
+  Suggestion,
+} from "../types";
 
 type SortField =
   | "composite"
@@ -93,9 +98,44 @@ export function DashboardPage() {
   }, [sortBy, sortDir, gradeFilter, segmentFilter, labelFilter, search]);
 
   useEffect(() => {
-    const timer = setTimeout(fetchData, search ? 300 : 0);
-    return () => clearTimeout(timer);
-  }, [fetchData, search]);
+    fetchData();
+  }, [fetchData]);
+
+  // What is typed only drives autocomplete; the dashboard query follows the
+  // URL, which changes when a suggestion is picked or the search is submitted
+  const [query, setQuery] = useState(search);
+  useEffect(() => setQuery(search), [search]);
+
+  // Autocomplete is a cheap in-memory lookup, so it can follow every keystroke
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+  useEffect(() => {
+    if (!query) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      getSuggestions(query)
+        .then((s) => {
+          if (!cancelled) setSuggestions(s);
+        })
+        .catch(() => {
+          if (!cancelled) setSuggestions([]);
+        });
+    }, 50);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
+  const onQueryChange = (value: string) => {
+    setQuery(value);
+    // Picking a datalist option sets the input to that suggestion's text
+    if (!value || suggestions.some((s) => s.kind === "artist" && s.text === value)) {
+      setParam("q", value);
+    }
+  };
 
   const uniqueLabels = useMemo(() => {
     const labels = new Set<string>();
@@ -143,7 +183,13 @@ export function DashboardPage() {
           <h1 className="text-2xl font-display font-bold tracking-tight">Momentum Dashboard</h1>
 
           <div className="flex items-center gap-2 w-full sm:w-auto">
-            <div className="relative flex-1 sm:w-64">
+            <form
+              className="relative flex-1 sm:w-64"
+              onSubmit={(e) => {
+                e.preventDefault();
+                setParam("q", query.trim());
+              }}
+            >
               <Search
                 size={16}
                 className="absolute left-3 top-1/2 -translate-y-1/2 text-steel"
@@ -151,11 +197,19 @@ export function DashboardPage() {
               <input
                 type="text"
                 placeholder="Search artists..."
-                value={search}
-                onChange={(e) => setParam("q", e.target.value)}
+                list="artist-suggestions"
+                value={query}
+                onChange={(e) => onQueryChange(e.target.value)}
                 className="w-full pl-9 pr-3 py-2 bg-surface-raised border border-surface-border rounded-lg text-sm text-gray-200 placeholder:text-steel focus:outline-none focus:ring-1 focus:ring-accent/50"
               />
-            </div>
+              <datalist id="artist-suggestions">
+                {suggestions
+                  .filter((s) => s.kind === "artist")
+                  .map((s) => (
+                    <option key={s.spotify_id ?? s.text} value={s.text} />
+                  ))}
+              </datalist>
+            </form>
             <button
               onClick={() => setShowFilters((f) => !f)}
               className={`flex items-center gap-1.5 px-3 py-2 rounded-lg text-sm font-medium transition-colors ${
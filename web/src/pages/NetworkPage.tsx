@@ -21,6 +21,7 @@ const LINK_COLORS: Record<string, string> = {
   managed_by: "#f59e0b",
   booked_by: "#a855f7",
   related_artist: "#06b6d4",
+  co_billed: "#ec4899",
 };
 
 const REL_LABELS: Record<string, string> = {
@@ -31,8 +32,12 @@ const REL_LABELS: Record<string, string> = {
   managed_by: "managed by",
   booked_by: "booked by",
   related_artist: "related",
+  co_billed: "shared bill",
 };
 
+// API layout coordinates span about -1..1; spread them over canvas units
+const LAYOUT_SCALE = 400;
+
 interface GraphNode extends Record<string, unknown> {
   id: string;
   label: string;
@@ -42,6 +47,8 @@ interface GraphNode extends Record<string, unknown> {
   val: number;
   x?: number;
   y?: number;
+  fx?: number;
+  fy?: number;
 }
 
 interface GraphLink extends Record<string, unknown> {
@@ -80,6 +87,7 @@ export function NetworkPage() {
     managed_by: true,
     booked_by: true,
     related_artist: true,
+    co_billed: true,
   });
 
   const containerRef = useRef<HTMLDivElement>(null);
@@ -173,7 +181,17 @@ export function NetworkPage() {
         type: n.type,
         score: n.score,
         spotify_id: n.spotify_id,
-        val: n.type === "artist" ? (n.score ? n.score / 10 : 4) : 1.5,
+        // Producers, labels and managers grow with influence (PageRank relative to average)
+        val:
+          n.type === "artist"
+            ? n.score ? n.score / 10 : 4
+            : n.pagerank
+              ? Math.min(8, Math.max(1.5, n.pagerank * graph.nodes.length * 1.5))
+              : 1.5,
+        // Server-side layout: pin nodes where the API placed them
+        ...(n.x != null && n.y != null
+          ? { x: n.x * LAYOUT_SCALE, y: n.y * LAYOUT_SCALE, fx: n.x * LAYOUT_SCALE, fy: n.y * LAYOUT_SCALE }
+          : {}),
       })),
       links: finalLinks.map((l) => ({
         source: l.source,
@@ -183,6 +201,9 @@ export function NetworkPage() {
     };
   }, [graph, relFilters, artistOnly]);
 
+  // Laid out by the API: no simulation needed
+  const hasLayout = graphData.nodes.length > 0 && graphData.nodes.every((n) => "fx" in n);
+
   // Configure d3 forces for better spacing
   useEffect(() => {
     if (graphRef.current) {
@@ -545,6 +566,8 @@ export function NetworkPage() {
               d3AlphaDecay={0.015}
               d3VelocityDecay={0.25}
               cooldownTime={4000}
+              cooldownTicks={hasLayout ? 0 : Infinity}
+              onEngineStop={() => hasLayout && graphRef.current?.zoomToFit(400)}
             />
           )}
         </div>
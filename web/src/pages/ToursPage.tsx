@@ -17,8 +17,8 @@ export function ToursPage() {
       getUpcomingEvents({ days: 180, limit: 500 }),
       getFestivals(),
     ])
-      .then(([evts, fests]) => {
-        setEvents(evts);
+      .then(([page, fests]) => {
+        setEvents(page.items);
         setFestivals(fests);
       })
       .catch((err) => setError(err.message))
@@ -22,12 +22,43 @@ export interface DashboardArtist {
   industry_signal: number;
   engagement: number;
   release_positioning: number;
+  // Oldest first; present when requested with include_sparkline
+  composite_history?: (number | null)[] | null;
+  trajectory_history?: (number | null)[] | null;
 }
 
 export interface DashboardResponse {
   artists: DashboardArtist[];
   total: number;
   universe_size: number;
+  next_cursor: string | null;
+}
+
+// One page of a keyset-paginated list; pass nextCursor back as cursor
+export interface CursorPage<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export type FacetName =
+  | "grade"
+  | "segment"
+  | "label_tier"
+  | "agency"
+  | "management"
+  | "genre";
+
+export interface FacetCounts {
+  total: number;
+  universe_size: number;
+  facets: Record<FacetName, Record<string, number>>;
+}
+
+export interface Suggestion {
+  text: string;
+  kind: "artist" | "label" | "producer";
+  spotify_id: string | null;
+  composite: number | null;
 }
 
 export interface Snapshot {
@@ -64,6 +95,12 @@ export interface EventRecord {
   ticket_url: string | null;
   festival_name: string | null;
   lineup_position: string | null;
+  latitude: number | null;
+  longitude: number | null;
+}
+
+export interface NearbyEventRecord extends EventRecord {
+  distance_km: number | null;
 }
 
 export interface LabelContact {
@@ -116,15 +153,33 @@ export interface ArtistDetail {
 export interface NetworkNode {
   id: string;
   label: string;
-  type: "artist" | "producer" | "label" | "management" | "agency";
+  type: "artist" | "producer" | "label" | "management" | "agency" | "community" | "group";
   score: number | null;
   spotify_id?: string;
+  degree?: number | null;
+  pagerank?: number | null;
+  betweenness?: number | null;
+  x?: number | null; // server-side layout, about -1..1
+  y?: number | null;
+  community?: number | null;
+  size?: number | null; // supernodes (lod > 0): number of nodes folded in
+}
+
+export interface NodeRanking {
+  id: string;
+  label: string;
+  type: NetworkNode["type"];
+  degree: number;
+  weighted_degree: number;
+  pagerank: number;
+  betweenness: number;
 }
 
 export interface NetworkLink {
   source: string;
   target: string;
-  relationship: string;
+  relationship: string; // "clustered" between supernodes
+  weight?: number | null;
 }
 
 export interface NetworkGraph {
@@ -132,13 +187,50 @@ export interface NetworkGraph {
   links: NetworkLink[];
 }
 
+// /api/network/graph?format=compact: one array per node field (fields that
+// are null for every node are omitted) and links as parallel arrays of
+// node positions and codes into the lookup tables
+export interface CompactNetworkGraph {
+  node_types: NetworkNode["type"][];
+  relationships: string[];
+  nodes: { [K in keyof NetworkNode]?: (K extends "type" ? number : NetworkNode[K])[] } & {
+    id: string[];
+    label: string[];
+    type: number[];
+  };
+  links: {
+    source: number[];
+    target: number[];
+    relationship: number[];
+    weight: (number | null)[];
+  };
+}
+
+export interface NetworkPath {
+  hops: number;
+  nodes: NetworkNode[]; // source to target
+  links: NetworkLink[]; // links[i] joins nodes[i] and nodes[i + 1]
+}
+
+export interface NetworkPathResponse {
+  source: NetworkNode;
+  target: NetworkNode;
+  paths: NetworkPath[];
+}
+
 export interface DashboardParams {
   sort_by?: string;
   sort_dir?: "asc" | "desc";
-  grade?: Grade;
+  grade?: Grade | string; // comma-separated for several, e.g. "A,B"
   segment?: string;
+  label_tier?: string;
+  agency?: string;
+  management?: string;
+  genre?: string;
   label?: string;
   search?: string;
   limit?: number;
   offset?: number;
+  cursor?: string;
+  include_sparkline?: boolean;
 }